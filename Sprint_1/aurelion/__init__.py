@@ -0,0 +1,27 @@
+"""Paquete de datos y analítica de Tienda Aurelion.
+
+Módulos:
+- `datos`: ingesta de las tablas de `BD/` a una caché columnar (Arrow IPC).
+- `lectores`: registro de lectores por formato (parquet, csv, csv.gz, xlsx).
+- `esquema`: tipos declarados por tabla y representación compacta en memoria.
+- `validacion`: reglas vectorizadas (PK, FK, importes, no negatividad) con reporte.
+- `ingesta`: parseo en paralelo (procesos) de tablas y archivos grandes + validación.
+- `incremental`: agregados persistidos que se actualizan por delta cuando solo se anexan filas.
+- `estrella`: índice precalculado de claves foráneas (esquema estrella).
+- `rfm`: indicadores RFM y segmentos, con actualización incremental.
+- `streaming`: agregaciones por bloques con tope de memoria (datos > RAM).
+- `cubo`: cubo temporal preagregado (día/semana/mes × pago × categoría × ciudad).
+- `periodos`: comparativas entre períodos (deltas, crecimiento, ventanas móviles, interanual) con sumas acumuladas.
+- `geo`: índice espacial de clientes (grilla) con ventas por celda, radio y teselas.
+- `canasta`: co-ocurrencia de productos, reglas de asociación y conjuntos frecuentes.
+- `perfil`: tramos de tiempo/memoria y contadores (panel, logs, Chrome trace).
+- `cache`: caché de resultados derivados compartida entre sesiones y procesos.
+- `analitica`: funciones analíticas puras (sin Streamlit).
+- `api`: consultas sobre `BD/` con caché compartida; CLI y servidor HTTP en
+  `python -m aurelion`.
+- `sintetico`: generador de datos sintéticos con la forma de `BD/`.
+- `benchmark`: benchmark reproducible por escala, con salida JSON.
+- `arranque`: importaciones diferidas, contenido estático de la app y presupuesto de arranque.
+- `exportar`: descargas CSV / CSV gzip / Parquet por bloques, en segundo plano y con caché de archivos.
+- `planificador`: precálculo en segundo plano al cambiar los datos, sirviendo el último resultado bueno.
+"""
@@ -0,0 +1,192 @@
+"""CLI y servidor HTTP/JSON de Tienda Aurelion (sin Streamlit).
+
+Ejemplos (desde la carpeta que contiene `aurelion/`):
+
+    python -m aurelion listar
+    python -m aurelion consulta top_clientes n=5
+    python -m aurelion consulta serie_pagos grano=semana categorias=Limpieza
+    python -m aurelion consulta ventas_cerca lat=-31.42 lon=-64.49 km=10
+    python -m aurelion precalcular
+    python -m aurelion exportar detalle_ventas desde=2024-01-01 --formato parquet --salida detalle.parquet
+    python -m aurelion ingerir --procesos 8 --reporte validacion.json
+    python -m aurelion servir --puerto 8765
+    python -m aurelion --traza traza.json precalcular   # tramos para chrome://tracing
+
+El servidor responde:
+
+    GET /consultas                    -> nombres y parámetros disponibles
+    GET /consulta/<nombre>?n=5&...    -> resultado en JSON
+"""
+
+import argparse
+import inspect
+import json
+import shutil
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlparse
+
+from aurelion import api, datos, exportar, ingesta, perfil
+
+
+def _catalogo() -> Dict[str, Any]:
+    catalogo = {}
+    for nombre, func in api.CONSULTAS.items():
+        firma = inspect.signature(func)
+        catalogo[nombre] = {
+            "descripcion": (func.__doc__ or "").strip(),
+            "parametros": {
+                p.name: (None if p.default is inspect.Parameter.empty else p.default)
+                for p in firma.parameters.values() if p.name != "base"
+            },
+        }
+    return catalogo
+
+
+def _requeridos(func) -> List[str]:
+    """Parámetros sin valor por defecto (además de `base`)."""
+    return [p.name for p in inspect.signature(func).parameters.values()
+            if p.default is inspect.Parameter.empty and p.name != "base"]
+
+
+def ejecutar(nombre: str, crudos: Dict[str, str], base: Path = datos.BD_PATH) -> Any:
+    """Ejecuta la consulta `nombre` con parámetros de texto y devuelve JSON serializable."""
+    if nombre not in api.CONSULTAS:
+        raise KeyError(f"Consulta desconocida: {nombre}")
+    func = api.CONSULTAS[nombre]
+    return api.a_json(func(**api.convertir_parametros(func, crudos), base=base))
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    base: Path = datos.BD_PATH
+
+    def _responder(self, estado: int, cuerpo: Any) -> None:
+        datos_json = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos_json)))
+        self.end_headers()
+        self.wfile.write(datos_json)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        partes = [p for p in url.path.split("/") if p]
+        if partes == ["consultas"]:
+            self._responder(200, _catalogo())
+        elif len(partes) == 2 and partes[0] == "consulta":
+            try:
+                self._responder(200, ejecutar(partes[1], dict(parse_qsl(url.query)), self.base))
+            except KeyError as e:
+                self._responder(404, {"error": e.args[0]})
+            except (ValueError, TypeError) as e:
+                self._responder(400, {"error": str(e)})
+        else:
+            self._responder(404, {"error": "Rutas: /consultas, /consulta/<nombre>"})
+
+
+def servir(host: str, puerto: int, base: Path) -> None:
+    manejador = type("Manejador", (_Manejador,), {"base": base})
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    print(f"Sirviendo consultas de {base} en http://{host}:{puerto}/consultas")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+def _parsear_pares(pares: List[str]) -> Dict[str, str]:
+    crudos = {}
+    for par in pares:
+        clave, sep, valor = par.partition("=")
+        if not sep:
+            raise SystemExit(f"Parámetro inválido (usar clave=valor): {par}")
+        crudos[clave] = valor
+    return crudos
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m aurelion", description="Consultas analíticas de Tienda Aurelion.")
+    parser.add_argument("--bd", type=Path, default=datos.BD_PATH, help="Carpeta con las tablas (por defecto BD/).")
+    parser.add_argument("--traza", type=Path, help="Guarda los tramos medidos en formato Chrome trace (JSON).")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    sub.add_parser("listar", help="Lista las consultas y sus parámetros.")
+    p_consulta = sub.add_parser("consulta", help="Ejecuta una consulta e imprime JSON.")
+    p_consulta.add_argument("nombre", choices=sorted(api.CONSULTAS))
+    p_consulta.add_argument("parametros", nargs="*", help="Parámetros clave=valor.")
+    sub.add_parser("precalcular", help="Calcula todas las consultas con sus valores por defecto.")
+    p_exportar = sub.add_parser("exportar", help="Exporta una fuente a CSV, CSV gzip o Parquet, por bloques.")
+    p_exportar.add_argument("fuente", choices=sorted(exportar.FUENTES))
+    p_exportar.add_argument("parametros", nargs="*", help="Parámetros clave=valor.")
+    p_exportar.add_argument("--formato", choices=list(exportar.FORMATOS), default="csv")
+    p_exportar.add_argument("--salida", type=Path, help="Copia el archivo aquí (por defecto se imprime su ruta en la caché).")
+    p_ingerir = sub.add_parser("ingerir", help="Parsea en paralelo las tablas nuevas o modificadas y las valida.")
+    p_ingerir.add_argument("--procesos", type=int, help="Procesos a usar (por defecto, uno por núcleo).")
+    p_ingerir.add_argument("--reporte", type=Path, help="Guarda el reporte de validación en JSON.")
+    p_servir = sub.add_parser("servir", help="Levanta el servidor HTTP/JSON.")
+    p_servir.add_argument("--host", default="127.0.0.1")
+    p_servir.add_argument("--puerto", type=int, default=8765)
+
+    args = parser.parse_args(argv)
+    if args.traza is None:
+        return _ejecutar_comando(args)
+    with perfil.perfilando(perfil.Perfilador(f"aurelion {args.comando}")) as perfilador:
+        codigo = _ejecutar_comando(args)
+    args.traza.write_text(json.dumps(perfilador.chrome_trace()), encoding="utf-8")
+    print(perfilador.resumen().to_string(index=False), file=sys.stderr)
+    return codigo
+
+
+def _ejecutar_comando(args: argparse.Namespace) -> int:
+    if args.comando == "listar":
+        print(json.dumps(_catalogo(), ensure_ascii=False, indent=2))
+    elif args.comando == "consulta":
+        try:
+            resultado = ejecutar(args.nombre, _parsear_pares(args.parametros), args.bd)
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    elif args.comando == "exportar":
+        try:
+            ruta = exportar.exportar(args.fuente, args.formato, args.bd, **_parsear_pares(args.parametros))
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        if args.salida:
+            ruta = Path(shutil.copyfile(ruta, args.salida))
+        print(ruta)
+    elif args.comando == "ingerir":
+        resultado = ingesta.ingerir(args.bd, args.procesos)
+        print(f"Parseadas: {', '.join(resultado.parseadas) or 'ninguna (caché al día)'}; "
+              f"tiempos: {resultado.segundos}", file=sys.stderr)
+        reporte = json.dumps(resultado.reporte.a_dict(), ensure_ascii=False, indent=2)
+        if args.reporte:
+            args.reporte.write_text(reporte, encoding="utf-8")
+        else:
+            print(reporte)
+        return 0 if resultado.reporte.ok else 1
+    elif args.comando == "precalcular":
+        ingesta.construir_caches(args.bd)
+        for nombre, func in api.CONSULTAS.items():
+            if nombre == "esquema":
+                for tabla in datos.TABLAS:
+                    func(tabla, base=args.bd)
+            elif _requeridos(func):
+                # Consultas por punto o tesela (p. ej. ventas_cerca): sus índices los llena otra consulta.
+                print(f"--  {nombre} (requiere {', '.join(_requeridos(func))})")
+                continue
+            else:
+                func(base=args.bd)
+            print(f"ok  {nombre}")
+    elif args.comando == "servir":
+        servir(args.host, args.puerto, args.bd)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Funciones analíticas puras de Tienda Aurelion (sin Streamlit).
+
+Reciben DataFrames o estructuras precalculadas (`Estrella`, `Cubo`) y
+devuelven DataFrames o diccionarios. No leen archivos ni cachean: eso lo
+hace `aurelion.api`, que es lo que usan la app, la CLI y el servidor HTTP.
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from aurelion import cubo as cubo_mod
+from aurelion import perfil
+from aurelion.cubo import Cubo
+from aurelion.estrella import Estrella
+
+
+def dtype_to_scale(dtype: str, colname: str) -> str:
+    d = dtype.lower()
+    name = colname.lower()
+    if any(k in name for k in ["id_", "email", "nombre", "ciudad", "categoria", "medio_pago", "id"]):
+        if "id" in name:
+            return "Nominal (identificador)"
+        return "Nominal (categórica)"
+    if "datetime" in d or "date" in d:
+        return "Temporal (fecha/tiempo)"
+    if "int" in d or "float" in d:
+        if any(k in name for k in ["cantidad", "precio", "importe", "monto", "total"]):
+            return "Razón (numérica)"
+        return "Intervalo / Razón (numérica)"
+    return "Nominal"
+
+
+@perfil.medido()
+def schema_table(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        "columna": df.columns,
+        "dtype_pandas": [str(df[c].dtype) for c in df.columns],
+        "escala_aprox": [dtype_to_scale(str(df[c].dtype), c) for c in df.columns]
+    })
+
+
+@perfil.medido()
+def compras_por_cliente(estrella: Estrella) -> pd.DataFrame:
+    """Cantidad de ventas por cliente (incluye clientes sin compras).
+
+    `id_venta` es PK: contar ventas por fila de cliente equivale al nunique.
+    Las ventas de un `id_cliente` que no está en `clientes` se cuentan al
+    final con ese id (o nulo), como en `streaming.compras_por_cliente`.
+    """
+    huerfanas = estrella.venta_cliente < 0
+    compras = pd.DataFrame({
+        "id_cliente": estrella.clientes["id_cliente"].to_numpy(),
+        "compras": np.bincount(estrella.venta_cliente[~huerfanas], minlength=len(estrella.clientes)),
+    })
+    if huerfanas.any():
+        perfil.contar("analitica.ventas_sin_cliente", int(huerfanas.sum()))
+        sin_cliente = (pd.Series(estrella.ventas["id_cliente"].to_numpy()[huerfanas], name="id_cliente")
+                       .value_counts(dropna=False, sort=False).rename("compras").reset_index())
+        compras = pd.concat([compras, sin_cliente], ignore_index=True)
+    return compras
+
+
+def top_clientes(compras: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+    return compras[compras["compras"] > 0].nlargest(n, "compras")
+
+
+@perfil.medido()
+def totales(clientes: pd.DataFrame, ventas: pd.DataFrame) -> Dict[str, int]:
+    """"Clientes totales" y "Ventas totales"."""
+    return {"clientes": int(clientes["id_cliente"].nunique()), "ventas": int(ventas["id_venta"].nunique())}
+
+
+@perfil.medido()
+def ventas_por_pago(ventas: pd.DataFrame) -> pd.DataFrame:
+    resultado = ventas.groupby("medio_pago", observed=True)["id_venta"].nunique().sort_values(ascending=False).reset_index()
+    resultado.columns = ["medio_pago", "ventas"]
+    resultado["medio_pago"] = resultado["medio_pago"].astype(str)
+    return resultado
+
+
+@perfil.medido()
+def serie_por_pago(cubo: Cubo, grano: str = "mes", medida: str = "importe",
+                   categorias: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Serie temporal de `medida` con una columna por medio de pago."""
+    categorias = list(categorias or [])
+    filtros = {"categoria": categorias} if categorias else None
+    serie = cubo_mod.consultar(cubo, grano, por=["medio_pago"], filtros=filtros)
+    tabla = serie.pivot(index="periodo", columns="medio_pago", values=medida).fillna(0)
+    tabla.columns = tabla.columns.astype(str)
+    return tabla
@@ -0,0 +1,250 @@
+"""API sin interfaz de Tienda Aurelion: consultas sobre los datos de `BD/`.
+
+Cada consulta carga lo que necesita desde la caché columnar / los índices
+precalculados y memoiza el resultado en la caché compartida
+(`aurelion.cache`), así que la app, los jobs nocturnos y el servidor HTTP
+reutilizan los mismos resultados.
+
+Cada consulta declara las tablas de las que depende (`@consulta(tablas=...)`):
+un anexo a otra tabla no invalida su resultado. Los agregados RFM y de
+medios de pago se mantienen por delta (`aurelion.incremental`).
+
+`CONSULTAS` es el registro que exponen la CLI y el servidor
+(`python -m aurelion --help`).
+"""
+
+import inspect
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from aurelion import analitica, cache, canasta, datos, estrella, geo, incremental, periodos, rfm, streaming, validacion
+from aurelion import cubo as cubo_mod
+
+CONSULTAS: Dict[str, Callable] = {}
+
+
+def consulta(func: Optional[Callable] = None, *, tablas=datos.TABLAS):
+    """Registra `func` en `CONSULTAS` y la memoiza en la caché compartida según `tablas`."""
+    def decorador(f: Callable) -> Callable:
+        envuelta = cache.compartido(f, tablas=tablas)
+        CONSULTAS[f.__name__] = envuelta
+        return envuelta
+
+    return decorador(func) if func is not None else decorador
+
+
+# --------------------------------------
+# Agregados incrementales
+# --------------------------------------
+def _actualizar_rfm(agregados: pd.DataFrame, deltas: Dict[str, pd.DataFrame], base: Path) -> Optional[pd.DataFrame]:
+    if not incremental.ventas_completas(deltas):
+        return None
+    return rfm.actualizar_agregados(agregados, deltas["ventas"], deltas["detalle_ventas"])
+
+
+def _actualizar_pagos(pagos: pd.DataFrame, deltas: Dict[str, pd.DataFrame], base: Path) -> pd.DataFrame:
+    # id_venta es PK y las ventas anexadas son nuevas: los conteos se suman.
+    if deltas["ventas"].empty:
+        return pagos
+    suma = (pd.concat([pagos, analitica.ventas_por_pago(deltas["ventas"])])
+            .groupby("medio_pago", sort=False)["ventas"].sum())
+    return suma.sort_values(ascending=False, kind="stable").reset_index()
+
+
+AGREGADO_RFM = incremental.Agregado(
+    nombre="rfm",
+    tablas=("ventas", "detalle_ventas"),
+    construir=lambda base: rfm.agregados_rfm(datos.cargar_tabla("ventas", base, ["id_venta", "id_cliente", "fecha"]),
+                                             datos.cargar_tabla("detalle_ventas", base, ["id_venta", "importe"])),
+    actualizar=_actualizar_rfm,
+    guardar=incremental.guardar_tabla,
+    leer=lambda carpeta: incremental.leer_tabla(carpeta, "id_cliente"),
+)
+
+AGREGADO_PAGOS = incremental.Agregado(
+    nombre="pagos",
+    tablas=("ventas",),
+    construir=lambda base: analitica.ventas_por_pago(datos.cargar_tabla("ventas", base, ["id_venta", "medio_pago"])),
+    actualizar=_actualizar_pagos,
+    guardar=incremental.guardar_tabla,
+    leer=incremental.leer_tabla,
+)
+
+
+# --------------------------------------
+# Consultas
+# --------------------------------------
+@consulta(tablas=lambda argumentos: (argumentos["tabla"],))
+def esquema(tabla: str, *, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Columnas, dtype y escala aproximada de `tabla`."""
+    return analitica.schema_table(datos.muestra(tabla, 0, base))
+
+
+@consulta(tablas=("clientes", "ventas"))
+def compras_por_cliente(por_bloques: bool = False, *, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Cantidad de ventas por cliente."""
+    if por_bloques:
+        return streaming.compras_por_cliente(base)
+    return analitica.compras_por_cliente(estrella.cargar_estrella(base))
+
+
+@consulta(tablas=("clientes", "ventas"))
+def top_clientes(n: int = 10, por_bloques: bool = False, *, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Top `n` clientes por cantidad de compras."""
+    return analitica.top_clientes(compras_por_cliente(por_bloques, base=base), n)
+
+
+@consulta(tablas=("clientes", "ventas"))
+def totales(por_bloques: bool = False, *, base: Path = datos.BD_PATH) -> Dict[str, int]:
+    """Clientes y ventas totales."""
+    if por_bloques:
+        return streaming.metricas_totales(base=base)
+    return analitica.totales(datos.cargar_tabla("clientes", base, ["id_cliente"]),
+                             datos.cargar_tabla("ventas", base, ["id_venta"]))
+
+
+@consulta(tablas=("ventas",))
+def ventas_por_pago(por_bloques: bool = False, *, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Ventas por medio de pago, de mayor a menor."""
+    if por_bloques:
+        return streaming.ventas_por_pago(base=base)
+    return incremental.cargar(AGREGADO_PAGOS, base)
+
+
+@consulta(tablas=("clientes", "ventas", "detalle_ventas"))
+def segmentos_rfm(*, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Puntajes RFM y segmento por cliente."""
+    return rfm.puntuar_rfm(incremental.cargar(AGREGADO_RFM, base),
+                           datos.cargar_tabla("clientes", base, ["id_cliente", "fecha_alta"]))
+
+
+@consulta
+def validacion_datos(*, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Problemas de calidad de datos (PK, FK, importes, negativos, columnas); vacío si no hay."""
+    return validacion.validar({t: datos.cargar_tabla(t, base) for t in datos.TABLAS}).a_dataframe()
+
+
+@consulta
+def comparar_periodos(desde: str, hasta: str, desde_anterior: str = "", hasta_anterior: str = "",
+                      por: str = "total", interanual: bool = False, *, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Ventas, unidades e importe de [desde, hasta] contra el período anterior (o el del año anterior)."""
+    acumulados = periodos.cargar_periodos(base)
+    if interanual:
+        return periodos.interanual(acumulados, desde, hasta, por)
+    return periodos.comparar(acumulados, desde, hasta, desde_anterior or None, hasta_anterior or None, por)
+
+
+@consulta
+def ventanas_moviles(medida: str = "importe", por: str = "total", dias: Tuple[int, ...] = periodos.VENTANAS,
+                     *, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Sumas móviles de 7/30/90 días (o `dias`) por día, con su crecimiento interanual."""
+    return periodos.ventanas(periodos.cargar_periodos(base), medida, por, tuple(int(d) for d in dias))
+
+
+@consulta
+def memoria_tablas(*, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Bytes en memoria de cada tabla completa y compacta, y el ahorro."""
+    return datos.memoria_tablas(base)
+
+
+@consulta
+def serie_pagos(grano: str = "mes", medida: str = "importe", categorias: Tuple[str, ...] = (),
+                *, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Serie temporal por medio de pago desde el cubo."""
+    return analitica.serie_por_pago(cubo_mod.cargar_cubo(base), grano, medida, categorias)
+
+
+@consulta(tablas=("clientes", "ventas", "detalle_ventas"))
+def ventas_cerca(lat: float, lon: float, km: float = 10.0, *, base: Path = datos.BD_PATH) -> Dict[str, float]:
+    """Clientes, ventas e importe a `km` o menos de (lat, lon)."""
+    return geo.totales(geo.en_radio(geo.cargar_indice(base), lat, lon, km))
+
+
+@consulta(tablas=("clientes", "ventas", "detalle_ventas"))
+def densidad_geo(*, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Clientes, ventas e importe por celda de la grilla geográfica."""
+    return geo.densidad(geo.cargar_indice(base))
+
+
+@consulta(tablas=("clientes", "ventas", "detalle_ventas"))
+def tesela_calor(zoom: int, x: int, y: int, medida: str = "ventas", resolucion: int = 64,
+                 *, base: Path = datos.BD_PATH) -> np.ndarray:
+    """Mapa de calor de la tesela z/x/y: `resolucion` × `resolucion` sumas de `medida`."""
+    return geo.tesela(geo.cargar_indice(base), zoom, x, y, medida, resolucion)
+
+
+def _con_nombres(tabla: pd.DataFrame, base: Path, columna: str = "id_producto",
+                 nombre: str = "nombre_producto") -> pd.DataFrame:
+    """Agrega el nombre del producto de `columna` a su derecha."""
+    productos = datos.cargar_tabla("productos", base, ["id_producto", "nombre_producto"])
+    nombres = productos.set_index("id_producto")["nombre_producto"].reindex(tabla[columna].to_numpy())
+    tabla = tabla.copy()
+    tabla.insert(tabla.columns.get_loc(columna) + 1, nombre, nombres.to_numpy())
+    return tabla
+
+
+@consulta(tablas=("productos", "detalle_ventas"))
+def comprados_juntos(id_producto: int, k: int = 10, orden: str = "lift", *, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Top `k` productos que se compran junto con `id_producto` (por lift, confianza o ventas_juntos)."""
+    return _con_nombres(canasta.juntos(canasta.cargar_canasta(base), id_producto, k, orden), base)
+
+
+@consulta(tablas=("productos", "detalle_ventas"))
+def reglas_asociacion(soporte_min: float = canasta.SOPORTE_MIN, confianza_min: float = canasta.CONFIANZA_MIN,
+                      lift_min: float = 1.0, n: int = 100, *, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Reglas producto A → producto B con soporte, confianza y lift (las `n` de mayor lift)."""
+    tabla = canasta.reglas(canasta.cargar_canasta(base), soporte_min, confianza_min, lift_min).head(n)
+    return _con_nombres(_con_nombres(tabla, base, "antecedente", "nombre_antecedente"),
+                        base, "consecuente", "nombre_consecuente")
+
+
+@consulta(tablas=("detalle_ventas",))
+def conjuntos_frecuentes(soporte_min: float = canasta.SOPORTE_MIN, max_tamano: int = 3,
+                         *, base: Path = datos.BD_PATH) -> pd.DataFrame:
+    """Conjuntos de productos que aparecen juntos en al menos `soporte_min` de las ventas."""
+    return canasta.conjuntos_frecuentes(canasta.cargar_canasta(base), soporte_min, max_tamano)
+
+
+# --------------------------------------
+# Utilidades para la CLI y el servidor
+# --------------------------------------
+def convertir_parametros(func: Callable, crudos: Dict[str, str]) -> Dict[str, Any]:
+    """Convierte parámetros de texto (`n=10`, `categorias=A,B`) según la firma de `func`."""
+    firma = inspect.signature(func)
+    parametros: Dict[str, Any] = {}
+    for nombre, texto in crudos.items():
+        if nombre not in firma.parameters or nombre == "base":
+            raise ValueError(f"Parámetro desconocido para {func.__name__}: {nombre}")
+        parametro = firma.parameters[nombre]
+        # Sin valor por defecto, el tipo sale de la anotación.
+        defecto = parametro.default if parametro.default is not parametro.empty else parametro.annotation()
+        if isinstance(defecto, bool):
+            parametros[nombre] = texto.lower() in ("1", "true", "si", "sí", "yes")
+        elif isinstance(defecto, int):
+            parametros[nombre] = int(texto)
+        elif isinstance(defecto, float):
+            parametros[nombre] = float(texto)
+        elif isinstance(defecto, tuple):
+            parametros[nombre] = tuple(v for v in texto.split(",") if v)
+        else:
+            parametros[nombre] = texto
+    return parametros
+
+
+def a_json(valor: Any) -> Any:
+    """Resultado de una consulta en tipos serializables a JSON."""
+    if isinstance(valor, pd.DataFrame):
+        con_nombre = any(n is not None for n in valor.index.names)
+        df = valor.reset_index(drop=not con_nombre)
+        return [
+            {k: (v.isoformat() if isinstance(v, pd.Timestamp) else v) for k, v in fila.items()}
+            for fila in df.astype(object).where(df.notna(), None).to_dict(orient="records")
+        ]
+    if isinstance(valor, dict):
+        return {k: a_json(v) for k, v in valor.items()}
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    return valor
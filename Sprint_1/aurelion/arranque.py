@@ -0,0 +1,165 @@
+"""Arranque rápido: importaciones diferidas, contenido estático y presupuesto de tiempos.
+
+Cada rerun de Streamlit ejecuta `aurelion_app.py` de arriba abajo, y un
+worker nuevo paga además todas las importaciones. Para que las sesiones
+cortas no queden dominadas por eso:
+
+- Las páginas estáticas (Pseudocódigo, Diagrama, Resumen) no importan
+  pandas, pyarrow ni el paquete de analítica; su contenido se lee una vez
+  por proceso desde `contenido/` (`contenido`).
+- `perezoso` devuelve un módulo que se importa recién en el primer acceso a
+  un atributo (p. ej. scipy en `aurelion.canasta`).
+- graphviz no hace falta en Python: `st.graphviz_chart` recibe el DOT como
+  texto y lo dibuja el navegador. openpyxl lo importa pandas solo al leer un
+  `.xlsx`.
+
+`python -m aurelion.arranque` mide, en procesos nuevos, el arranque en frío
+(primer run, importaciones incluidas) y el rerun de cada página con
+`streamlit.testing`, y los compara con `PRESUPUESTO`:
+
+    python -m aurelion.arranque --repeticiones 3 --salida arranque.json
+"""
+
+import argparse
+import functools
+import importlib
+import importlib.util
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+APP = Path(__file__).resolve().parent.parent / "aurelion_app.py"
+CONTENIDO_DIR = Path(__file__).resolve().parent.parent / "contenido"
+
+PAGINAS = ["Temas", "Fuentes", "Pseudocódigo", "Diagrama", "Resumen Sprint 1"]
+PAGINAS_ESTATICAS = ("Pseudocódigo", "Diagrama", "Resumen Sprint 1")
+
+# Segundos de arranque en frío y milisegundos de rerun (mediana) admitidos.
+# Medido en 1 núcleo (caché columnar ya construida): ~0.8 s / ~40 ms las
+# estáticas y ~1.0 s / ~70 ms las de datos; el margen absorbe el ruido.
+PRESUPUESTO = {
+    "estatica": {"frio_s": 1.5, "rerun_ms": 100},
+    "datos": {"frio_s": 4.0, "rerun_ms": 400},
+}
+
+# Módulos que una página estática no debería importar (numpy sí: lo usa st.image
+# para el logo del encabezado).
+PESADOS = ("pandas", "pyarrow", "scipy.sparse")
+
+
+class _Diferido(ModuleType):
+    """Representante de un módulo: lo importa en el primer acceso a un atributo.
+
+    `importlib.util.LazyLoader` no es seguro entre hilos antes de Python 3.12
+    (dos hilos que tocan el módulo a la vez ven atributos que faltan); acá el
+    import real lo hace `importlib.import_module`, que sí lo es.
+    """
+
+    def __init__(self, nombre: str) -> None:
+        super().__init__(nombre)
+        self.__dict__["_lock"] = threading.Lock()
+
+    def __getattr__(self, atributo: str) -> Any:
+        modulo = self.__dict__.get("_modulo")
+        if modulo is None:
+            with self._lock:
+                modulo = self.__dict__["_modulo"] = importlib.import_module(self.__name__)
+        return getattr(modulo, atributo)
+
+
+def perezoso(nombre: str) -> ModuleType:
+    """Módulo `nombre` que se importa de verdad en el primer acceso a un atributo."""
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    if importlib.util.find_spec(nombre) is None:
+        raise ModuleNotFoundError(f"No se encontró el módulo {nombre}", name=nombre)
+    return _Diferido(nombre)
+
+
+@functools.lru_cache(maxsize=None)
+def contenido(nombre: str) -> str:
+    """Texto de `contenido/<nombre>`, leído una sola vez por proceso."""
+    return (CONTENIDO_DIR / nombre).read_text(encoding="utf-8")
+
+
+# --------------------------------------
+# Presupuesto de arranque
+# --------------------------------------
+_MEDIR_PAGINA = """
+import json, statistics, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.query_params["seccion"] = {pagina!r}
+at.run()
+frio = time.perf_counter() - inicio
+errores = [str(e.value) for e in at.exception]
+# Un módulo de `perezoso` que nadie usó sigue siendo un _LazyModule: no cuenta.
+pesados = [m for m in {pesados!r} if m in sys.modules and type(sys.modules[m]).__name__ != "_LazyModule"]
+reruns = []
+for _ in range({reruns}):
+    t = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - t)
+print(json.dumps({{"frio_s": frio, "rerun_ms": statistics.median(reruns) * 1000,
+                  "modulos_pesados": pesados, "errores": errores}}))
+"""
+
+
+def medir_pagina(pagina: str, reruns: int = 5) -> Dict[str, Any]:
+    """Arranque en frío y rerun de `pagina` en un proceso Python nuevo."""
+    codigo = _MEDIR_PAGINA.format(app=str(APP), pagina=pagina, pesados=PESADOS, reruns=reruns)
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=APP.parent, capture_output=True,
+                            text=True, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def medir(paginas: Optional[List[str]] = None, repeticiones: int = 1, reruns: int = 5) -> Dict[str, Any]:
+    """Mejor arranque en frío y rerun de cada página (de `repeticiones` procesos), con el presupuesto."""
+    resultado = {}
+    for pagina in paginas or PAGINAS:
+        mediciones = [medir_pagina(pagina, reruns) for _ in range(repeticiones)]
+        tipo = "estatica" if pagina in PAGINAS_ESTATICAS else "datos"
+        mejor = {
+            "tipo": tipo,
+            "frio_s": round(min(m["frio_s"] for m in mediciones), 3),
+            "rerun_ms": round(min(m["rerun_ms"] for m in mediciones), 1),
+            "modulos_pesados": mediciones[0]["modulos_pesados"],
+            "errores": mediciones[0]["errores"],
+        }
+        limite = PRESUPUESTO[tipo]
+        mejor["dentro_del_presupuesto"] = (mejor["frio_s"] <= limite["frio_s"]
+                                           and mejor["rerun_ms"] <= limite["rerun_ms"]
+                                           and not mejor["errores"]
+                                           and not (tipo == "estatica" and mejor["modulos_pesados"]))
+        resultado[pagina] = mejor
+    return resultado
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m aurelion.arranque", description=__doc__.splitlines()[0])
+    parser.add_argument("--paginas", nargs="+", choices=PAGINAS)
+    parser.add_argument("--repeticiones", type=int, default=1, help="Procesos por página (se toma el mejor).")
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--salida", type=Path, help="Archivo JSON de resultados.")
+    args = parser.parse_args(argv)
+
+    resultado = medir(args.paginas, args.repeticiones, args.reruns)
+    texto = json.dumps({"presupuesto": PRESUPUESTO, "paginas": resultado}, ensure_ascii=False, indent=2)
+    if args.salida:
+        args.salida.write_text(texto, encoding="utf-8")
+    else:
+        print(texto)
+    for pagina, m in resultado.items():
+        marca = "ok " if m["dentro_del_presupuesto"] else "!! "
+        print(f"{marca}{pagina:<18} frío {m['frio_s']:.2f} s  rerun {m['rerun_ms']:.0f} ms  "
+              f"pesados: {', '.join(m['modulos_pesados']) or '-'}", file=sys.stderr)
+    return 0 if all(m["dentro_del_presupuesto"] for m in resultado.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
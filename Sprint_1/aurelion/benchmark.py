@@ -0,0 +1,238 @@
+"""Benchmark reproducible de carga y agregaciones sobre datos sintéticos.
+
+Para cada escala genera (o reutiliza) un dataset con `aurelion.sintetico` y,
+en un proceso aparte para que el pico de memoria sea de esa escala sola, mide:
+
+- carga en frío (sin caché columnar) y en caliente (Arrow con memory-map),
+- joins: índice estrella frente a `merge` de pandas,
+- las agregaciones de cada página de la app (Tema 1, RFM, Tema 2, Fuentes),
+- las agregaciones por bloques (`aurelion.streaming`),
+- memoria residente antes/después de cada paso y pico del proceso.
+
+El resultado es un JSON con el commit y las versiones de las librerías, para
+comparar corridas entre commits:
+
+    python -m aurelion.benchmark --escalas 1e4 1e5 1e6 --salida bench.json
+    python -m aurelion.benchmark --escalas 1e4 1e5 --comparar bench.json
+"""
+
+import argparse
+import json
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from aurelion import analitica, datos, estrella, perfil, rfm, sintetico, streaming
+from aurelion import cubo as cubo_mod
+
+# Un paso se marca como regresión si tarda más que `UMBRAL` veces lo anterior
+# y al menos `RUIDO_S` segundos más (los pasos de milisegundos varían mucho).
+UMBRAL = 1.2
+RUIDO_S = 0.01
+
+
+def _rss_mb() -> float:
+    """Memoria residente actual del proceso (MB)."""
+    return perfil.rss_bytes() / 2**20 or _pico_mb()
+
+
+def _pico_mb() -> float:
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes.
+    return pico / 2**20 if sys.platform == "darwin" else pico / 2**10
+
+
+class _Medidor:
+    def __init__(self) -> None:
+        self.pasos: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def paso(self, nombre: str) -> Iterator[None]:
+        antes = _rss_mb()
+        inicio = time.perf_counter()
+        yield
+        self.pasos[nombre] = {
+            "segundos": round(time.perf_counter() - inicio, 4),
+            "rss_antes_mb": round(antes, 1),
+            "rss_despues_mb": round(_rss_mb(), 1),
+        }
+
+
+def medir(base: Path, repeticiones: int = 1) -> Dict[str, Any]:
+    """Mide todos los pasos sobre los datos de `base` en el proceso actual.
+
+    Con `repeticiones > 1` se guarda el mejor tiempo de cada paso.
+    """
+    mejores: Dict[str, Dict[str, float]] = {}
+    for _ in range(repeticiones):
+        shutil.rmtree(base / datos.CACHE_DIRNAME, ignore_errors=True)
+        m = _Medidor()
+
+        with m.paso("carga_fria"):
+            tablas = {t: datos.cargar_tabla(t, base) for t in datos.TABLAS}
+        del tablas
+        with m.paso("carga_caliente"):
+            tablas = {t: datos.cargar_tabla(t, base) for t in datos.TABLAS}
+        clientes, productos = tablas["clientes"], tablas["productos"]
+        ventas, detalle = tablas["ventas"], tablas["detalle_ventas"]
+
+        with m.paso("join_merge"):
+            unida = (detalle.merge(ventas, on="id_venta", how="left", suffixes=("", "_v"))
+                     .merge(productos, on="id_producto", how="left", suffixes=("", "_p"))
+                     .merge(clientes, on="id_cliente", how="left", suffixes=("", "_c")))
+        del unida
+        with m.paso("join_estrella"):
+            star = estrella.construir_estrella(clientes, productos, ventas, detalle)
+
+        with m.paso("tema1_totales"):
+            analitica.totales(clientes, ventas)
+        with m.paso("tema1_top10"):
+            analitica.top_clientes(analitica.compras_por_cliente(star), 10)
+        with m.paso("tema1_rfm"):
+            rfm.segmentos_rfm(ventas, detalle, clientes)
+        with m.paso("tema2_ventas_por_pago"):
+            analitica.ventas_por_pago(ventas)
+        with m.paso("tema2_cubo"):
+            cubo = cubo_mod.construir_cubo(star)
+        with m.paso("tema2_serie"):
+            for grano in cubo_mod.GRANOS:
+                analitica.serie_por_pago(cubo, grano, "importe")
+        with m.paso("fuentes_esquemas"):
+            for df in tablas.values():
+                analitica.schema_table(df)
+
+        with m.paso("bloques_totales"):
+            streaming.metricas_totales(base=base)
+        with m.paso("bloques_compras_por_cliente"):
+            streaming.compras_por_cliente(base)
+        with m.paso("bloques_ventas_por_pago"):
+            streaming.ventas_por_pago(base=base)
+
+        for nombre, paso in m.pasos.items():
+            if nombre not in mejores or paso["segundos"] < mejores[nombre]["segundos"]:
+                mejores[nombre] = paso
+
+    return {
+        "filas": {t: int(len(df)) for t, df in tablas.items()},
+        "pasos": mejores,
+        "pico_mb": round(_pico_mb(), 1),
+    }
+
+
+def _medir_en_subproceso(base: Path, repeticiones: int) -> Dict[str, Any]:
+    salida = subprocess.run(
+        [sys.executable, "-m", "aurelion.benchmark", "--medir", str(base), "--repeticiones", str(repeticiones)],
+        cwd=Path(__file__).resolve().parent.parent, capture_output=True, text=True, check=True,
+    )
+    return json.loads(salida.stdout)
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).resolve().parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar(escalas: List[int], formato: str = "parquet", datos_dir: Optional[Path] = None,
+             repeticiones: int = 1, semilla: int = 0) -> Dict[str, Any]:
+    """Genera cada escala (si hace falta) y la mide en un subproceso."""
+    temporal = None
+    if datos_dir is None:
+        temporal = tempfile.TemporaryDirectory(prefix="aurelion_bench_")
+        datos_dir = Path(temporal.name)
+    parametros = sintetico.Parametros.desde_muestra()
+    resultado: Dict[str, Any] = {
+        "commit": _commit(),
+        "fecha": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "entorno": {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+                    "pyarrow": pa.__version__, "plataforma": platform.platform()},
+        "formato": formato,
+        "semilla": semilla,
+        "escalas": {},
+    }
+    try:
+        for n in escalas:
+            base = Path(datos_dir) / f"{formato}_{n}_{semilla}"
+            inicio = time.perf_counter()
+            if not all(datos.buscar_fuente(t, base) for t in datos.TABLAS):
+                sintetico.generar(base, n, formato, semilla, parametros)
+            generacion = round(time.perf_counter() - inicio, 2)
+            medicion = _medir_en_subproceso(base, repeticiones)
+            medicion["generacion_segundos"] = generacion
+            resultado["escalas"][str(n)] = medicion
+            print(f"{n:>12,} ventas: pico {medicion['pico_mb']} MB, "
+                  f"carga fría {medicion['pasos']['carga_fria']['segundos']} s", file=sys.stderr)
+    finally:
+        if temporal is not None:
+            temporal.cleanup()
+    return resultado
+
+
+def comparar(actual: Dict[str, Any], previo: Dict[str, Any], umbral: float = UMBRAL) -> pd.DataFrame:
+    """Tiempos de ambas corridas por escala y paso, con la razón actual / previo."""
+    filas = []
+    for escala, medicion in actual["escalas"].items():
+        anterior = previo.get("escalas", {}).get(escala)
+        if anterior is None:
+            continue
+        for paso, valores in medicion["pasos"].items():
+            if paso not in anterior["pasos"]:
+                continue
+            antes, ahora = anterior["pasos"][paso]["segundos"], valores["segundos"]
+            filas.append({"escala": escala, "paso": paso, "previo_s": antes, "actual_s": ahora,
+                          "razon": round(ahora / antes, 2) if antes else np.nan})
+        filas.append({"escala": escala, "paso": "pico_mb", "previo_s": anterior["pico_mb"],
+                      "actual_s": medicion["pico_mb"],
+                      "razon": round(medicion["pico_mb"] / anterior["pico_mb"], 2)})
+    tabla = pd.DataFrame(filas, columns=["escala", "paso", "previo_s", "actual_s", "razon"])
+    tabla["regresion"] = (tabla["razon"] > umbral) & (tabla["actual_s"] - tabla["previo_s"] > RUIDO_S)
+    return tabla
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m aurelion.benchmark", description=__doc__.splitlines()[0])
+    parser.add_argument("--escalas", type=float, nargs="+", default=[1e4, 1e5], help="Cantidades de ventas.")
+    parser.add_argument("--formato", choices=["csv", "parquet"], default="parquet")
+    parser.add_argument("--datos", type=Path, help="Carpeta donde guardar/reutilizar los datasets generados.")
+    parser.add_argument("--repeticiones", type=int, default=1)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", type=Path, help="Archivo JSON de resultados.")
+    parser.add_argument("--comparar", type=Path, help="JSON de una corrida anterior.")
+    parser.add_argument("--umbral", type=float, default=UMBRAL)
+    parser.add_argument("--medir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.medir is not None:
+        print(json.dumps(medir(args.medir, args.repeticiones)))
+        return 0
+
+    resultado = ejecutar([int(e) for e in args.escalas], args.formato, args.datos, args.repeticiones, args.semilla)
+    texto = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.salida:
+        args.salida.write_text(texto, encoding="utf-8")
+    else:
+        print(texto)
+
+    if args.comparar:
+        tabla = comparar(resultado, json.loads(args.comparar.read_text(encoding="utf-8")), args.umbral)
+        print(tabla.to_string(index=False), file=sys.stderr)
+        if tabla["regresion"].any():
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
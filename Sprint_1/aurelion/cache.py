@@ -0,0 +1,199 @@
+"""Caché compartida de resultados derivados, entre sesiones y procesos.
+
+Los resultados (top 10, ventas por pago, esquemas, RFM, ...) se guardan en
+disco y se indexan en una base SQLite, así que todos los workers de Streamlit
+de la misma máquina reutilizan lo que calculó cualquiera de ellos.
+
+- Clave: nombre de la función + parámetros + versión de las tablas de las
+  que depende (`datos.version_datos(base, tablas)`). Si cambia una de esas
+  tablas cambia la clave; un anexo a otra tabla no la invalida.
+- Tamaño acotado (`AURELION_CACHE_MAX_MB`, 512 por defecto) con expulsión LRU
+  por último acceso, y vencimiento por TTL (`AURELION_CACHE_TTL`, en segundos).
+- Contadores de aciertos/fallos compartidos (`estadisticas()`).
+
+Uso:
+    @cache.compartido(tablas=("ventas",))
+    def ventas_por_pago() -> pd.DataFrame: ...
+"""
+
+import contextlib
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
+
+from aurelion import datos, perfil
+
+CACHE_DIR = Path(os.environ.get("AURELION_CACHE_DIR", datos.BD_PATH / datos.CACHE_DIRNAME / "derivados"))
+MAX_BYTES = int(os.environ.get("AURELION_CACHE_MAX_MB", "512")) << 20
+TTL = float(os.environ.get("AURELION_CACHE_TTL", str(24 * 3600)))
+
+
+class CacheCompartida:
+    """Almacén clave -> valor en disco con índice SQLite, LRU y TTL."""
+
+    def __init__(self, carpeta: Path = CACHE_DIR, max_bytes: int = MAX_BYTES, ttl: float = TTL) -> None:
+        self.carpeta = Path(carpeta)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.carpeta.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS entradas ("
+                " clave TEXT PRIMARY KEY, funcion TEXT, bytes INTEGER,"
+                " creado REAL, vence REAL, ultimo_acceso REAL)"
+            )
+            con.execute("CREATE TABLE IF NOT EXISTS contadores (nombre TEXT PRIMARY KEY, valor INTEGER)")
+
+    @contextlib.contextmanager
+    def _conectar(self) -> Iterator[sqlite3.Connection]:
+        con = sqlite3.connect(self.carpeta / "indice.sqlite", timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def _archivo(self, clave: str) -> Path:
+        return self.carpeta / f"{clave}.pkl"
+
+    @staticmethod
+    def _contar(con: sqlite3.Connection, nombre: str) -> None:
+        con.execute(
+            "INSERT INTO contadores VALUES (?, 1) ON CONFLICT(nombre) DO UPDATE SET valor = valor + 1",
+            (nombre,),
+        )
+
+    def obtener(self, clave: str) -> Tuple[bool, Any]:
+        """(True, valor) si la clave está vigente; (False, None) si no."""
+        ahora = time.time()
+        with self._conectar() as con:
+            fila = con.execute("SELECT vence FROM entradas WHERE clave = ?", (clave,)).fetchone()
+            if fila is not None and fila[0] >= ahora:
+                try:
+                    with open(self._archivo(clave), "rb") as f:
+                        valor = pickle.load(f)
+                except (OSError, pickle.UnpicklingError, EOFError):
+                    con.execute("DELETE FROM entradas WHERE clave = ?", (clave,))
+                else:
+                    con.execute("UPDATE entradas SET ultimo_acceso = ? WHERE clave = ?", (ahora, clave))
+                    self._contar(con, "aciertos")
+                    return True, valor
+            self._contar(con, "fallos")
+        return False, None
+
+    def guardar(self, clave: str, valor: Any, funcion: str = "", ttl: Optional[float] = None) -> None:
+        ahora = time.time()
+        archivo = self._archivo(clave)
+        tmp = archivo.with_name(archivo.name + f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, archivo)
+        with self._conectar() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?, ?)",
+                (clave, funcion, archivo.stat().st_size, ahora, ahora + (self.ttl if ttl is None else ttl), ahora),
+            )
+            self._expulsar(con, ahora)
+
+    def _expulsar(self, con: sqlite3.Connection, ahora: float) -> None:
+        vencidas = [c for (c,) in con.execute("SELECT clave FROM entradas WHERE vence < ?", (ahora,))]
+        total = con.execute("SELECT COALESCE(SUM(bytes), 0) FROM entradas WHERE vence >= ?", (ahora,)).fetchone()[0]
+        sobrantes = []
+        if total > self.max_bytes:
+            for c, b in con.execute(
+                "SELECT clave, bytes FROM entradas WHERE vence >= ? ORDER BY ultimo_acceso", (ahora,)
+            ):
+                if total <= self.max_bytes:
+                    break
+                sobrantes.append(c)
+                total -= b
+        for c in vencidas + sobrantes:
+            con.execute("DELETE FROM entradas WHERE clave = ?", (c,))
+            self._archivo(c).unlink(missing_ok=True)
+        if sobrantes:
+            con.execute(
+                "INSERT INTO contadores VALUES ('expulsiones', ?) "
+                "ON CONFLICT(nombre) DO UPDATE SET valor = valor + excluded.valor",
+                (len(sobrantes),),
+            )
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._conectar() as con:
+            stats = {"aciertos": 0, "fallos": 0, "expulsiones": 0}
+            stats.update(dict(con.execute("SELECT nombre, valor FROM contadores")))
+            entradas, total = con.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entradas").fetchone()
+        stats.update(entradas=entradas, bytes=total)
+        return stats
+
+    def limpiar(self) -> None:
+        with self._conectar() as con:
+            for (c,) in con.execute("SELECT clave FROM entradas").fetchall():
+                self._archivo(c).unlink(missing_ok=True)
+            con.execute("DELETE FROM entradas")
+            con.execute("DELETE FROM contadores")
+
+
+@functools.lru_cache(maxsize=None)
+def cache_global() -> CacheCompartida:
+    return CacheCompartida()
+
+
+def _serializable(valor: Any) -> str:
+    if isinstance(valor, Path):
+        return str(valor.resolve())
+    return repr(valor)
+
+
+def clave(funcion: str, args: tuple, kwargs: Dict[str, Any], version: str) -> str:
+    """Clave estable a partir de la función, sus parámetros y la versión de datos.
+
+    Los parámetros deben ser valores simples (str, números, tuplas, listas, rutas).
+    """
+    texto = json.dumps([funcion, args, kwargs, version], sort_keys=True, default=_serializable)
+    return hashlib.sha256(texto.encode()).hexdigest()[:32]
+
+
+def compartido(func: Optional[Callable] = None, *, ttl: Optional[float] = None, base: Path = datos.BD_PATH,
+               tablas: Union[Tuple[str, ...], Callable[[Dict[str, Any]], Tuple[str, ...]]] = datos.TABLAS):
+    """Decorador: memoiza `func` en la caché compartida, por versión de `tablas` en `base`.
+
+    Si la función recibe un parámetro `base`, se usa ese directorio de datos.
+    `tablas` puede ser una función de los argumentos (p. ej. la tabla pedida).
+    Los parámetros se normalizan con la firma (valores por defecto incluidos),
+    así `f(10)` y `f(n=10)` comparten entrada. Si los datos no están en disco
+    (p. ej. vinieron de un uploader), se calcula sin cachear.
+    """
+    def decorador(f: Callable) -> Callable:
+        nombre = f"{f.__module__}.{f.__qualname__}"
+        firma = inspect.signature(f)
+
+        @functools.wraps(f)
+        def envoltura(*args, **kwargs):
+            argumentos = firma.bind(*args, **kwargs)
+            argumentos.apply_defaults()
+            try:
+                dependencias = tablas(argumentos.arguments) if callable(tablas) else tablas
+                version = datos.version_datos(argumentos.arguments.get("base", base), dependencias)
+            except FileNotFoundError:
+                return f(*args, **kwargs)
+            k = clave(nombre, (), dict(argumentos.arguments), version)
+            with perfil.tramo(f"cache.{f.__name__}", "cache"):
+                encontrado, valor = cache_global().obtener(k)
+                if encontrado:
+                    perfil.contar("cache.aciertos")
+                    return valor
+                perfil.contar("cache.fallos")
+                valor = f(*args, **kwargs)
+                cache_global().guardar(k, valor, nombre, ttl)
+                return valor
+
+        return envoltura
+
+    return decorador(func) if func is not None else decorador
@@ -0,0 +1,212 @@
+"""Análisis de canasta: productos que se compran juntos y reglas de asociación.
+
+Sobre `detalle_ventas` se arma una matriz dispersa binaria venta × producto
+`X` (1 si la venta tiene al menos una línea del producto). La matriz de
+co-ocurrencia `C = Xᵀ X` (producto × producto) tiene en la diagonal la
+cantidad de ventas de cada producto y fuera de ella la de cada par, así que
+todas las medidas salen de `C` sin comparar pares en pandas:
+
+- soporte(A, B) = C[A, B] / ventas
+- confianza(A → B) = C[A, B] / C[A, A]
+- lift(A, B) = C[A, B] · ventas / (C[A, A] · C[B, B])
+
+`juntos` responde el top-k de un producto leyendo una fila de `C`; `reglas`
+lista los pares que superan los umbrales; `conjuntos_frecuentes` aplica
+Apriori por niveles, contando los candidatos de cada nivel con un producto
+de matrices dispersas.
+
+Se guarda en `BD/.cache/canasta-<version>/` y, como en `detalle_ventas` solo
+se anexan líneas de ventas nuevas (marca de agua en `id_venta`), se actualiza
+sumando la co-ocurrencia de las ventas anexadas (`aurelion.incremental`).
+
+scipy se importa en el primer uso (`arranque.perezoso`): importar el paquete
+(p. ej. desde `aurelion.api`) no lo carga.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from aurelion import arranque, datos, incremental, perfil
+
+sp = arranque.perezoso("scipy.sparse")
+
+SOPORTE_MIN = 0.01
+CONFIANZA_MIN = 0.1
+
+
+@dataclass
+class Canasta:
+    productos: np.ndarray        # id_producto de cada columna, ordenado
+    ventas: sp.csr_matrix        # venta × producto (binaria)
+    coocurrencia: sp.csr_matrix  # producto × producto
+
+    @property
+    def n_ventas(self) -> int:
+        return self.ventas.shape[0]
+
+    @property
+    def frecuencia(self) -> np.ndarray:
+        """Ventas que incluyen cada producto (diagonal de la co-ocurrencia)."""
+        return self.coocurrencia.diagonal()
+
+
+def _matriz(detalle: pd.DataFrame, productos: np.ndarray) -> sp.csr_matrix:
+    filas, _ = pd.factorize(detalle["id_venta"], sort=True)
+    columnas = np.searchsorted(productos, detalle["id_producto"].to_numpy())
+    n_ventas = int(filas.max()) + 1 if len(filas) else 0
+    x = sp.csr_matrix((np.ones(len(filas), dtype=np.int32), (filas, columnas)),
+                      shape=(n_ventas, len(productos)))
+    x.data[:] = 1   # dos líneas del mismo producto en una venta cuentan una vez
+    return x
+
+
+def _expandir(m: sp.csr_matrix, previos: np.ndarray, productos: np.ndarray, cuadrada: bool) -> sp.csr_matrix:
+    """Reubica las columnas (y filas, si `cuadrada`) de `m` en el catálogo ampliado `productos`."""
+    coo = m.tocoo()
+    nuevas = np.searchsorted(productos, previos)
+    filas = nuevas[coo.row] if cuadrada else coo.row
+    forma = (len(productos), len(productos)) if cuadrada else (m.shape[0], len(productos))
+    return sp.csr_matrix((coo.data, (filas, nuevas[coo.col])), shape=forma)
+
+
+@perfil.medido()
+def construir_canasta(detalle_ventas: pd.DataFrame) -> Canasta:
+    productos = np.unique(detalle_ventas["id_producto"].to_numpy())
+    x = _matriz(detalle_ventas, productos)
+    return Canasta(productos, x, (x.T @ x).tocsr())
+
+
+@perfil.medido()
+def actualizar_canasta(canasta: Canasta, detalle_nuevo: pd.DataFrame) -> Canasta:
+    """Agrega las líneas de ventas nuevas: se suman sus filas y su co-ocurrencia."""
+    if detalle_nuevo.empty:
+        return canasta
+    productos = np.union1d(canasta.productos, detalle_nuevo["id_producto"].to_numpy())
+    ventas, coocurrencia = canasta.ventas, canasta.coocurrencia
+    if len(productos) != len(canasta.productos):
+        ventas = _expandir(ventas, canasta.productos, productos, cuadrada=False)
+        coocurrencia = _expandir(coocurrencia, canasta.productos, productos, cuadrada=True)
+    delta = _matriz(detalle_nuevo, productos)
+    return Canasta(productos, sp.vstack([ventas, delta], format="csr"), (coocurrencia + delta.T @ delta).tocsr())
+
+
+def _guardar(canasta: Canasta, carpeta: Path) -> None:
+    np.save(carpeta / "productos.npy", canasta.productos)
+    sp.save_npz(carpeta / "ventas.npz", canasta.ventas)
+    sp.save_npz(carpeta / "coocurrencia.npz", canasta.coocurrencia)
+
+
+def _leer(carpeta: Path) -> Canasta:
+    return Canasta(np.load(carpeta / "productos.npy"), sp.load_npz(carpeta / "ventas.npz").tocsr(),
+                   sp.load_npz(carpeta / "coocurrencia.npz").tocsr())
+
+
+AGREGADO = incremental.Agregado(
+    nombre="canasta",
+    tablas=("detalle_ventas",),
+    construir=lambda base: construir_canasta(datos.cargar_tabla("detalle_ventas", base, ["id_venta", "id_producto"])),
+    actualizar=lambda canasta, deltas, base: actualizar_canasta(canasta, deltas["detalle_ventas"]),
+    guardar=_guardar,
+    leer=_leer,
+)
+
+
+@perfil.medido(categoria="carga")
+def cargar_canasta(base: Path = datos.BD_PATH) -> Canasta:
+    """Canasta de la versión de datos actual: leída de disco, actualizada por delta o construida."""
+    return incremental.cargar(AGREGADO, base)
+
+
+# --------------------------------------
+# Consultas
+# --------------------------------------
+def _medidas(canasta: Canasta, a: np.ndarray, b: np.ndarray, juntas: np.ndarray) -> Dict[str, np.ndarray]:
+    frecuencia = canasta.frecuencia.astype(float)
+    n = max(canasta.n_ventas, 1)
+    return {
+        "ventas_juntos": juntas.astype(np.int64),
+        "soporte": juntas / n,
+        "confianza": juntas / frecuencia[a],
+        "lift": juntas * n / (frecuencia[a] * frecuencia[b]),
+    }
+
+
+@perfil.medido()
+def juntos(canasta: Canasta, id_producto: int, k: int = 10, orden: str = "lift") -> pd.DataFrame:
+    """Top-k productos comprados junto con `id_producto`, ordenados por `orden`.
+
+    `orden` es "lift", "confianza" o "ventas_juntos". La confianza es la de
+    `id_producto` → producto.
+    """
+    pos = np.searchsorted(canasta.productos, id_producto)
+    columnas = ["id_producto", "ventas_juntos", "soporte", "confianza", "lift"]
+    if pos >= len(canasta.productos) or canasta.productos[pos] != id_producto:
+        return pd.DataFrame(columns=columnas)
+    fila = canasta.coocurrencia.getrow(pos)
+    otros = fila.indices != pos
+    b, juntas = fila.indices[otros], fila.data[otros].astype(float)
+    tabla = pd.DataFrame({"id_producto": canasta.productos[b],
+                          **_medidas(canasta, np.full(len(b), pos), b, juntas)})
+    # Desempate estable por ventas juntos para que el orden no dependa del almacenamiento.
+    return (tabla.sort_values([orden, "ventas_juntos", "id_producto"], ascending=[False, False, True])
+            .head(k).reset_index(drop=True))
+
+
+@perfil.medido()
+def reglas(canasta: Canasta, soporte_min: float = SOPORTE_MIN, confianza_min: float = CONFIANZA_MIN,
+           lift_min: float = 1.0) -> pd.DataFrame:
+    """Reglas A → B entre pares de productos que superan los tres umbrales, por lift."""
+    coo = sp.triu(canasta.coocurrencia, k=1).tocoo()
+    juntas = coo.data.astype(float)
+    frecuentes = juntas >= soporte_min * canasta.n_ventas
+    a, b, juntas = coo.row[frecuentes], coo.col[frecuentes], juntas[frecuentes]
+    # Cada par da dos reglas: A → B y B → A.
+    a, b, juntas = np.concatenate([a, b]), np.concatenate([b, a]), np.concatenate([juntas, juntas])
+    tabla = pd.DataFrame({"antecedente": canasta.productos[a], "consecuente": canasta.productos[b],
+                          **_medidas(canasta, a, b, juntas)})
+    tabla = tabla[(tabla["confianza"] >= confianza_min) & (tabla["lift"] >= lift_min)]
+    return tabla.sort_values(["lift", "confianza", "antecedente"], ascending=[False, False, True]).reset_index(drop=True)
+
+
+@perfil.medido()
+def conjuntos_frecuentes(canasta: Canasta, soporte_min: float = SOPORTE_MIN, max_tamano: int = 3) -> pd.DataFrame:
+    """Conjuntos de productos con soporte >= `soporte_min` (Apriori por niveles, hasta `max_tamano`).
+
+    En cada nivel, las columnas de `nivel` indican qué ventas contienen cada
+    conjunto frecuente; `nivelᵀ X` cuenta de una vez todas sus extensiones
+    con un producto más, y se conservan las que superan el umbral.
+    """
+    minimo = soporte_min * canasta.n_ventas
+    x = canasta.ventas.tocsc()
+    frecuencia = canasta.frecuencia
+    items = np.flatnonzero(frecuencia >= minimo)
+    conjuntos = [(i,) for i in items]
+    cuentas = list(frecuencia[items])
+    nivel = x[:, items]
+    actuales = [(i,) for i in items]
+    for _ in range(1, max_tamano):
+        if not actuales:
+            break
+        conteo = (nivel.T @ x).tocoo()
+        ultimo = np.array([c[-1] for c in actuales])
+        # Solo extensiones con un producto mayor al último (cada conjunto se genera una vez).
+        validas = (conteo.data >= minimo) & (conteo.col > ultimo[conteo.row])
+        filas, cols, valores = conteo.row[validas], conteo.col[validas], conteo.data[validas]
+        if len(filas) == 0:
+            break
+        nivel = nivel[:, filas].multiply(x[:, cols]).tocsc()
+        actuales = [actuales[f] + (c,) for f, c in zip(filas, cols)]
+        conjuntos.extend(actuales)
+        cuentas.extend(valores)
+    return pd.DataFrame({
+        "productos": [tuple(int(canasta.productos[i]) for i in c) for c in conjuntos],
+        "tamano": [len(c) for c in conjuntos],
+        "ventas": np.asarray(cuentas, dtype=np.int64),
+        "soporte": np.asarray(cuentas, dtype=float) / max(canasta.n_ventas, 1),
+    }).sort_values(["tamano", "ventas"], ascending=[True, False], kind="stable").reset_index(drop=True)
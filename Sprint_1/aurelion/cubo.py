@@ -0,0 +1,243 @@
+"""Cubo de ventas preagregado: período × medio_pago × categoria × ciudad.
+
+Se construye una vez por versión de datos a partir del esquema estrella y se
+guarda en `BD/.cache/cubo-<version>/`. Las consultas de roll-up / drill-down
+agrupan las celdas del cubo (miles de filas) en lugar de las filas crudas.
+
+Hay dos cubos por grano (`dia`, `semana`, `mes`):
+
+- `ventas`: período × medio_pago × ciudad × categorias, al grano de la venta.
+  `categorias` es el conjunto de categorías de la venta ("A|B"). Como cada
+  venta tiene un único medio de pago, ciudad, fecha y conjunto, el conteo de
+  ventas es aditivo y cualquier roll-up sobre estas dimensiones es exacto.
+- `lineas`: período × medio_pago × categoria × ciudad, al grano de la línea.
+  Una venta con productos de dos categorías cuenta en ambas, así que aquí
+  `ventas` significa "ventas con al menos una línea de la categoría".
+
+`consultar` usa el cubo de líneas cuando agrupa por `categoria`. Si solo
+filtra categorías, las ventas salen del cubo de ventas (las que tienen alguna
+de las elegidas, una vez cada una) y unidades e importe del de líneas (solo
+las líneas de esas categorías).
+
+Cuando solo se anexan ventas nuevas (con su detalle), `actualizar_cubo` suma
+el cubo de esas ventas a las celdas existentes en lugar de reconstruirlo
+(`aurelion.incremental`).
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from aurelion import datos, incremental, perfil
+from aurelion.estrella import Estrella, cargar_estrella, construir_estrella
+
+DIMENSIONES = ("medio_pago", "categoria", "ciudad")
+MEDIDAS = ["ventas", "unidades", "importe"]
+# Dimensiones del cubo de ventas.
+DIMS_VENTA = ("medio_pago", "ciudad", "categorias")
+SEPARADOR = "|"
+
+# Grano -> frecuencia de período de pandas.
+GRANOS: Dict[str, str] = {"dia": "D", "semana": "W", "mes": "M"}
+
+
+@dataclass
+class Cubo:
+    version: str
+    ventas: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    lineas: Dict[str, pd.DataFrame] = field(default_factory=dict)
+
+
+def _periodo(fechas: pd.Series, grano: str) -> pd.Series:
+    if grano == "dia":
+        return fechas.dt.normalize()
+    return fechas.dt.to_period(GRANOS[grano]).dt.start_time
+
+
+def _enrollar(base: pd.DataFrame, grano: str, dims: Sequence[str]) -> pd.DataFrame:
+    # Todas las medidas son aditivas a lo largo del tiempo (cada venta tiene una sola fecha).
+    periodo = _periodo(base["periodo"], grano)
+    return (base.assign(periodo=periodo)
+            .groupby(["periodo", *dims], observed=True, sort=True)[MEDIDAS].sum()
+            .reset_index())
+
+
+def _categorias_por_venta(estrella: Estrella, categoria: pd.Series) -> pd.Categorical:
+    """Conjunto de categorías de cada venta como texto ordenado ("A|B"; "" si no tiene líneas)."""
+    validas = (estrella.linea_venta >= 0) & categoria.notna().to_numpy()
+    codigos, nombres = pd.factorize(categoria[validas].astype(str), sort=True)
+    if len(nombres) < 63:
+        # Una máscara de bits por venta; los conjuntos distintos son pocos y se traducen una vez.
+        mascaras = np.zeros(len(estrella.ventas), dtype=np.int64)
+        np.bitwise_or.at(mascaras, estrella.linea_venta[validas], np.left_shift(1, codigos).astype(np.int64))
+        unicas, inversa = np.unique(mascaras, return_inverse=True)
+        textos = [SEPARADOR.join(n for i, n in enumerate(nombres) if m >> i & 1) for m in unicas.tolist()]
+        return pd.Categorical(np.asarray(textos, dtype=object)[inversa])
+    pares = pd.DataFrame({"venta": estrella.linea_venta[validas], "categoria": np.asarray(nombres)[codigos]})
+    textos = (pares.drop_duplicates().sort_values("categoria")
+              .groupby("venta")["categoria"].agg(SEPARADOR.join)
+              .reindex(range(len(estrella.ventas)), fill_value=""))
+    return pd.Categorical(textos.to_numpy())
+
+
+def _elegidas(categorias: pd.Series, valores: Iterable) -> pd.Series:
+    """Filas del cubo de ventas cuyo conjunto de categorías incluye alguna de `valores`."""
+    valores = set(map(str, valores))
+    conjuntos = categorias.astype("category")
+    toca = [bool(set(c.split(SEPARADOR)) & valores) for c in conjuntos.cat.categories]
+    # El código -1 (nulo) toma el último elemento: False.
+    return pd.Series(np.append(toca, False)[conjuntos.cat.codes.to_numpy()], index=categorias.index)
+
+
+@perfil.medido()
+def construir_cubo(estrella: Estrella) -> Cubo:
+    lineas = estrella.hechos({
+        "detalle_ventas": ["id_venta", "cantidad", "importe"],
+        "ventas": ["fecha", "medio_pago"],
+        "productos": ["categoria"],
+        "clientes": ["ciudad"],
+    })
+    lineas["periodo"] = lineas["fecha"].dt.normalize()
+
+    # Grano venta: unidades e importe por venta con bincount sobre el índice línea -> venta.
+    dims_venta = list(DIMS_VENTA)
+    por_venta = estrella.hechos({"ventas": ["fecha", "medio_pago"], "clientes": ["ciudad"]}, grano="venta")
+    por_venta["periodo"] = por_venta["fecha"].dt.normalize()
+    por_venta["categorias"] = _categorias_por_venta(estrella, lineas["categoria"])
+    validas = estrella.linea_venta >= 0
+    pos = estrella.linea_venta[validas]
+    for medida, columna in (("unidades", "cantidad"), ("importe", "importe")):
+        pesos = estrella.detalle_ventas[columna].to_numpy()[validas]
+        por_venta[medida] = np.bincount(pos, weights=pesos, minlength=len(estrella.ventas))
+    por_venta["unidades"] = por_venta["unidades"].astype("int64")
+    base_ventas = (por_venta.groupby(["periodo", *dims_venta], observed=True, sort=True)
+                   .agg(ventas=("fecha", "size"), unidades=("unidades", "sum"), importe=("importe", "sum"))
+                   .reset_index())
+    base_lineas = (lineas.groupby(["periodo", *DIMENSIONES], observed=True, sort=True)
+                   .agg(ventas=("id_venta", "nunique"), unidades=("cantidad", "sum"), importe=("importe", "sum"))
+                   .reset_index())
+
+    cubo = Cubo(version=estrella.version)
+    for grano in GRANOS:
+        cubo.ventas[grano] = base_ventas if grano == "dia" else _enrollar(base_ventas, grano, dims_venta)
+        cubo.lineas[grano] = base_lineas if grano == "dia" else _enrollar(base_lineas, grano, DIMENSIONES)
+    return cubo
+
+
+def consultar(cubo: Cubo, grano: str = "mes", por: Iterable[str] = (),
+              filtros: Optional[Dict[str, Iterable]] = None,
+              desde: Optional[pd.Timestamp] = None, hasta: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """Medidas por período (y por las dimensiones de `por`) desde el cubo.
+
+    - `grano`: "dia", "semana" o "mes" (roll-up / drill-down temporal).
+    - `por`: dimensiones a conservar; el resto se suma.
+    - `filtros`: `{dimension: valores}` para quedarse con un subconjunto.
+    - `desde` / `hasta`: rango de períodos, inclusivo.
+    """
+    por = list(por)
+    filtros = filtros or {}
+    desconocidas = (set(por) | set(filtros)) - set(DIMENSIONES)
+    if desconocidas:
+        raise ValueError(f"Dimensiones desconocidas: {sorted(desconocidas)}")
+
+    def agrupar(tabla: pd.DataFrame) -> pd.DataFrame:
+        mascara = pd.Series(True, index=tabla.index)
+        for dim, valores in filtros.items():
+            if dim == "categoria" and dim not in tabla:
+                mascara &= _elegidas(tabla["categorias"], valores)
+            else:
+                mascara &= tabla[dim].isin(list(valores))
+        if desde is not None:
+            mascara &= tabla["periodo"] >= pd.Timestamp(desde)
+        if hasta is not None:
+            mascara &= tabla["periodo"] <= pd.Timestamp(hasta)
+        return (tabla[mascara]
+                .groupby(["periodo", *por], observed=True, sort=True)[MEDIDAS].sum()
+                .reset_index())
+
+    if "categoria" in por:
+        return agrupar(cubo.lineas[grano])
+    ventas = agrupar(cubo.ventas[grano])
+    if "categoria" not in filtros:
+        return ventas
+    # Una venta con líneas de dos categorías elegidas cuenta una vez (cubo de ventas), pero sus
+    # unidades e importe son solo los de esas líneas (cubo de líneas). Las dos tienen las mismas celdas.
+    claves = ["periodo", *por]
+    lineas = agrupar(cubo.lineas[grano])
+    return ventas[[*claves, "ventas"]].merge(lineas[[*claves, "unidades", "importe"]], on=claves)
+
+
+def _sumar(previo: pd.DataFrame, delta: pd.DataFrame, dims: Sequence[str]) -> pd.DataFrame:
+    suma = (pd.concat([previo, delta], ignore_index=True)
+            .groupby(["periodo", *dims], observed=True, sort=True)[MEDIDAS].sum()
+            .reset_index())
+    return suma.astype({d: "category" for d in dims})
+
+
+@perfil.medido()
+def actualizar_cubo(cubo: Cubo, ventas_nuevas: pd.DataFrame, detalle_nuevo: pd.DataFrame,
+                    clientes: pd.DataFrame, productos: pd.DataFrame) -> Cubo:
+    """Suma al cubo las ventas nuevas con su detalle.
+
+    Las ventas del delta no están en el cubo, así que todas las medidas
+    (incluido el conteo de ventas distintas por celda) son aditivas.
+    """
+    if ventas_nuevas.empty:
+        return cubo
+    delta = construir_cubo(construir_estrella(clientes, productos, ventas_nuevas, detalle_nuevo))
+    resultado = Cubo(version=cubo.version)
+    for grano in GRANOS:
+        resultado.ventas[grano] = _sumar(cubo.ventas[grano], delta.ventas[grano], DIMS_VENTA)
+        resultado.lineas[grano] = _sumar(cubo.lineas[grano], delta.lineas[grano], DIMENSIONES)
+    return resultado
+
+
+def _archivos(carpeta: Path) -> Dict[tuple, Path]:
+    return {(tipo, g): carpeta / f"{tipo}-{g}.arrow" for tipo in ("ventas", "lineas") for g in GRANOS}
+
+
+def _guardar(cubo: Cubo, carpeta: Path) -> None:
+    for (tipo, g), path in _archivos(carpeta).items():
+        datos.guardar_arrow(getattr(cubo, tipo)[g], path)
+
+
+def _leer(carpeta: Path) -> Cubo:
+    cubo = Cubo(version=carpeta.name.split("-", 1)[1])
+    for (tipo, g), path in _archivos(carpeta).items():
+        getattr(cubo, tipo)[g] = datos.leer_arrow(path)
+    return cubo
+
+
+def _actualizar(cubo: Cubo, deltas: Dict[str, pd.DataFrame], base: Path) -> Optional[Cubo]:
+    # Clientes y productos anexados no cambian celdas existentes: solo hacen falta para el join.
+    if not incremental.ventas_completas(deltas):
+        return None
+    return actualizar_cubo(cubo, deltas["ventas"], deltas["detalle_ventas"],
+                           datos.cargar_tabla("clientes", base, ["id_cliente", "ciudad"]),
+                           datos.cargar_tabla("productos", base, ["id_producto", "categoria"]))
+
+
+AGREGADO = incremental.Agregado(
+    nombre="cubo",
+    tablas=datos.TABLAS,
+    construir=lambda base: construir_cubo(cargar_estrella(base)),
+    actualizar=_actualizar,
+    guardar=_guardar,
+    leer=_leer,
+    formato=2,   # 2: cubo de ventas con `categorias`
+)
+
+
+@perfil.medido(categoria="carga")
+def cargar_cubo(base: Path = datos.BD_PATH, estrella: Optional[Estrella] = None) -> Cubo:
+    """Cubo de la versión de datos actual: leído de disco, actualizado por delta o construido.
+
+    Con `estrella` (ya en memoria) el recálculo completo la reutiliza.
+    """
+    construir = (lambda _: construir_cubo(estrella)) if estrella is not None else None
+    cubo = incremental.cargar(AGREGADO, base, construir)
+    cubo.version = datos.version_datos(base)
+    return cubo
@@ -0,0 +1,623 @@
+"""Capa de acceso a datos de Tienda Aurelion.
+
+Cada tabla de `BD/` (en cualquier formato de `aurelion.lectores`) se ingiere
+una sola vez a una caché columnar en formato Arrow IPC
+(`BD/.cache/<tabla>.arrow`) con el esquema de `aurelion.esquema`. Las
+cargas siguientes leen la caché con memory-map y solo se reconstruye cuando
+cambia el archivo fuente: primero se compara mtime/tamaño y, si difieren, el
+hash SHA-256 del contenido decide si hace falta volver a parsear.
+
+Las lecturas admiten proyección de columnas (`cargar_tabla(t, columnas=...)`)
+y muestras de las primeras filas (`muestra`): con memory-map solo se
+convierten a pandas las columnas y filas pedidas. `TablasPerezosas` es el
+acceso diferido que usa la app: cada tabla se carga la primera vez que una
+página la pide, y las demás se pueden precalentar en segundo plano.
+
+Ingesta incremental: si la fuente solo creció (filas nuevas al final con la
+clave de `COLUMNA_MARCA` por encima de la marca de agua), se parsean solo
+esas filas y se guardan como una partición más (`<tabla>.pNNNN.arrow`). El
+meta registra la cadena de anexos, y `filas_anexadas` devuelve el delta
+entre dos versiones para actualizar agregados (`aurelion.incremental`).
+
+Con `compacta=True` las tablas se devuelven en la representación compacta de
+`esquema.compactar`: las columnas desnormalizadas (`nombre_cliente`, `email`
+en ventas; `nombre_producto`, `precio_unitario` en detalle) ni se leen de la
+caché, y si se piden se reponen con un join a `clientes` / `productos`.
+`memoria_tablas` reporta los bytes ahorrados por tabla. La caché en disco
+guarda siempre la tabla completa (la validación y el esquema la necesitan).
+
+Uso:
+    from aurelion import datos
+    ventas = datos.cargar_tabla("ventas")
+    pagos = datos.cargar_tabla("ventas", columnas=["id_venta", "medio_pago"])
+    ventas = datos.cargar_tabla("ventas", compacta=True)
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+import pyarrow.ipc as ipc
+
+from aurelion import lectores, perfil
+from aurelion.esquema import DENORMALIZADAS, ESQUEMAS, aplicar_esquema, compactar
+
+BD_PATH = Path(__file__).resolve().parent.parent / "BD"
+CACHE_DIRNAME = ".cache"
+
+TABLAS = ("clientes", "productos", "ventas", "detalle_ventas")
+
+# Columna de la marca de agua de cada tabla: en una ingesta incremental solo
+# se aceptan como anexo filas con un valor mayor al máximo ya ingerido.
+COLUMNA_MARCA = {"clientes": "id_cliente", "productos": "id_producto",
+                 "ventas": "id_venta", "detalle_ventas": "id_venta"}
+
+# Con más particiones anexadas que esto, la tabla se compacta en una sola.
+MAX_PARTICIONES = 32
+
+# Carpetas temporales de `publicar_carpeta` más viejas que esto son restos de un proceso que se cortó.
+TMP_HUERFANO_S = 3600
+
+
+# --------------------------------------
+# Fuentes
+# --------------------------------------
+def buscar_fuente(tabla: str, base: Path = BD_PATH) -> Optional[Path]:
+    """Devuelve el archivo fuente de `tabla` en `base`, o None si no existe."""
+    return lectores.resolver_fuente(tabla, base)
+
+
+def firma_fuente(path: Path) -> Tuple[int, int]:
+    """Firma barata del archivo (mtime en ns, tamaño en bytes)."""
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def hash_archivo(path: Path, bloque: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(bloque), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# --------------------------------------
+# Parseo
+# --------------------------------------
+def leer_fuente(fuente: Union[Path, IO[bytes]], tabla: str, nombre: Optional[str] = None) -> pd.DataFrame:
+    """Parsea una fuente (ruta o archivo subido) con el lector de su formato y el esquema de `tabla`."""
+    return lectores.leer(fuente, tabla, nombre)
+
+
+# --------------------------------------
+# Caché columnar
+# --------------------------------------
+def _rutas_cache(tabla: str, base: Path) -> Tuple[Path, Path]:
+    cache = base / CACHE_DIRNAME
+    return cache / f"{tabla}.arrow", cache / f"{tabla}.meta.json"
+
+
+def _version_esquema(tabla: str) -> str:
+    # Si cambia el esquema declarado, las cachés viejas dejan de servir.
+    return hashlib.sha256(json.dumps(ESQUEMAS.get(tabla, {}), sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _leer_meta(path: Path) -> Dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _escribir_atomico(path: Path, escribir) -> None:
+    # Nombre temporal por proceso e hilo: dos cargas simultáneas no se pisan.
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    escribir(tmp)
+    os.replace(tmp, path)
+
+
+def guardar_arrow(df: pd.DataFrame, arrow_path: Path) -> None:
+    """Escribe `df` en Arrow IPC de forma atómica (tmp + rename)."""
+    tabla_arrow = pa.Table.from_pandas(df, preserve_index=False)
+
+    def escribir(tmp: Path) -> None:
+        with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, tabla_arrow.schema) as writer:
+            writer.write_table(tabla_arrow)
+
+    _escribir_atomico(arrow_path, escribir)
+
+
+def leer_arrow(arrow_path: Path, columnas: Optional[Sequence[str]] = None,
+               filas: Optional[int] = None) -> pd.DataFrame:
+    """Lee un archivo Arrow IPC con memory-map (opcionalmente solo `columnas` y las primeras `filas`)."""
+    with pa.memory_map(str(arrow_path), "r") as source:
+        tabla_arrow = ipc.open_file(source).read_all()
+        if columnas is not None:
+            tabla_arrow = tabla_arrow.select(list(columnas))
+        if filas is not None:
+            tabla_arrow = tabla_arrow.slice(0, filas)
+        return tabla_arrow.to_pandas()
+
+
+def _archivos_cache(tabla: str, base: Path, meta: Dict) -> List[Path]:
+    carpeta = base / CACHE_DIRNAME
+    return [carpeta / nombre for nombre in meta.get("particiones", [f"{tabla}.arrow"])]
+
+
+def _guardar_meta(tabla: str, base: Path, meta: Dict) -> None:
+    meta_path = _rutas_cache(tabla, base)[1]
+    _escribir_atomico(meta_path, lambda tmp: tmp.write_text(json.dumps(meta), encoding="utf-8"))
+
+
+def _hash_filas(df: pd.DataFrame) -> int:
+    """Suma (módulo 2**64) del hash de cada fila: se puede extender sumando el de las filas nuevas."""
+    if df.empty:
+        return 0
+    return int(pd.util.hash_pandas_object(df, index=False).to_numpy().sum(dtype=np.uint64))
+
+
+def _marca(tabla: str, df: pd.DataFrame) -> Optional[int]:
+    columna = COLUMNA_MARCA.get(tabla)
+    if columna is None or columna not in df.columns or df.empty:
+        return None
+    return int(df[columna].max())
+
+
+def cache_vigente(tabla: str, base: Path = BD_PATH) -> bool:
+    """True si la caché de `tabla` corresponde al archivo fuente actual."""
+    fuente = buscar_fuente(tabla, base)
+    meta = _leer_meta(_rutas_cache(tabla, base)[1])
+    if fuente is None or not all(p.exists() for p in _archivos_cache(tabla, base, meta)):
+        return False
+    if meta.get("fuente") != fuente.name or meta.get("esquema") != _version_esquema(tabla):
+        return False
+    mtime, size = firma_fuente(fuente)
+    if (meta.get("mtime_ns"), meta.get("size")) == (mtime, size):
+        return True
+    # mtime distinto (p. ej. copia o checkout): el hash decide.
+    if meta.get("sha256") == hash_archivo(fuente):
+        meta.update(mtime_ns=mtime, size=size)
+        _guardar_meta(tabla, base, meta)
+        return True
+    return False
+
+
+def construir_cache(tabla: str, base: Path = BD_PATH, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Parsea la fuente de `tabla` (o usa `df`, ya parseado), escribe la caché y devuelve el DataFrame."""
+    fuente = buscar_fuente(tabla, base)
+    if fuente is None:
+        raise FileNotFoundError(f"No se encontró {tabla} ({', '.join(lectores.PRIORIDAD)}) en {base}")
+    arrow_path, meta_path = _rutas_cache(tabla, base)
+    arrow_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if df is None:
+        with perfil.tramo("datos.leer_fuente", "carga", tabla=tabla, formato=lectores.sufijo_de(fuente.name)):
+            df = leer_fuente(fuente, tabla)
+    with perfil.tramo("datos.guardar_arrow", "carga", tabla=tabla):
+        guardar_arrow(df, arrow_path)
+    for vieja in arrow_path.parent.glob(f"{tabla}.p*.arrow"):
+        vieja.unlink(missing_ok=True)
+    mtime, size = firma_fuente(fuente)
+    meta = {
+        "fuente": fuente.name,
+        "mtime_ns": mtime,
+        "size": size,
+        "sha256": hash_archivo(fuente),
+        "esquema": _version_esquema(tabla),
+        "particiones": [arrow_path.name],
+        "filas": len(df),
+        "marca": _marca(tabla, df),
+        "hash_filas": _hash_filas(df),
+        "anexos": [],
+    }
+    _escribir_atomico(meta_path, lambda tmp: tmp.write_text(json.dumps(meta), encoding="utf-8"))
+    return df
+
+
+# --------------------------------------
+# Ingesta incremental (solo anexos)
+# --------------------------------------
+def _filas_nuevas(tabla: str, fuente: Path, meta: Dict) -> Optional[Tuple[pd.DataFrame, str]]:
+    """Filas agregadas a `fuente` desde la última ingesta y el nuevo sha256, o None si no es un anexo.
+
+    - CSV: si los primeros `size` bytes no cambiaron (mismo sha256), se
+      parsean solo los bytes nuevos.
+    - Otros formatos: se parsea el archivo y las filas con clave <= marca
+      tienen que coincidir con las ya ingeridas (misma cantidad y hash).
+    En ambos casos las filas nuevas deben tener la clave por encima de la marca.
+    """
+    marca, columna = meta.get("marca"), COLUMNA_MARCA.get(tabla)
+    if marca is None or columna is None or "hash_filas" not in meta:
+        return None
+    tam_previo, tam = meta.get("size", 0), fuente.stat().st_size
+    if lectores.sufijo_de(fuente.name) == ".csv":
+        if tam <= tam_previo or tam_previo == 0:
+            return None
+        h = hashlib.sha256()
+        with open(fuente, "rb") as f:
+            restante = tam_previo
+            while restante:
+                chunk = f.read(min(1 << 20, restante))
+                if not chunk:
+                    return None
+                h.update(chunk)
+                restante -= len(chunk)
+                ultimo = chunk[-1:]
+            if h.hexdigest() != meta.get("sha256") or ultimo != b"\n":
+                return None
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        nuevas = lectores.leer_particion(fuente, tabla, (tam_previo, tam))
+        sha = h.hexdigest()
+    else:
+        df = leer_fuente(fuente, tabla)
+        viejas = df[columna] <= marca
+        if int(viejas.sum()) != meta.get("filas") or _hash_filas(df[viejas]) != meta["hash_filas"]:
+            return None
+        nuevas = df[~viejas].reset_index(drop=True)
+        sha = hash_archivo(fuente)
+    if (nuevas[columna] <= marca).any():
+        return None
+    return nuevas, sha
+
+
+def anexar_cache(tabla: str, base: Path = BD_PATH) -> Optional[pd.DataFrame]:
+    """Si la fuente de `tabla` solo creció, guarda las filas nuevas como una partición más.
+
+    Devuelve las filas anexadas (puede ser vacío) o None si hay que reconstruir,
+    también cuando ya hay `MAX_PARTICIONES` particiones: la reconstrucción del
+    llamador compacta todo en una (y los agregados se recalculan). La marca de
+    agua (`COLUMNA_MARCA`) y la cadena `anexos` quedan en el meta, para que los
+    agregados derivados se actualicen por delta.
+    """
+    fuente = buscar_fuente(tabla, base)
+    meta = _leer_meta(_rutas_cache(tabla, base)[1])
+    if (fuente is None or meta.get("fuente") != fuente.name or meta.get("esquema") != _version_esquema(tabla)
+            or not all(p.exists() for p in _archivos_cache(tabla, base, meta))
+            or len(meta.get("particiones", [])) >= MAX_PARTICIONES):
+        return None
+    with perfil.tramo("datos.anexar_cache", "carga", tabla=tabla):
+        resultado = _filas_nuevas(tabla, fuente, meta)
+        if resultado is None:
+            return None
+        nuevas, sha = resultado
+        if not nuevas.empty:
+            nombre = f"{tabla}.p{len(meta.get('anexos', [])) + 1:04d}.arrow"
+            guardar_arrow(nuevas, base / CACHE_DIRNAME / nombre)
+            meta.setdefault("particiones", [f"{tabla}.arrow"]).append(nombre)
+            meta.setdefault("anexos", []).append(
+                {"desde": meta["sha256"], "hasta": sha, "particion": nombre, "filas": len(nuevas)})
+            meta.update(filas=meta["filas"] + len(nuevas), marca=max(meta["marca"], _marca(tabla, nuevas)),
+                        hash_filas=(meta["hash_filas"] + _hash_filas(nuevas)) % 2**64)
+        mtime, size = firma_fuente(fuente)
+        meta.update(sha256=sha, mtime_ns=mtime, size=size)
+        _guardar_meta(tabla, base, meta)
+        perfil.contar("columnar.anexos")
+        return nuevas
+
+
+def actualizar_cache(tabla: str, base: Path = BD_PATH) -> None:
+    """Deja la caché de `tabla` al día: nada si está vigente, anexo si solo creció, si no reconstrucción."""
+    if cache_vigente(tabla, base):
+        return
+    if anexar_cache(tabla, base) is None:
+        construir_cache(tabla, base)
+
+
+def filas_anexadas(tabla: str, desde: str, base: Path = BD_PATH) -> Optional[pd.DataFrame]:
+    """Filas anexadas a `tabla` desde la versión de fuente `desde` (sha256) hasta la actual.
+
+    None si la versión actual no se alcanza desde `desde` solo con anexos.
+    """
+    meta = _leer_meta(_rutas_cache(tabla, base)[1])
+    particiones, actual = [], desde
+    for anexo in meta.get("anexos", []):
+        if anexo["desde"] == actual:
+            particiones.append(base / CACHE_DIRNAME / anexo["particion"])
+            actual = anexo["hasta"]
+    if actual != meta.get("sha256"):
+        return None
+    if not particiones:
+        return leer_arrow(_archivos_cache(tabla, base, meta)[0], filas=0)
+    return _leer_particiones(particiones)
+
+
+def huella_tabla(tabla: str, base: Path = BD_PATH) -> Dict[str, str]:
+    """sha256 de la fuente de `tabla` y versión de esquema de su caché (puesta al día antes)."""
+    actualizar_cache(tabla, base)
+    meta = _leer_meta(_rutas_cache(tabla, base)[1])
+    return {"sha256": meta.get("sha256", ""), "esquema": meta.get("esquema", "")}
+
+
+def _leer_particiones(paths: Sequence[Path], columnas: Optional[Sequence[str]] = None,
+                      filas: Optional[int] = None) -> pd.DataFrame:
+    if len(paths) == 1:
+        return leer_arrow(paths[0], columnas, filas)
+    with contextlib.ExitStack() as pila:
+        partes = []
+        for path in paths:
+            source = pila.enter_context(pa.memory_map(str(path), "r"))
+            partes.append(ipc.open_file(source).read_all())
+        tabla_arrow = pa.concat_tables(partes, promote_options="permissive")
+        if columnas is not None:
+            tabla_arrow = tabla_arrow.select(list(columnas))
+        if filas is not None:
+            tabla_arrow = tabla_arrow.slice(0, filas)
+        return tabla_arrow.to_pandas()
+
+
+def lotes_cache(tabla: str, base: Path = BD_PATH, columnas: Optional[Sequence[str]] = None,
+                filas: int = 1 << 16) -> Iterator[pa.RecordBatch]:
+    """Lotes de hasta `filas` filas de la caché de `tabla` (memory-map, sin convertir a pandas)."""
+    actualizar_cache(tabla, base)
+    meta = _leer_meta(_rutas_cache(tabla, base)[1])
+    for path in _archivos_cache(tabla, base, meta):
+        with pa.memory_map(str(path), "r") as source:
+            for lote in ipc.open_file(source).read_all().to_batches(max_chunksize=filas):
+                yield lote.select(list(columnas)) if columnas is not None else lote
+
+
+def _leer_cache(tabla: str, base: Path, columnas: Optional[Sequence[str]] = None,
+                filas: Optional[int] = None) -> pd.DataFrame:
+    meta = _leer_meta(_rutas_cache(tabla, base)[1])
+    df = _leer_particiones(_archivos_cache(tabla, base, meta), columnas, filas)
+    return aplicar_esquema(df, tabla) if len(meta.get("particiones", [])) > 1 else df
+
+
+def cargar_tabla(tabla: str, base: Path = BD_PATH, columnas: Optional[Sequence[str]] = None,
+                 compacta: bool = False) -> pd.DataFrame:
+    """Carga `tabla` (o solo `columnas`) desde la caché columnar, poniéndola al día si quedó vieja.
+
+    Con `compacta`, en la representación de `esquema.compactar` (ver `_cargar_compacta`).
+    """
+    if compacta:
+        return _cargar_compacta(tabla, base, columnas)
+    with perfil.tramo("datos.cargar_tabla", "carga", tabla=tabla, columnas=len(columnas or [])):
+        if cache_vigente(tabla, base):
+            perfil.contar("columnar.aciertos")
+            return _leer_cache(tabla, base, columnas)
+        perfil.contar("columnar.fallos")
+        if anexar_cache(tabla, base) is not None:
+            return _leer_cache(tabla, base, columnas)
+        df = construir_cache(tabla, base)
+        return df if columnas is None else df[list(columnas)]
+
+
+def _columnas_cache(tabla: str, base: Path) -> List[str]:
+    actualizar_cache(tabla, base)
+    meta = _leer_meta(_rutas_cache(tabla, base)[1])
+    with pa.memory_map(str(_archivos_cache(tabla, base, meta)[0]), "r") as source:
+        return ipc.open_file(source).schema.names
+
+
+def _cargar_compacta(tabla: str, base: Path, columnas: Optional[Sequence[str]]) -> pd.DataFrame:
+    """`tabla` compacta: sin columnas desnormalizadas, salvo las pedidas, que salen de su dimensión."""
+    desnormalizadas = DENORMALIZADAS.get(tabla, {})
+    if columnas is None:
+        columnas = [c for c in _columnas_cache(tabla, base) if c not in desnormalizadas]
+    unir = [c for c in columnas if c in desnormalizadas]
+    propias = [c for c in columnas if c not in desnormalizadas]
+    claves = [desnormalizadas[c][1] for c in unir]
+    df = compactar(cargar_tabla(tabla, base, list(dict.fromkeys(propias + claves))), tabla)
+    for col in unir:
+        dimension, clave = desnormalizadas[col]
+        with perfil.tramo("datos.unir_dimension", "carga", tabla=tabla, columna=col):
+            dim = cargar_tabla(dimension, base, [clave, col], compacta=True).set_index(clave)[col]
+            df[col] = dim.reindex(df[clave].to_numpy()).to_numpy()
+    return df[list(columnas)]
+
+
+def memoria_tablas(base: Path = BD_PATH) -> pd.DataFrame:
+    """Bytes en memoria de cada tabla completa y en su representación compacta."""
+    filas = []
+    for tabla in TABLAS:
+        completa = cargar_tabla(tabla, base)
+        compacta = cargar_tabla(tabla, base, compacta=True)
+        antes, despues = int(completa.memory_usage(deep=True).sum()), int(compacta.memory_usage(deep=True).sum())
+        filas.append({
+            "tabla": tabla,
+            "filas": len(completa),
+            "columnas_quitadas": ", ".join(c for c in completa.columns if c not in compacta.columns),
+            "bytes": antes,
+            "bytes_compacta": despues,
+            "ahorro_bytes": antes - despues,
+            "ahorro_pct": round(100 * (antes - despues) / antes, 1) if antes else 0.0,
+        })
+    return pd.DataFrame(filas)
+
+
+def muestra(tabla: str, n: int = 5, base: Path = BD_PATH) -> pd.DataFrame:
+    """Primeras `n` filas de `tabla` sin convertir el resto (con `n=0`, solo los tipos)."""
+    actualizar_cache(tabla, base)
+    return _leer_cache(tabla, base, filas=n)
+
+
+def version_datos(base: Path = BD_PATH, tablas=TABLAS) -> str:
+    """Huella corta de la versión de datos de `tablas` (hash de cada fuente + esquema).
+
+    Sirve como clave para todo lo que se precalcula a partir de las tablas:
+    con `tablas` se limita a las que el resultado usa, así un cambio en otra
+    tabla no lo invalida. Las cachés viejas se ponen al día antes de calcularla.
+    """
+    partes = []
+    for tabla in tablas:
+        actualizar_cache(tabla, base)
+        meta = _leer_meta(_rutas_cache(tabla, base)[1])
+        partes.append(f"{tabla}:{meta.get('sha256')}:{meta.get('esquema')}")
+    return hashlib.sha256("|".join(partes).encode()).hexdigest()[:16]
+
+
+def dir_version(nombre: str, version: str, base: Path = BD_PATH) -> Path:
+    """Carpeta de caché de un artefacto derivado (`nombre`) para una versión de datos."""
+    return base / CACHE_DIRNAME / f"{nombre}-{version}"
+
+
+def publicar_carpeta(carpeta: Path, escribir: Callable[[Path], None]) -> None:
+    """Escribe `carpeta` con `escribir(tmp)` en una carpeta temporal propia y la publica con un rename.
+
+    Dos constructores simultáneos de la misma versión (hilos o procesos) no
+    comparten la temporal. Si otro publicó `carpeta` primero, gana ese: tiene
+    el mismo contenido y puede estar abierto (memory-map), así que no se borra
+    ni se reemplaza; solo se descarta la temporal propia.
+    """
+    carpeta.parent.mkdir(parents=True, exist_ok=True)
+    # Oculta: no coincide con el glob `<nombre>-*` de las versiones.
+    tmp = Path(tempfile.mkdtemp(dir=carpeta.parent, prefix=f".{carpeta.name}.", suffix=".tmp"))
+    try:
+        escribir(tmp)
+        try:
+            tmp.rename(carpeta)
+        except OSError:
+            if not carpeta.exists():
+                raise
+            perfil.contar("publicar.carreras")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+_bloqueos: Dict[Path, threading.Lock] = {}
+_bloqueos_lock = threading.Lock()
+
+
+def _bloquear_archivo(f: IO[bytes]) -> None:
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            # LK_LOCK reintenta 10 s y después lanza OSError.
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            perfil.contar("bloqueo.esperas")
+
+
+def _soltar_archivo(f: IO[bytes]) -> None:
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def bloqueo(nombre: str, base: Path = BD_PATH) -> Iterator[None]:
+    """Exclusión mutua para construir el artefacto `nombre` de `base`, entre hilos y entre procesos.
+
+    Los constructores miran primero si la versión ya está en disco y, si no,
+    toman el bloqueo y vuelven a mirar: el que esperó lee lo que publicó el
+    otro en lugar de calcularlo de nuevo. Entre procesos es un bloqueo del
+    sistema operativo sobre `BD/.cache/.bloqueos/<nombre>.lock`, que se suelta
+    solo si el proceso muere.
+    """
+    ruta = (base / CACHE_DIRNAME / ".bloqueos" / f"{nombre}.lock").absolute()
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with _bloqueos_lock:
+        local = _bloqueos.setdefault(ruta, threading.Lock())
+    if not local.acquire(blocking=False):
+        perfil.contar("bloqueo.esperas")
+        local.acquire()
+    try:
+        with open(ruta, "a+b") as f:
+            _bloquear_archivo(f)
+            try:
+                yield
+            finally:
+                _soltar_archivo(f)
+    finally:
+        local.release()
+
+
+def descartar_versiones(nombre: str, vigente: str, base: Path = BD_PATH) -> None:
+    """Borra las carpetas de `nombre` de versiones distintas de `vigente` y las temporales huérfanas."""
+    actual = dir_version(nombre, vigente, base)
+    carpeta = base / CACHE_DIRNAME
+    for vieja in carpeta.glob(f"{nombre}-*"):
+        if vieja != actual and not vieja.name.endswith(".tmp"):
+            shutil.rmtree(vieja, ignore_errors=True)
+    for tmp in carpeta.glob(f".{nombre}-*.tmp"):
+        with contextlib.suppress(FileNotFoundError):
+            if time.time() - tmp.stat().st_mtime > TMP_HUERFANO_S:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+
+# --------------------------------------
+# Acceso diferido
+# --------------------------------------
+class TablasPerezosas:
+    """Tablas de `base` que se cargan recién cuando se piden.
+
+    - `cargar(tabla, columnas)` lee solo esa proyección y la memoiza; si la
+      tabla completa ya está cargada, la proyección sale de ella. Con
+      `compacta` (por defecto) las tablas quedan en memoria en la
+      representación de `esquema.compactar`.
+    - `precargar(*tablas)` asegura en segundo plano que la caché columnar de
+      esas tablas esté vigente (el parseo en frío no bloquea a la página) sin
+      retener los DataFrames.
+
+    Es seguro compartir una instancia entre sesiones/hilos.
+    """
+
+    def __init__(self, base: Path = BD_PATH, hilos: int = 2, compacta: bool = True) -> None:
+        self.base = base
+        self.compacta = compacta
+        self._tablas: Dict[Tuple[str, Optional[Tuple[str, ...]]], pd.DataFrame] = {}
+        self._locks = {t: threading.Lock() for t in TABLAS}
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="aurelion-precarga")
+        self._pendientes: Dict[str, Future] = {}
+
+    def cargar(self, tabla: str, columnas: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        clave = (tabla, tuple(columnas) if columnas is not None else None)
+        with self._locks[tabla]:
+            if clave in self._tablas:
+                return self._tablas[clave]
+            completa = self._tablas.get((tabla, None))
+            if completa is not None and clave[1] is not None and set(clave[1]) <= set(completa.columns):
+                df = completa[list(clave[1])]
+            else:
+                df = cargar_tabla(tabla, self.base, clave[1], compacta=self.compacta)
+            self._tablas[clave] = df
+            return df
+
+    def __getitem__(self, tabla: str) -> pd.DataFrame:
+        return self.cargar(tabla)
+
+    def _calentar(self, tabla: str) -> None:
+        with self._locks[tabla]:
+            actualizar_cache(tabla, self.base)
+
+    def precargar(self, *tablas: str) -> None:
+        for tabla in tablas:
+            pendiente = self._pendientes.get(tabla)
+            if pendiente is None or pendiente.done():
+                self._pendientes[tabla] = self._ejecutor.submit(self._calentar, tabla)
+
+    def cerrar(self) -> None:
+        """Suelta las tablas cargadas y detiene los hilos de precarga."""
+        self._ejecutor.shutdown(wait=False, cancel_futures=True)
+        self._tablas.clear()
+
+    def cargadas(self) -> Dict[str, int]:
+        """Proyecciones en memoria y sus bytes (para diagnóstico)."""
+        return {
+            f"{t}[{', '.join(c)}]" if c else t: int(df.memory_usage(deep=True).sum())
+            for (t, c), df in self._tablas.items()
+        }
@@ -0,0 +1,151 @@
+"""Esquema declarado de las tablas de Tienda Aurelion.
+
+Cada tabla lógica tiene un diccionario `columna -> tipo`. Los tipos son los
+nombres de pandas (`int32`, `float64`, `category`, `str`) más `datetime`,
+que se parsea con los formatos de `FORMATOS_FECHA`.
+
+- Identificadores en `int32` (alcanza para ~2.100 millones de filas).
+- `medio_pago`, `ciudad` y `categoria` como `category`: pocas categorías
+  repetidas muchas veces, ocupan menos memoria y agrupan más rápido.
+
+`compactar` da la representación en memoria que usan la app y la estrella:
+sin las columnas copiadas de una dimensión (`DENORMALIZADAS`), enteros en el
+tipo más chico que alcanza y textos repetidos como `category`.
+"""
+
+from typing import Dict, List, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+ESQUEMAS: Dict[str, Dict[str, str]] = {
+    "clientes": {
+        "id_cliente": "int32",
+        "nombre_cliente": "str",
+        "email": "str",
+        "ciudad": "category",
+        "fecha_alta": "datetime",
+        "latitud": "float64",
+        "longitud": "float64",
+    },
+    "productos": {
+        "id_producto": "int32",
+        "nombre_producto": "str",
+        "categoria": "category",
+        "precio_unitario": "float64",
+    },
+    "ventas": {
+        "id_venta": "int32",
+        "fecha": "datetime",
+        "id_cliente": "int32",
+        "nombre_cliente": "str",
+        "email": "str",
+        "medio_pago": "category",
+    },
+    "detalle_ventas": {
+        "id_venta": "int32",
+        "id_producto": "int32",
+        "nombre_producto": "str",
+        "cantidad": "int32",
+        "precio_unitario": "float64",
+        "importe": "float64",
+    },
+}
+
+# Columnas que repiten en cada fila un atributo de una dimensión:
+# columna -> (tabla de la dimensión, clave para el join).
+DENORMALIZADAS: Dict[str, Dict[str, Tuple[str, str]]] = {
+    "ventas": {
+        "nombre_cliente": ("clientes", "id_cliente"),
+        "email": ("clientes", "id_cliente"),
+    },
+    "detalle_ventas": {
+        "nombre_producto": ("productos", "id_producto"),
+        "precio_unitario": ("productos", "id_producto"),
+    },
+}
+
+# Un texto se codifica como `category` si tiene a lo sumo esta fracción de valores distintos.
+UMBRAL_CATEGORIA = 0.5
+
+# Formatos aceptados para las columnas `datetime`, en orden de prueba.
+FORMATOS_FECHA: List[str] = ["%Y-%m-%d", "%d/%m/%Y"]
+
+_TIPOS_ARROW = {
+    "int32": pa.int32(),
+    "int64": pa.int64(),
+    "float64": pa.float64(),
+    "str": pa.string(),
+    "category": pa.dictionary(pa.int32(), pa.string()),
+    "datetime": pa.timestamp("s"),
+}
+
+
+def columnas(tabla: str) -> List[str]:
+    return list(ESQUEMAS[tabla])
+
+
+def tipos_arrow(tabla: str) -> Dict[str, pa.DataType]:
+    """Tipos de Arrow equivalentes al esquema (para los lectores de pyarrow)."""
+    return {c: _TIPOS_ARROW[t] for c, t in ESQUEMAS.get(tabla, {}).items()}
+
+
+def normalizar_columnas(df: pd.DataFrame) -> pd.DataFrame:
+    """Quita espacios y BOM UTF-8 de los nombres de columna."""
+    df.columns = [str(c).strip().lstrip("\ufeff") for c in df.columns]
+    return df
+
+
+def _parsear_fecha(serie: pd.Series) -> pd.Series:
+    if not pd.api.types.is_datetime64_any_dtype(serie):
+        serie = _texto_a_fecha(serie)
+    # En segundos, como `_TIPOS_ARROW`: Parquet y Excel traen microsegundos.
+    return serie if serie.dtype == "datetime64[s]" else serie.astype("datetime64[s]")
+
+
+def _texto_a_fecha(serie: pd.Series) -> pd.Series:
+    for fmt in FORMATOS_FECHA:
+        try:
+            return pd.to_datetime(serie, format=fmt)
+        except ValueError:
+            continue
+    return pd.to_datetime(serie, dayfirst=True, format="mixed")
+
+
+def aplicar_esquema(df: pd.DataFrame, tabla: str) -> pd.DataFrame:
+    """Aplica los tipos declarados de `tabla` a las columnas presentes en `df`.
+
+    Es idempotente: las columnas que ya tienen el tipo correcto no se copian.
+    """
+    df = normalizar_columnas(df)
+    for col, tipo in ESQUEMAS.get(tabla, {}).items():
+        if col not in df.columns:
+            continue
+        if tipo == "datetime":
+            df[col] = _parsear_fecha(df[col])
+        elif tipo == "category":
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+        elif str(df[col].dtype) != tipo:
+            df[col] = df[col].astype(tipo)
+    return df
+
+
+def compactar(df: pd.DataFrame, tabla: str) -> pd.DataFrame:
+    """Representación compacta de `tabla` en memoria.
+
+    - Quita las columnas de `DENORMALIZADAS` (se reponen con un join a la dimensión).
+    - Enteros al tipo más chico que contiene sus valores (`int8` a `int32`).
+    - Textos con pocos valores distintos (`UMBRAL_CATEGORIA`) como `category`.
+
+    Los `float64` se mantienen: las sumas de importes en `float32` pierden centavos.
+    """
+    df = df.drop(columns=[c for c in DENORMALIZADAS.get(tabla, {}) if c in df.columns])
+    for col in df.columns:
+        serie = df[col]
+        if pd.api.types.is_integer_dtype(serie.dtype):
+            df[col] = pd.to_numeric(serie, downcast="integer")
+        elif (pd.api.types.is_string_dtype(serie.dtype) and len(serie)
+              and serie.nunique() <= UMBRAL_CATEGORIA * len(serie)):
+            df[col] = serie.astype("category")
+    return df
@@ -0,0 +1,143 @@
+"""Esquema estrella precalculado: ventas ⇄ detalle_ventas ⇄ productos ⇄ clientes.
+
+En lugar de repetir `merge` en cada rerun, se resuelve una sola vez por versión
+de datos la posición (fila) de cada clave foránea en su tabla de dimensión:
+
+- `venta_cliente[i]`: fila de `clientes` del cliente de la venta `i`.
+- `linea_venta[j]`: fila de `ventas` de la línea `j` de `detalle_ventas`.
+- `linea_producto[j]`: fila de `productos` de la línea `j`.
+
+Con esos arrays cualquier atributo de una dimensión se alinea a los hechos con
+un `take` (indexado de NumPy), sin joins por hash. Las claves que no existen en
+la dimensión quedan con posición -1 y se devuelven como nulos.
+
+Los índices se guardan en `BD/.cache/estrella-<version>/*.npy` y se abren con
+memory-map. `cargar_estrella` guarda las tablas en su representación compacta
+(`esquema.compactar`): los textos copiados de las dimensiones no se repiten en
+los hechos y se obtienen con `atributo`, p. ej.
+`e.atributo("clientes", "nombre_cliente", grano="venta")`.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+from aurelion import datos, perfil
+
+INDICES = ("venta_cliente", "linea_venta", "linea_producto")
+
+
+def posiciones(claves_dim: np.ndarray, claves: np.ndarray) -> np.ndarray:
+    """Fila de cada valor de `claves` dentro de `claves_dim` (-1 si no está)."""
+    claves_dim = np.asarray(claves_dim)
+    claves = np.asarray(claves)
+    if len(claves_dim) == 0:
+        return np.full(len(claves), -1, dtype=np.int32)
+    orden = np.argsort(claves_dim, kind="stable")
+    ordenadas = claves_dim[orden]
+    idx = np.searchsorted(ordenadas, claves)
+    idx = np.minimum(idx, len(ordenadas) - 1)
+    encontrada = ordenadas[idx] == claves
+    return np.where(encontrada, orden[idx], -1).astype(np.int32)
+
+
+def tomar(serie: pd.Series, pos: np.ndarray) -> pd.Series:
+    """Valores de `serie` en las filas `pos`; las posiciones -1 quedan nulas."""
+    faltantes = pos < 0
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        valores = pd.Categorical.from_codes(np.where(faltantes, -1, codigos[pos]), dtype=serie.dtype)
+        return pd.Series(valores, name=serie.name)
+    valores = pd.Series(serie.to_numpy()[pos], name=serie.name)
+    if faltantes.any():
+        valores = valores.mask(faltantes)
+    return valores
+
+
+@dataclass
+class Estrella:
+    version: str
+    clientes: pd.DataFrame
+    productos: pd.DataFrame
+    ventas: pd.DataFrame
+    detalle_ventas: pd.DataFrame
+    venta_cliente: np.ndarray
+    linea_venta: np.ndarray
+    linea_producto: np.ndarray
+
+    @property
+    def linea_cliente(self) -> np.ndarray:
+        """Fila de `clientes` de cada línea de detalle (vía su venta)."""
+        return np.where(self.linea_venta < 0, -1, self.venta_cliente[self.linea_venta])
+
+    def atributo(self, tabla: str, columna: str, grano: str = "linea") -> pd.Series:
+        """Columna `columna` de la dimensión `tabla` alineada al grano pedido.
+
+        `grano` es "linea" (filas de `detalle_ventas`) o "venta" (filas de `ventas`).
+        """
+        if grano == "venta":
+            pos = {"ventas": np.arange(len(self.ventas)), "clientes": self.venta_cliente}
+        else:
+            pos = {
+                "detalle_ventas": np.arange(len(self.detalle_ventas)),
+                "ventas": self.linea_venta,
+                "clientes": self.linea_cliente,
+                "productos": self.linea_producto,
+            }
+        if tabla not in pos:
+            raise ValueError(f"La tabla {tabla} no se puede alinear al grano {grano}")
+        return tomar(getattr(self, tabla)[columna], pos[tabla])
+
+    def hechos(self, columnas: Dict[str, Iterable[str]], grano: str = "linea") -> pd.DataFrame:
+        """DataFrame desnormalizado con las columnas pedidas por tabla.
+
+        Ejemplo: `e.hechos({"detalle_ventas": ["importe"], "clientes": ["ciudad"]})`.
+        """
+        return pd.DataFrame({
+            col: self.atributo(tabla, col, grano)
+            for tabla, cols in columnas.items() for col in cols
+        })
+
+
+@perfil.medido()
+def construir_estrella(clientes: pd.DataFrame, productos: pd.DataFrame, ventas: pd.DataFrame,
+                       detalle_ventas: pd.DataFrame, version: str = "") -> Estrella:
+    return Estrella(
+        version=version,
+        clientes=clientes,
+        productos=productos,
+        ventas=ventas,
+        detalle_ventas=detalle_ventas,
+        venta_cliente=posiciones(clientes["id_cliente"].to_numpy(), ventas["id_cliente"].to_numpy()),
+        linea_venta=posiciones(ventas["id_venta"].to_numpy(), detalle_ventas["id_venta"].to_numpy()),
+        linea_producto=posiciones(productos["id_producto"].to_numpy(), detalle_ventas["id_producto"].to_numpy()),
+    )
+
+
+@perfil.medido(categoria="carga")
+def cargar_estrella(base: Path = datos.BD_PATH) -> Estrella:
+    """Estrella de la versión de datos actual, leída de disco o construida y guardada."""
+    version = datos.version_datos(base)
+    tablas = {t: datos.cargar_tabla(t, base, compacta=True) for t in datos.TABLAS}
+    carpeta = datos.dir_version("estrella", version, base)
+    if not all((carpeta / f"{n}.npy").exists() for n in INDICES):
+        with datos.bloqueo("estrella", base):
+            # Otro hilo o proceso pudo publicarla mientras se esperaba el bloqueo.
+            if not all((carpeta / f"{n}.npy").exists() for n in INDICES):
+                perfil.contar("estrella.fallos")
+                estrella = construir_estrella(**tablas, version=version)
+
+                def escribir(tmp: Path) -> None:
+                    for n in INDICES:
+                        np.save(tmp / f"{n}.npy", getattr(estrella, n))
+
+                datos.publicar_carpeta(carpeta, escribir)
+                datos.descartar_versiones("estrella", version, base)
+                return estrella
+
+    perfil.contar("estrella.aciertos")
+    indices = {n: np.load(carpeta / f"{n}.npy", mmap_mode="r") for n in INDICES}
+    return Estrella(version=version, **tablas, **indices)
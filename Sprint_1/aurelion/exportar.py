@@ -0,0 +1,319 @@
+"""Exportaciones masivas a CSV, CSV gzip o Parquet, por bloques y en segundo plano.
+
+Cada exportación escribe su archivo lote a lote (`pyarrow.RecordBatch`) sin
+armar el archivo entero en memoria ni pasar el DataFrame a texto:
+
+- CSV y CSV gzip con `pyarrow.csv.CSVWriter` (gzip sobre un
+  `CompressedOutputStream`), Parquet con `pyarrow.parquet.ParquetWriter`.
+- `detalle_ventas` se lee por lotes desde la caché columnar (memory-map) y se
+  filtra lote a lote con `pyarrow.compute`.
+- Los resultados de consultas (segmentos RFM, compras por cliente, cortes del
+  cubo) salen de `aurelion.api` / el cubo y se convierten de a `FILAS_LOTE` filas.
+
+Los archivos quedan en una caché temporal (`AURELION_EXPORT_DIR`, por defecto
+`<tmp>/aurelion-exportes`) con un nombre que sale de fuente + parámetros +
+formato + versión de las tablas de la fuente: un pedido igual reutiliza el
+archivo, sea de la misma sesión o de otra. `solicitar` genera en un hilo de
+fondo y los pedidos iguales simultáneos comparten el trabajo. El tamaño total
+se acota con `AURELION_EXPORT_MAX_MB` (se borran primero los menos usados).
+
+Memoria: generar un archivo usa a lo sumo unos `FILAS_LOTE` por vez, y
+`Exportacion.leer` entrega el archivo abierto, no su contenido. Pero
+`st.download_button` copia en memoria lo que recibe (una vez, al hacer clic,
+y lo retiene mientras dure la sesión): por eso la app ofrece el botón solo
+hasta `AURELION_EXPORT_DESCARGA_MAX_MB` y, por encima, muestra la ruta del
+archivo en el servidor.
+
+    pedido = exportar.solicitar("detalle_ventas", "parquet", desde="2024-01-01")
+    pedido.resultado()        # Path del archivo (espera si todavía se genera)
+
+Desde consola: `python -m aurelion exportar detalle_ventas --formato csv.gz`.
+"""
+
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from aurelion import api, datos, perfil
+from aurelion import cubo as cubo_mod
+
+EXPORT_DIR = Path(os.environ.get("AURELION_EXPORT_DIR", Path(tempfile.gettempdir()) / "aurelion-exportes"))
+MAX_BYTES = int(os.environ.get("AURELION_EXPORT_MAX_MB", "1024")) << 20
+# Tope de lo que la app entrega por `st.download_button` (queda entero en memoria).
+DESCARGA_MAX_BYTES = int(os.environ.get("AURELION_EXPORT_DESCARGA_MAX_MB", "200")) << 20
+FILAS_LOTE = 1 << 16
+
+# formato -> (extensión, tipo MIME)
+FORMATOS: Dict[str, Tuple[str, str]] = {
+    "csv": ("csv", "text/csv"),
+    "csv.gz": ("csv.gz", "application/gzip"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+# Esquema de salida y los lotes que lo cumplen.
+Lotes = Tuple[pa.Schema, Iterator[pa.RecordBatch]]
+
+
+@dataclass
+class Fuente:
+    generar: Callable[..., Lotes]
+    tablas: Tuple[str, ...]
+
+
+FUENTES: Dict[str, Fuente] = {}
+
+
+def fuente(tablas: Tuple[str, ...] = datos.TABLAS):
+    """Registra una fuente exportable en `FUENTES` con las tablas de las que depende."""
+    def decorador(f: Callable[..., Lotes]) -> Callable[..., Lotes]:
+        FUENTES[f.__name__.lstrip("_")] = Fuente(f, tablas)
+        return f
+
+    return decorador
+
+
+def _lotes_de_df(df: pd.DataFrame) -> Lotes:
+    """Un resultado en memoria como lotes de `FILAS_LOTE` filas (sin convertirlo entero a Arrow)."""
+    if any(n is not None for n in df.index.names):
+        df = df.reset_index()
+    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+
+    def lotes() -> Iterator[pa.RecordBatch]:
+        for inicio in range(0, len(df), FILAS_LOTE):
+            yield pa.RecordBatch.from_pandas(df.iloc[inicio:inicio + FILAS_LOTE], schema=esquema,
+                                             preserve_index=False)
+
+    return esquema, lotes()
+
+
+# --------------------------------------
+# Fuentes
+# --------------------------------------
+@fuente(tablas=("clientes", "ventas", "detalle_ventas"))
+def _segmentos_rfm(base: Path) -> Lotes:
+    """Recencia, frecuencia, monetización, puntajes y segmento por cliente."""
+    return _lotes_de_df(api.segmentos_rfm(base=base))
+
+
+@fuente(tablas=("clientes", "ventas"))
+def _compras_por_cliente(base: Path) -> Lotes:
+    """Cantidad de compras de cada cliente."""
+    return _lotes_de_df(api.compras_por_cliente(base=base))
+
+
+@fuente()
+def _cubo(base: Path, grano: str = "mes", por: Tuple[str, ...] = ("medio_pago",), desde: str = "",
+          hasta: str = "", medio_pago: Tuple[str, ...] = (), categoria: Tuple[str, ...] = (),
+          ciudad: Tuple[str, ...] = ()) -> Lotes:
+    """Corte del cubo: ventas, unidades e importe por período y las dimensiones de `por`."""
+    filtros = {d: v for d, v in (("medio_pago", medio_pago), ("categoria", categoria), ("ciudad", ciudad)) if v}
+    return _lotes_de_df(cubo_mod.consultar(cubo_mod.cargar_cubo(base), grano, por, filtros,
+                                           desde or None, hasta or None))
+
+
+@fuente(tablas=("ventas", "detalle_ventas"))
+def _detalle_ventas(base: Path, desde: str = "", hasta: str = "", id_producto: Tuple[int, ...] = (),
+                    medio_pago: Tuple[str, ...] = ()) -> Lotes:
+    """Líneas de `detalle_ventas`, filtradas por fecha y medio de pago de la venta, y por producto."""
+    ventas_ids = None
+    if desde or hasta or medio_pago:
+        # Solo se cargan las columnas de ventas necesarias para resolver el filtro.
+        ventas = datos.cargar_tabla("ventas", base, ["id_venta", "fecha", "medio_pago"], compacta=True)
+        mascara = pd.Series(True, index=ventas.index)
+        if desde:
+            mascara &= ventas["fecha"] >= pd.Timestamp(desde)
+        if hasta:
+            mascara &= ventas["fecha"] <= pd.Timestamp(hasta)
+        if medio_pago:
+            mascara &= ventas["medio_pago"].isin(list(medio_pago))
+        ventas_ids = pa.array(ventas.loc[mascara, "id_venta"].to_numpy(), type=pa.int64())
+    productos = pa.array([int(p) for p in id_producto], type=pa.int64()) if id_producto else None
+
+    lotes = datos.lotes_cache("detalle_ventas", base, filas=FILAS_LOTE)
+    primero = next(lotes, None)
+    if primero is None:
+        return pa.schema([]), iter(())
+    lotes = itertools.chain([primero], lotes)
+
+    def filtrados() -> Iterator[pa.RecordBatch]:
+        for lote in lotes:
+            mascara = None
+            if ventas_ids is not None:
+                mascara = pc.is_in(lote["id_venta"].cast(pa.int64()), value_set=ventas_ids)
+            if productos is not None:
+                del_producto = pc.is_in(lote["id_producto"].cast(pa.int64()), value_set=productos)
+                mascara = del_producto if mascara is None else pc.and_(mascara, del_producto)
+            yield lote if mascara is None else lote.filter(mascara)
+
+    return primero.schema, filtrados()
+
+
+# --------------------------------------
+# Escritura
+# --------------------------------------
+def _plano(esquema: pa.Schema) -> pa.Schema:
+    # Las categorías (diccionarios) se escriben como texto: CSV no las admite y cada
+    # lote puede traer un diccionario distinto.
+    campos = [pa.field(c.name, c.type.value_type if pa.types.is_dictionary(c.type) else c.type) for c in esquema]
+    return pa.schema(campos)
+
+
+def escribir(lotes: Lotes, destino: Path, formato: str) -> int:
+    """Escribe los lotes en `destino` con el `formato` pedido; devuelve las filas escritas."""
+    esquema, iterador = lotes
+    esquema = _plano(esquema)
+    filas = 0
+    with contextlib.ExitStack() as pila:
+        if formato == "parquet":
+            escritor = pila.enter_context(pq.ParquetWriter(str(destino), esquema))
+        else:
+            salida = pila.enter_context(pa.OSFile(str(destino), "wb"))
+            if formato == "csv.gz":
+                salida = pila.enter_context(pa.CompressedOutputStream(salida, "gzip"))
+            escritor = pila.enter_context(pa_csv.CSVWriter(salida, esquema))
+        for lote in iterador:
+            if lote.num_rows:
+                escritor.write_batch(lote.cast(esquema))
+                filas += lote.num_rows
+    return filas
+
+
+# --------------------------------------
+# Caché de archivos y trabajo en segundo plano
+# --------------------------------------
+_ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aurelion-exportar")
+_en_curso: Dict[Path, Future] = {}
+_lock = threading.Lock()
+
+
+@dataclass
+class Exportacion:
+    fuente: str
+    formato: str
+    parametros: Dict[str, Any]
+    base: Path
+    ruta: Path
+    trabajo: Optional[Future] = None   # None: el archivo ya estaba en la caché
+
+    @property
+    def lista(self) -> bool:
+        return self.trabajo is None or self.trabajo.done()
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        return self.trabajo.exception() if self.trabajo is not None and self.trabajo.done() else None
+
+    @property
+    def nombre_archivo(self) -> str:
+        return f"aurelion_{self.fuente}.{FORMATOS[self.formato][0]}"
+
+    @property
+    def mime(self) -> str:
+        return FORMATOS[self.formato][1]
+
+    def resultado(self, timeout: Optional[float] = None) -> Path:
+        """Ruta del archivo generado (espera al trabajo si hace falta)."""
+        if self.trabajo is not None:
+            self.trabajo.result(timeout)
+        return self.ruta
+
+    def leer(self) -> BinaryIO:
+        """El archivo abierto en modo binario (lo cierra quien lo lee).
+
+        Si la caché lo borró mientras tanto, se vuelve a generar. Abierto, el
+        archivo sigue legible aunque `_recortar` lo borre después.
+        """
+        ruta = self.resultado()
+        if not ruta.exists():
+            ruta = solicitar(self.fuente, self.formato, self.base, **self.parametros).resultado()
+        return open(ruta, "rb")
+
+
+def _clave(nombre: str, formato: str, base: Path, parametros: Dict[str, Any]) -> str:
+    version = datos.version_datos(base, FUENTES[nombre].tablas)
+    texto = json.dumps([nombre, formato, str(Path(base).resolve()), version, sorted(parametros.items())],
+                       default=str)
+    return hashlib.sha256(texto.encode()).hexdigest()[:16]
+
+
+def _recortar(conservar: Path) -> None:
+    """Borra los archivos menos usados (salvo `conservar`) hasta que la caché entre en `MAX_BYTES`."""
+    archivos = []
+    for path in EXPORT_DIR.glob("*"):
+        with contextlib.suppress(FileNotFoundError):
+            estado = path.stat()
+            if not path.name.startswith("."):
+                archivos.append((estado.st_mtime, estado.st_size, path))
+    total = sum(tamano for _, tamano, _ in archivos)
+    for _, tamano, path in sorted(archivos):
+        if total <= MAX_BYTES:
+            break
+        with _lock:
+            if path == conservar or path in _en_curso:
+                continue
+        with contextlib.suppress(FileNotFoundError):
+            path.unlink()
+        total -= tamano
+
+
+def _generar(nombre: str, formato: str, base: Path, parametros: Dict[str, Any], ruta: Path) -> Path:
+    tmp = ruta.with_name(f".{ruta.name}.{threading.get_ident()}.tmp")
+    try:
+        with perfil.tramo(f"exportar.{nombre}", "calculo", formato=formato):
+            escribir(FUENTES[nombre].generar(base, **parametros), tmp, formato)
+        os.replace(tmp, ruta)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            tmp.unlink()
+        with _lock:
+            _en_curso.pop(ruta, None)
+    _recortar(conservar=ruta)
+    return ruta
+
+
+def solicitar(nombre: str, formato: str = "csv", base: Path = datos.BD_PATH, **parametros) -> Exportacion:
+    """Pide la exportación de la fuente `nombre`; la genera en segundo plano si no está en la caché.
+
+    Los parámetros pueden venir como texto (`desde="2024-01-01"`,
+    `medio_pago="tarjeta,efectivo"`): se convierten según la firma de la fuente.
+    """
+    if nombre not in FUENTES:
+        raise KeyError(f"Fuente de exportación desconocida: {nombre} (opciones: {', '.join(sorted(FUENTES))})")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato} (opciones: {', '.join(FORMATOS)})")
+    textos = {k: v for k, v in parametros.items() if isinstance(v, str)}
+    parametros = {**parametros, **api.convertir_parametros(FUENTES[nombre].generar, textos)}
+    ruta = EXPORT_DIR / f"{nombre}-{_clave(nombre, formato, base, parametros)}.{FORMATOS[formato][0]}"
+    pedido = Exportacion(nombre, formato, parametros, base, ruta)
+    with _lock:
+        if ruta in _en_curso:
+            perfil.contar("exportar.compartidas")
+            pedido.trabajo = _en_curso[ruta]
+            return pedido
+        if ruta.exists():
+            perfil.contar("exportar.aciertos")
+            os.utime(ruta)   # más reciente para `_recortar`
+            return pedido
+        perfil.contar("exportar.fallos")
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        pedido.trabajo = _en_curso[ruta] = _ejecutor.submit(_generar, nombre, formato, base, parametros, ruta)
+    return pedido
+
+
+def exportar(nombre: str, formato: str = "csv", base: Path = datos.BD_PATH, **parametros) -> Path:
+    """`solicitar` y esperar: ruta del archivo exportado."""
+    return solicitar(nombre, formato, base, **parametros).resultado()
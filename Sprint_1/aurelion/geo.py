@@ -0,0 +1,277 @@
+"""Índice espacial de clientes (latitud/longitud) con ventas por celda.
+
+Los clientes se ubican en una grilla regular de celdas de `CELDA_KM` de lado
+(proyección equirectangular centrada en los datos) y se ordenan por celda:
+los clientes de una celda quedan contiguos y su rango se encuentra con
+`searchsorted`, como los índices de `aurelion.estrella`. Cada cliente lleva
+sus ventas e importe totales, así que:
+
+- `en_radio` / `en_rectangulo` recorren solo las celdas que tocan la zona
+  pedida y filtran esos candidatos con la distancia exacta (haversine).
+- `densidad` da ventas, importe y clientes por celda (para mapas de calor).
+- `tesela` arma la grilla de una tesela de mapa web (z/x/y, Web Mercator) y
+  `teselas` el resumen de las teselas con datos en un zoom.
+
+Todo es vectorizado con NumPy. El índice se guarda en `BD/.cache/geo-<version>/`
+y se actualiza por delta cuando solo se anexan ventas (`aurelion.incremental`).
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from aurelion import datos, incremental, perfil
+from aurelion.estrella import posiciones
+
+CELDA_KM = 2.0
+RADIO_TIERRA_KM = 6371.0088
+KM_POR_GRADO = np.pi * RADIO_TIERRA_KM / 180
+
+# Arrays del índice, en orden de celda.
+ARRAYS = ("id_cliente", "latitud", "longitud", "celda", "ventas", "importe")
+
+
+@dataclass
+class IndiceGeo:
+    lat0: float              # esquina suroeste de la grilla
+    lon0: float
+    paso_lat: float          # grados por celda
+    paso_lon: float
+    columnas: int
+    id_cliente: np.ndarray
+    latitud: np.ndarray
+    longitud: np.ndarray
+    celda: np.ndarray        # fila * columnas + columna, ordenado
+    ventas: np.ndarray       # ventas por cliente
+    importe: np.ndarray      # importe total por cliente
+
+    def fila_columna(self, lat, lon):
+        fila = np.floor((np.asarray(lat) - self.lat0) / self.paso_lat).astype(np.int64)
+        columna = np.floor((np.asarray(lon) - self.lon0) / self.paso_lon).astype(np.int64)
+        return fila, columna
+
+    def candidatos(self, lat_min: float, lon_min: float, lat_max: float, lon_max: float) -> np.ndarray:
+        """Posiciones de los clientes de las celdas que tocan el rectángulo."""
+        filas_max = int(self.celda[-1] // self.columnas) if len(self.celda) else -1
+        f0, c0 = self.fila_columna(lat_min, lon_min)
+        f1, c1 = self.fila_columna(lat_max, lon_max)
+        f0, f1 = max(int(f0), 0), min(int(f1), filas_max)
+        c0, c1 = max(int(c0), 0), min(int(c1), self.columnas - 1)
+        if f0 > f1 or c0 > c1:
+            return np.empty(0, dtype=np.int64)
+        # En cada fila de la grilla las celdas c0..c1 son contiguas en `celda`.
+        filas = np.arange(f0, f1 + 1, dtype=np.int64) * self.columnas
+        inicios = np.searchsorted(self.celda, filas + c0, side="left")
+        fines = np.searchsorted(self.celda, filas + c1, side="right")
+        largos = fines - inicios
+        total = int(largos.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        # Concatenación vectorizada de los rangos [inicio, fin).
+        desplazamiento = np.repeat(inicios - np.cumsum(largos) + largos, largos)
+        return np.arange(total, dtype=np.int64) + desplazamiento
+
+
+def distancia_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Distancia haversine en km (vectorizada)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+# --------------------------------------
+# Construcción
+# --------------------------------------
+def _medidas_por_cliente(ids: np.ndarray, ventas: pd.DataFrame, detalle: pd.DataFrame):
+    """Ventas e importe de cada cliente de `ids` (bincount sobre las posiciones de las claves)."""
+    venta_cliente = posiciones(ids, ventas["id_cliente"].to_numpy())
+    linea_venta = posiciones(ventas["id_venta"].to_numpy(), detalle["id_venta"].to_numpy())
+    linea_cliente = np.where(linea_venta < 0, -1, venta_cliente[linea_venta])
+    validas, lineas = venta_cliente >= 0, linea_cliente >= 0
+    n = np.bincount(venta_cliente[validas], minlength=len(ids)).astype(np.int64)
+    importe = np.bincount(linea_cliente[lineas], weights=detalle["importe"].to_numpy()[lineas], minlength=len(ids))
+    return n, importe
+
+
+@perfil.medido()
+def construir_indice(clientes: pd.DataFrame, ventas: pd.DataFrame, detalle_ventas: pd.DataFrame,
+                     celda_km: float = CELDA_KM) -> IndiceGeo:
+    """Índice de los clientes con coordenadas (los que no tienen quedan fuera)."""
+    con_coordenadas = clientes["latitud"].notna() & clientes["longitud"].notna()
+    geo = clientes.loc[con_coordenadas, ["id_cliente", "latitud", "longitud"]]
+    lat, lon = geo["latitud"].to_numpy(dtype=float), geo["longitud"].to_numpy(dtype=float)
+    lat0 = float(lat.min()) if len(lat) else 0.0
+    lon0 = float(lon.min()) if len(lon) else 0.0
+    paso_lat = celda_km / KM_POR_GRADO
+    # Un grado de longitud mide menos lejos del ecuador: se usa la latitud media.
+    paso_lon = celda_km / (KM_POR_GRADO * max(np.cos(np.radians(lat.mean() if len(lat) else 0.0)), 1e-6))
+    columnas = int((lon.max() - lon0) // paso_lon) + 1 if len(lon) else 1
+
+    indice = IndiceGeo(lat0, lon0, paso_lat, paso_lon, columnas, *(np.empty(0),) * 6)
+    fila, columna = indice.fila_columna(lat, lon)
+    celda = fila * columnas + columna
+    orden = np.argsort(celda, kind="stable")
+    ids = geo["id_cliente"].to_numpy()[orden]
+    n, importe = _medidas_por_cliente(ids, ventas, detalle_ventas)
+    indice.id_cliente, indice.latitud, indice.longitud = ids, lat[orden], lon[orden]
+    indice.celda, indice.ventas, indice.importe = celda[orden], n, importe
+    return indice
+
+
+def actualizar_indice(indice: IndiceGeo, ventas_nuevas: pd.DataFrame, detalle_nuevo: pd.DataFrame) -> IndiceGeo:
+    """Suma a cada cliente las ventas nuevas (con su detalle); la grilla no cambia."""
+    n, importe = _medidas_por_cliente(indice.id_cliente, ventas_nuevas, detalle_nuevo)
+    return IndiceGeo(indice.lat0, indice.lon0, indice.paso_lat, indice.paso_lon, indice.columnas,
+                     indice.id_cliente, indice.latitud, indice.longitud, indice.celda,
+                     indice.ventas + n, indice.importe + importe)
+
+
+def _guardar(indice: IndiceGeo, carpeta: Path) -> None:
+    for nombre in ARRAYS:
+        np.save(carpeta / f"{nombre}.npy", getattr(indice, nombre))
+    grilla = {k: getattr(indice, k) for k in ("lat0", "lon0", "paso_lat", "paso_lon", "columnas")}
+    (carpeta / "grilla.json").write_text(json.dumps(grilla), encoding="utf-8")
+
+
+def _leer(carpeta: Path) -> IndiceGeo:
+    grilla = json.loads((carpeta / "grilla.json").read_text(encoding="utf-8"))
+    return IndiceGeo(**grilla, **{n: np.load(carpeta / f"{n}.npy", mmap_mode="r") for n in ARRAYS})
+
+
+def _actualizar(indice: IndiceGeo, deltas: Dict[str, pd.DataFrame], base: Path) -> Optional[IndiceGeo]:
+    # Clientes nuevos cambian la grilla: se reconstruye.
+    if not deltas["clientes"].empty or not incremental.ventas_completas(deltas):
+        return None
+    return actualizar_indice(indice, deltas["ventas"], deltas["detalle_ventas"])
+
+
+AGREGADO = incremental.Agregado(
+    nombre="geo",
+    tablas=("clientes", "ventas", "detalle_ventas"),
+    construir=lambda base: construir_indice(
+        datos.cargar_tabla("clientes", base, ["id_cliente", "latitud", "longitud"]),
+        datos.cargar_tabla("ventas", base, ["id_venta", "id_cliente"]),
+        datos.cargar_tabla("detalle_ventas", base, ["id_venta", "importe"])),
+    actualizar=_actualizar,
+    guardar=_guardar,
+    leer=_leer,
+)
+
+
+@perfil.medido(categoria="carga")
+def cargar_indice(base: Path = datos.BD_PATH) -> IndiceGeo:
+    """Índice de la versión de datos actual: leído de disco, actualizado por delta o construido."""
+    return incremental.cargar(AGREGADO, base)
+
+
+# --------------------------------------
+# Consultas
+# --------------------------------------
+def _clientes(indice: IndiceGeo, pos: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id_cliente": indice.id_cliente[pos],
+        "latitud": indice.latitud[pos],
+        "longitud": indice.longitud[pos],
+        "ventas": indice.ventas[pos],
+        "importe": indice.importe[pos],
+    })
+
+
+@perfil.medido()
+def en_rectangulo(indice: IndiceGeo, lat_min: float, lon_min: float, lat_max: float, lon_max: float) -> pd.DataFrame:
+    """Clientes dentro del rectángulo (bordes incluidos), con sus ventas e importe."""
+    pos = indice.candidatos(lat_min, lon_min, lat_max, lon_max)
+    lat, lon = indice.latitud[pos], indice.longitud[pos]
+    dentro = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+    return _clientes(indice, pos[dentro])
+
+
+@perfil.medido()
+def en_radio(indice: IndiceGeo, lat: float, lon: float, km: float) -> pd.DataFrame:
+    """Clientes a `km` o menos de (lat, lon), del más cercano al más lejano, con `distancia_km`."""
+    dlat = km / KM_POR_GRADO
+    # Rectángulo que contiene al círculo: el grado de longitud más corto es el del borde más alejado del ecuador.
+    lat_borde = min(abs(lat) + dlat, 89.9)
+    dlon = km / (KM_POR_GRADO * np.cos(np.radians(lat_borde)))
+    pos = indice.candidatos(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+    distancia = distancia_km(lat, lon, indice.latitud[pos], indice.longitud[pos])
+    dentro = distancia <= km
+    resultado = _clientes(indice, pos[dentro])
+    resultado["distancia_km"] = distancia[dentro]
+    return resultado.sort_values("distancia_km", kind="stable").reset_index(drop=True)
+
+
+def totales(clientes: pd.DataFrame) -> Dict[str, float]:
+    """Clientes, ventas e importe de un resultado de `en_radio` / `en_rectangulo`."""
+    return {"clientes": int(len(clientes)), "ventas": int(clientes["ventas"].sum()),
+            "importe": float(clientes["importe"].sum())}
+
+
+@perfil.medido()
+def densidad(indice: IndiceGeo) -> pd.DataFrame:
+    """Clientes, ventas e importe por celda con datos, con el centro de cada celda."""
+    celdas, inicio, clientes = np.unique(indice.celda, return_index=True, return_counts=True)
+    if len(celdas) == 0:
+        return pd.DataFrame(columns=["celda", "latitud", "longitud", "clientes", "ventas", "importe"])
+    fila, columna = np.divmod(celdas, indice.columnas)
+    return pd.DataFrame({
+        "celda": celdas,
+        "latitud": indice.lat0 + (fila + 0.5) * indice.paso_lat,
+        "longitud": indice.lon0 + (columna + 0.5) * indice.paso_lon,
+        "clientes": clientes,
+        "ventas": np.add.reduceat(np.asarray(indice.ventas), inicio),
+        "importe": np.add.reduceat(np.asarray(indice.importe), inicio),
+    })
+
+
+# --------------------------------------
+# Teselas (Web Mercator, esquema z/x/y de los mapas web)
+# --------------------------------------
+def _mercator(lat, lon, zoom: int):
+    """Coordenadas de tesela (fraccionarias) de cada punto en el nivel `zoom`."""
+    n = 2 ** zoom
+    lat = np.radians(np.clip(lat, -85.05112878, 85.05112878))
+    x = (np.asarray(lon) + 180.0) / 360.0 * n
+    y = (1.0 - np.arcsinh(np.tan(lat)) / np.pi) / 2.0 * n
+    return x, y
+
+
+def limites_tesela(zoom: int, x: int, y: int):
+    """(lat_min, lon_min, lat_max, lon_max) de la tesela."""
+    n = 2 ** zoom
+    lon_min, lon_max = x / n * 360.0 - 180.0, (x + 1) / n * 360.0 - 180.0
+    lat_max = float(np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y / n)))))
+    lat_min = float(np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + 1) / n)))))
+    return lat_min, lon_min, lat_max, lon_max
+
+
+@perfil.medido()
+def tesela(indice: IndiceGeo, zoom: int, x: int, y: int, medida: str = "ventas",
+           resolucion: int = 64) -> np.ndarray:
+    """Grilla `resolucion` × `resolucion` con la suma de `medida` por píxel de la tesela z/x/y.
+
+    `medida` es "ventas", "importe" o "clientes". La fila 0 es el borde norte.
+    """
+    pos = indice.candidatos(*limites_tesela(zoom, x, y))
+    tx, ty = _mercator(indice.latitud[pos], indice.longitud[pos], zoom)
+    px = np.floor((tx - x) * resolucion).astype(np.int64)
+    py = np.floor((ty - y) * resolucion).astype(np.int64)
+    dentro = (px >= 0) & (px < resolucion) & (py >= 0) & (py < resolucion)
+    pesos = None if medida == "clientes" else np.asarray(getattr(indice, medida))[pos][dentro]
+    plano = np.bincount(py[dentro] * resolucion + px[dentro], weights=pesos, minlength=resolucion * resolucion)
+    return plano.reshape(resolucion, resolucion)
+
+
+@perfil.medido()
+def teselas(indice: IndiceGeo, zoom: int) -> pd.DataFrame:
+    """Teselas con datos en el nivel `zoom` y sus totales (para pedir solo esas)."""
+    tx, ty = _mercator(indice.latitud, indice.longitud, zoom)
+    df = pd.DataFrame({"x": np.floor(tx).astype(np.int64), "y": np.floor(ty).astype(np.int64),
+                       "ventas": indice.ventas, "importe": indice.importe})
+    return (df.groupby(["x", "y"], sort=True)
+            .agg(clientes=("ventas", "size"), ventas=("ventas", "sum"), importe=("importe", "sum"))
+            .reset_index())
@@ -0,0 +1,141 @@
+"""Agregados que se actualizan por delta cuando las tablas solo crecen.
+
+Cada `Agregado` se guarda en `BD/.cache/<nombre>-<version>/` (la versión es
+la de sus tablas, `datos.version_datos(base, tablas)`) junto con `origen.json`,
+el sha256 de cada fuente con el que se calculó. Al pedirlo con `cargar`:
+
+1. Si ya existe la carpeta de la versión actual, se lee.
+2. Si no, se busca una versión anterior desde la que las tablas solo
+   recibieron anexos (`datos.filas_anexadas`) y se le aplica el delta con
+   `actualizar`: el costo depende de las filas nuevas, no del historial.
+3. Si no hay ninguna (o `actualizar` no puede con ese delta), se recalcula
+   completo con `construir`.
+
+Los pasos 2 y 3 se hacen con `datos.bloqueo(nombre)`: si otro hilo o proceso
+está calculando la misma versión, se espera y se lee la suya.
+
+Un delta es aplicable cuando las ventas nuevas llegan con su detalle: las
+líneas anexadas a `detalle_ventas` pertenecen a ventas anexadas en el mismo
+delta (ver `ventas_completas`).
+
+Los agregados se declaran junto a su cálculo: `cubo.AGREGADO`, y
+`api.AGREGADO_RFM` / `api.AGREGADO_PAGOS`.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from aurelion import datos, perfil
+
+ORIGEN = "origen.json"
+
+
+@dataclass
+class Agregado:
+    nombre: str
+    tablas: Tuple[str, ...]
+    construir: Callable[[Path], Any]
+    # (estado previo, filas anexadas por tabla, base) -> estado nuevo, o None si hay que reconstruir.
+    actualizar: Callable[[Any, Dict[str, pd.DataFrame], Path], Optional[Any]]
+    guardar: Callable[[Any, Path], None]
+    leer: Callable[[Path], Any]
+    # Subirlo cuando cambia lo que escribe `guardar`: lo guardado con otro formato ni se lee ni se actualiza.
+    formato: int = 1
+
+    def version(self, version_datos: str) -> str:
+        """Versión de la carpeta: la de los datos, más el formato si no es el primero."""
+        return version_datos if self.formato == 1 else f"{version_datos}.f{self.formato}"
+
+
+def ventas_completas(deltas: Dict[str, pd.DataFrame]) -> bool:
+    """True si todas las líneas nuevas de detalle son de ventas nuevas."""
+    ventas, detalle = deltas.get("ventas"), deltas.get("detalle_ventas")
+    if detalle is None or detalle.empty:
+        return True
+    if ventas is None:
+        return False
+    return bool(detalle["id_venta"].isin(ventas["id_venta"]).all())
+
+
+def _deltas(agregado: Agregado, origen: Dict[str, Dict[str, str]], huellas: Dict[str, Dict[str, str]],
+            base: Path) -> Optional[Dict[str, pd.DataFrame]]:
+    deltas = {}
+    for tabla in agregado.tablas:
+        previa = origen.get(tabla, {})
+        if previa.get("esquema") != huellas[tabla]["esquema"]:
+            return None
+        delta = datos.filas_anexadas(tabla, previa.get("sha256", ""), base)
+        if delta is None:
+            return None
+        deltas[tabla] = delta
+    return deltas
+
+
+def _guardar(agregado: Agregado, estado: Any, carpeta: Path, huellas: Dict[str, Dict[str, str]]) -> None:
+    def escribir(tmp: Path) -> None:
+        agregado.guardar(estado, tmp)
+        (tmp / ORIGEN).write_text(json.dumps({**huellas, "formato": agregado.formato}), encoding="utf-8")
+
+    datos.publicar_carpeta(carpeta, escribir)
+
+
+def cargar(agregado: Agregado, base: Path = datos.BD_PATH,
+           construir: Optional[Callable[[Path], Any]] = None) -> Any:
+    """Estado de `agregado` para los datos actuales: leído, actualizado por delta o recalculado.
+
+    `construir` reemplaza al de `agregado` para el recálculo completo (p. ej.
+    con una estrella que ya está en memoria).
+    """
+    version = agregado.version(datos.version_datos(base, agregado.tablas))
+    carpeta = datos.dir_version(agregado.nombre, version, base)
+    if (carpeta / ORIGEN).exists():
+        perfil.contar(f"{agregado.nombre}.aciertos")
+        return agregado.leer(carpeta)
+    with datos.bloqueo(agregado.nombre, base):
+        # Otro hilo o proceso pudo publicarla mientras se esperaba el bloqueo.
+        if (carpeta / ORIGEN).exists():
+            perfil.contar(f"{agregado.nombre}.aciertos")
+            return agregado.leer(carpeta)
+        return _recalcular(agregado, base, construir, version, carpeta)
+
+
+def _recalcular(agregado: Agregado, base: Path, construir: Optional[Callable[[Path], Any]],
+                version: str, carpeta: Path) -> Any:
+    perfil.contar(f"{agregado.nombre}.fallos")
+    huellas = {t: datos.huella_tabla(t, base) for t in agregado.tablas}
+    estado = None
+    previas = [p for p in (base / datos.CACHE_DIRNAME).glob(f"{agregado.nombre}-*") if (p / ORIGEN).exists()]
+    for previa in sorted(previas, key=lambda p: p.stat().st_mtime, reverse=True):
+        origen = json.loads((previa / ORIGEN).read_text(encoding="utf-8"))
+        if origen.get("formato", 1) != agregado.formato:
+            continue
+        deltas = _deltas(agregado, origen, huellas, base)
+        if deltas is None:
+            continue
+        with perfil.tramo(f"incremental.{agregado.nombre}", "calculo",
+                          filas=sum(len(d) for d in deltas.values())):
+            estado = agregado.actualizar(agregado.leer(previa), deltas, base)
+        if estado is not None:
+            perfil.contar("incremental.deltas")
+            break
+    if estado is None:
+        perfil.contar("incremental.completos")
+        estado = (construir or agregado.construir)(base)
+
+    _guardar(agregado, estado, carpeta, huellas)
+    datos.descartar_versiones(agregado.nombre, version, base)
+    return estado
+
+
+def guardar_tabla(df: pd.DataFrame, carpeta: Path) -> None:
+    """`guardar` para agregados que son un DataFrame (con su índice con nombre, si lo tiene)."""
+    datos.guardar_arrow(df.reset_index() if df.index.name else df, carpeta / "tabla.arrow")
+
+
+def leer_tabla(carpeta: Path, indice: Optional[str] = None) -> pd.DataFrame:
+    df = datos.leer_arrow(carpeta / "tabla.arrow")
+    return df.set_index(indice) if indice else df
@@ -0,0 +1,100 @@
+"""Ingesta en paralelo de las tablas de `BD/` a la caché columnar, con validación.
+
+Las tablas cuya caché está vieja se parsean a la vez en un pool de procesos
+(el parseo de Excel es Python puro y no libera el GIL). Un archivo grande se
+divide con `lectores.particiones` (rangos de bytes en CSV, grupos de filas en
+Parquet) y cada parte se parsea en un proceso distinto, así el tiempo de
+ingesta baja con la cantidad de núcleos.
+
+Si el total a parsear es chico (`UMBRAL_PARALELO`), se hace en el proceso
+actual: levantar procesos cuesta más que leer unos pocos MB. Las tablas cuya
+fuente solo creció no se vuelven a parsear: se anexan las filas nuevas
+(`datos.anexar_cache`).
+
+    python -m aurelion ingerir --procesos 8 --reporte validacion.json
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from aurelion import datos, lectores, perfil, validacion
+from aurelion.esquema import aplicar_esquema
+
+# Debajo de este total de bytes a parsear no se usan procesos.
+UMBRAL_PARALELO = 16 << 20
+
+# Tamaño mínimo de cada parte de un archivo grande.
+PARTE_MIN = 32 << 20
+
+
+@dataclass
+class Ingesta:
+    reporte: validacion.Reporte
+    segundos: Dict[str, float] = field(default_factory=dict)
+    parseadas: List[str] = field(default_factory=list)
+    procesos: int = 1
+
+
+def _partes_por_tabla(fuentes: Dict[str, Path], procesos: int) -> Dict[str, List[lectores.Particion]]:
+    partes = {}
+    for tabla, fuente in fuentes.items():
+        n = min(procesos, max(1, fuente.stat().st_size // PARTE_MIN))
+        partes[tabla] = lectores.particiones(fuente, n)
+    return partes
+
+
+def construir_caches(base: Path = datos.BD_PATH, tablas: Iterable[str] = datos.TABLAS,
+                     procesos: Optional[int] = None) -> List[str]:
+    """Reconstruye en paralelo las cachés viejas de `tablas`. Devuelve las que parseó completas."""
+    fuentes = {}
+    for tabla in tablas:
+        if not datos.cache_vigente(tabla, base) and datos.anexar_cache(tabla, base) is None:
+            fuente = datos.buscar_fuente(tabla, base)
+            if fuente is None:
+                raise FileNotFoundError(f"No se encontró {tabla} ({', '.join(lectores.PRIORIDAD)}) en {base}")
+            fuentes[tabla] = fuente
+    if not fuentes:
+        return []
+
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or sum(f.stat().st_size for f in fuentes.values()) < UMBRAL_PARALELO:
+        for tabla in fuentes:
+            datos.construir_cache(tabla, base)
+        return list(fuentes)
+
+    partes = _partes_por_tabla(fuentes, procesos)
+    # "spawn": seguro aunque el proceso actual tenga hilos (servidor, app).
+    contexto = multiprocessing.get_context("spawn")
+    with perfil.tramo("ingesta.parseo_paralelo", "carga", procesos=procesos, partes=sum(map(len, partes.values()))):
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+            # Primero las partes de los archivos más grandes, para repartir mejor la carga.
+            orden = sorted(fuentes, key=lambda t: fuentes[t].stat().st_size, reverse=True)
+            futuros = {t: [pool.submit(lectores.leer_particion, fuentes[t], t, p) for p in partes[t]] for t in orden}
+            for tabla, lista in futuros.items():
+                trozos = [f.result() for f in lista]
+                df = trozos[0] if len(trozos) == 1 else aplicar_esquema(pd.concat(trozos, ignore_index=True), tabla)
+                datos.construir_cache(tabla, base, df=df)
+    return list(fuentes)
+
+
+def ingerir(base: Path = datos.BD_PATH, procesos: Optional[int] = None, validar: bool = True) -> Ingesta:
+    """Deja la caché columnar al día (en paralelo) y valida las cuatro tablas."""
+    segundos = {}
+    inicio = time.perf_counter()
+    parseadas = construir_caches(base, datos.TABLAS, procesos)
+    segundos["parseo"] = round(time.perf_counter() - inicio, 3)
+
+    reporte = validacion.Reporte()
+    if validar:
+        inicio = time.perf_counter()
+        with perfil.tramo("ingesta.validar", "calculo"):
+            reporte = validacion.validar({t: datos.cargar_tabla(t, base) for t in datos.TABLAS})
+        segundos["validacion"] = round(time.perf_counter() - inicio, 3)
+    return Ingesta(reporte=reporte, segundos=segundos, parseadas=parseadas, procesos=procesos or os.cpu_count() or 1)
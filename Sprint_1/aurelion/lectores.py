@@ -0,0 +1,218 @@
+"""Registro de lectores por formato de archivo.
+
+Cada tabla lógica (`clientes`, `ventas`, ...) se resuelve al primer archivo
+que exista en `BD/` según `PRIORIDAD`, de más rápido a más lento de leer:
+Parquet, CSV, CSV comprimido con gzip y, por último, Excel.
+
+Para sumar un formato alcanza con registrar sus funciones:
+
+    @registrar_lector(".feather")
+    def _leer_feather(fuente, tabla): ...
+
+Los lectores devuelven el DataFrame ya con el esquema de `aurelion.esquema`.
+
+Para leer un archivo grande en paralelo, `particiones` lo divide en partes
+independientes (rangos de bytes en CSV, grupos de filas en Parquet) y
+`leer_particion` lee una; `aurelion.ingesta` las reparte en procesos.
+"""
+
+import csv
+from pathlib import Path
+from typing import Callable, Dict, IO, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from aurelion.esquema import FORMATOS_FECHA, aplicar_esquema, tipos_arrow
+
+Fuente = Union[Path, IO[bytes]]
+Particion = Optional[Tuple[int, int]]
+Lector = Callable[[Fuente, str], pd.DataFrame]
+LectorBloques = Callable[[Fuente, str, int, Optional[List[str]]], Iterator[pd.DataFrame]]
+
+LECTORES: Dict[str, Lector] = {}
+LECTORES_BLOQUES: Dict[str, LectorBloques] = {}
+
+# Orden en que se buscan los archivos de una tabla (el primero que exista gana).
+PRIORIDAD: List[str] = [".parquet", ".csv", ".csv.gz", ".xlsx"]
+
+# Tamaño por defecto de cada bloque en lecturas por partes.
+BLOQUE_BYTES = 64 << 20
+
+
+def registrar_lector(sufijo: str, bloques: Optional[LectorBloques] = None):
+    """Decorador que registra el lector completo (y opcionalmente por bloques) de `sufijo`."""
+    def decorador(func: Lector) -> Lector:
+        LECTORES[sufijo] = func
+        if bloques is not None:
+            LECTORES_BLOQUES[sufijo] = bloques
+        return func
+    return decorador
+
+
+def sufijo_de(nombre: str) -> str:
+    """Sufijo registrado que corresponde a `nombre` (el más largo que coincida)."""
+    nombre = nombre.lower()
+    for suf in sorted(LECTORES, key=len, reverse=True):
+        if nombre.endswith(suf):
+            return suf
+    raise ValueError(f"Formato no soportado: {nombre}")
+
+
+def resolver_fuente(tabla: str, base: Path) -> Optional[Path]:
+    """Primer archivo existente de `tabla` en `base` siguiendo `PRIORIDAD`."""
+    for suf in PRIORIDAD:
+        path = base / f"{tabla}{suf}"
+        if path.exists():
+            return path
+    return None
+
+
+def leer(fuente: Fuente, tabla: str, nombre: Optional[str] = None) -> pd.DataFrame:
+    """Lee `fuente` completa con el lector de su formato."""
+    nombre = nombre or getattr(fuente, "name", str(fuente))
+    return LECTORES[sufijo_de(str(nombre))](fuente, tabla)
+
+
+def leer_por_bloques(fuente: Fuente, tabla: str, bloque_bytes: int = BLOQUE_BYTES,
+                     nombre: Optional[str] = None, columnas: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Itera `fuente` en bloques de aproximadamente `bloque_bytes` en memoria.
+
+    Con `columnas` solo se leen esas columnas. Los formatos sin lector por
+    bloques se leen completos y se trocean.
+    """
+    nombre = nombre or getattr(fuente, "name", str(fuente))
+    suf = sufijo_de(str(nombre))
+    if suf in LECTORES_BLOQUES:
+        yield from LECTORES_BLOQUES[suf](fuente, tabla, bloque_bytes, columnas)
+        return
+    df = LECTORES[suf](fuente, tabla)
+    yield from _trocear(df[columnas] if columnas else df, bloque_bytes)
+
+
+def particiones(fuente: Path, n: int) -> List[Particion]:
+    """Hasta `n` partes de `fuente` que se pueden leer por separado (`None` = archivo completo).
+
+    - CSV: rangos `(inicio, fin)` de bytes cortados en fin de línea (no
+      admite saltos de línea dentro de campos entre comillas).
+    - Parquet: rangos `(inicio, fin)` de grupos de filas.
+    - Otros formatos (xlsx, csv.gz): una sola partición.
+    """
+    suf = sufijo_de(fuente.name)
+    if n <= 1 or suf not in (".csv", ".parquet"):
+        return [None]
+    if suf == ".parquet":
+        grupos = pq.ParquetFile(fuente).metadata.num_row_groups
+        cortes = np.linspace(0, grupos, min(n, grupos) + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(cortes[:-1], cortes[1:]) if b > a] or [None]
+    tam = fuente.stat().st_size
+    with open(fuente, "rb") as f:
+        cortes = [len(f.readline())]
+        for i in range(1, n):
+            f.seek(max(cortes[-1], cortes[0] + (tam - cortes[0]) * i // n))
+            f.readline()
+            if f.tell() >= tam:
+                break
+            if f.tell() > cortes[-1]:
+                cortes.append(f.tell())
+    cortes.append(tam)
+    return [(a, b) for a, b in zip(cortes[:-1], cortes[1:]) if b > a] or [None]
+
+
+def leer_particion(fuente: Path, tabla: str, particion: Particion) -> pd.DataFrame:
+    """Lee una parte de `particiones` con el esquema de `tabla`."""
+    if particion is None:
+        return leer(fuente, tabla)
+    inicio, fin = particion
+    if sufijo_de(fuente.name) == ".parquet":
+        tabla_arrow = pq.ParquetFile(fuente).read_row_groups(list(range(inicio, fin)))
+        return aplicar_esquema(tabla_arrow.to_pandas(), tabla)
+    with open(fuente, "rb") as f:
+        nombres = next(csv.reader([f.readline().decode("utf-8-sig").rstrip("\r\n")]))
+        f.seek(inicio)
+        crudo = f.read(fin - inicio)
+    lectura, conversion = _opciones_csv(tabla)
+    lectura.column_names = [n.strip() for n in nombres]
+    lectura.use_threads = False   # el paralelismo lo ponen los procesos
+    tabla_arrow = pacsv.read_csv(pa.BufferReader(crudo), read_options=lectura, convert_options=conversion)
+    return aplicar_esquema(tabla_arrow.to_pandas(), tabla)
+
+
+def _trocear(df: pd.DataFrame, bloque_bytes: int) -> Iterator[pd.DataFrame]:
+    if df.empty:
+        return
+    bytes_fila = max(1, int(df.memory_usage(deep=True).sum()) // len(df))
+    filas = max(1, bloque_bytes // bytes_fila)
+    for ini in range(0, len(df), filas):
+        yield df.iloc[ini:ini + filas]
+
+
+# --------------------------------------
+# CSV (y CSV.gz): pyarrow, multihilo, BOM y gzip resueltos por el lector
+# --------------------------------------
+def _opciones_csv(tabla: str, bloque_bytes: Optional[int] = None, columnas: Optional[List[str]] = None):
+    lectura = pacsv.ReadOptions(block_size=bloque_bytes) if bloque_bytes else pacsv.ReadOptions()
+    conversion = pacsv.ConvertOptions(column_types=tipos_arrow(tabla), timestamp_parsers=FORMATOS_FECHA,
+                                      include_columns=columnas or [])
+    return lectura, conversion
+
+
+def _abrir(fuente: Fuente, comprimido: bool):
+    origen = str(fuente) if isinstance(fuente, Path) else fuente
+    return pa.input_stream(origen, compression="gzip" if comprimido else None)
+
+
+def _leer_csv_bloques(fuente: Fuente, tabla: str, bloque_bytes: int, columnas: Optional[List[str]] = None,
+                      comprimido: bool = False) -> Iterator[pd.DataFrame]:
+    lectura, conversion = _opciones_csv(tabla, bloque_bytes, columnas)
+    with pacsv.open_csv(_abrir(fuente, comprimido), read_options=lectura, convert_options=conversion) as reader:
+        for batch in reader:
+            yield aplicar_esquema(batch.to_pandas(), tabla)
+
+
+def _leer_csv_gz_bloques(fuente: Fuente, tabla: str, bloque_bytes: int,
+                         columnas: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    return _leer_csv_bloques(fuente, tabla, bloque_bytes, columnas, comprimido=True)
+
+
+@registrar_lector(".csv", bloques=_leer_csv_bloques)
+def _leer_csv(fuente: Fuente, tabla: str) -> pd.DataFrame:
+    lectura, conversion = _opciones_csv(tabla)
+    tabla_arrow = pacsv.read_csv(_abrir(fuente, False), read_options=lectura, convert_options=conversion)
+    return aplicar_esquema(tabla_arrow.to_pandas(), tabla)
+
+
+@registrar_lector(".csv.gz", bloques=_leer_csv_gz_bloques)
+def _leer_csv_gz(fuente: Fuente, tabla: str) -> pd.DataFrame:
+    lectura, conversion = _opciones_csv(tabla)
+    tabla_arrow = pacsv.read_csv(_abrir(fuente, True), read_options=lectura, convert_options=conversion)
+    return aplicar_esquema(tabla_arrow.to_pandas(), tabla)
+
+
+# --------------------------------------
+# Parquet
+# --------------------------------------
+def _leer_parquet_bloques(fuente: Fuente, tabla: str, bloque_bytes: int,
+                          columnas: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    archivo = pq.ParquetFile(fuente)
+    meta = archivo.metadata
+    filas = meta.num_rows or 1
+    bytes_fila = max(1, sum(meta.row_group(i).total_byte_size for i in range(meta.num_row_groups)) // filas)
+    for batch in archivo.iter_batches(batch_size=max(1, bloque_bytes // bytes_fila), columns=columnas):
+        yield aplicar_esquema(batch.to_pandas(), tabla)
+
+
+@registrar_lector(".parquet", bloques=_leer_parquet_bloques)
+def _leer_parquet(fuente: Fuente, tabla: str) -> pd.DataFrame:
+    return aplicar_esquema(pq.read_table(fuente).to_pandas(), tabla)
+
+
+# --------------------------------------
+# Excel (openpyxl): el más lento, sin lectura por bloques
+# --------------------------------------
+@registrar_lector(".xlsx")
+def _leer_xlsx(fuente: Fuente, tabla: str) -> pd.DataFrame:
+    return aplicar_esquema(pd.read_excel(fuente), tabla)
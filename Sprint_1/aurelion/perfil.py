@@ -0,0 +1,214 @@
+"""Instrumentación liviana: tramos con tiempo y memoria, y contadores.
+
+Las funciones de carga y agregación del paquete marcan sus pasos con
+`perfil.tramo(...)` y sus aciertos/fallos de caché con `perfil.contar(...)`.
+Si no hay un `Perfilador` activo en el hilo/contexto actual, no registran
+nada (el costo es una consulta a una `ContextVar`).
+
+    p = perfil.Perfilador()
+    with perfil.perfilando(p):
+        api.top_clientes(10)
+    p.tabla()                  # DataFrame de tramos (ms, propio_ms, memoria)
+    p.chrome_trace()           # JSON para chrome://tracing o ui.perfetto.dev
+
+Además, cada tramo terminado se emite como JSON en el logger
+`aurelion.perfil` con nivel DEBUG (registros estructurados para producción).
+
+La memoria es la residente del proceso (RSS): en un servidor con varias
+sesiones simultáneas, el delta de un tramo incluye lo que hicieron los otros
+hilos mientras tanto.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import resource
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_log = logging.getLogger("aurelion.perfil")
+
+_activo: contextvars.ContextVar = contextvars.ContextVar("aurelion_perfilador", default=None)
+_padre: contextvars.ContextVar = contextvars.ContextVar("aurelion_tramo_padre", default=-1)
+
+
+def rss_bytes() -> int:
+    """Memoria residente actual del proceso (0 si no se puede leer)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return 0
+
+
+@dataclass
+class Tramo:
+    nombre: str
+    categoria: str
+    inicio: float            # segundos desde el origen del perfilador
+    duracion: float = 0.0    # segundos
+    memoria: int = 0         # delta de RSS en bytes
+    hilo: int = 0
+    padre: int = -1          # índice del tramo contenedor en `Perfilador.tramos`
+    atributos: Dict[str, Any] = field(default_factory=dict)
+
+
+class Perfilador:
+    """Colecciona tramos y contadores de una ejecución (p. ej. un rerun de la app)."""
+
+    def __init__(self, nombre: str = "aurelion") -> None:
+        self.nombre = nombre
+        self.origen = time.perf_counter()
+        self.epoca = time.time()
+        self.tramos: List[Tramo] = []
+        self.contadores: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _abrir(self, tramo: Tramo) -> int:
+        with self._lock:
+            self.tramos.append(tramo)
+            return len(self.tramos) - 1
+
+    def contar(self, nombre: str, n: int = 1) -> None:
+        with self._lock:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + n
+
+    def total(self) -> float:
+        """Segundos transcurridos desde que se creó el perfilador."""
+        return time.perf_counter() - self.origen
+
+    def tabla(self) -> "pd.DataFrame":
+        """Un tramo por fila, en orden de inicio, con el tiempo propio (sin hijos)."""
+        import pandas as pd  # diferido: las páginas estáticas de la app no cargan pandas
+
+        columnas = ["tramo", "categoria", "inicio_ms", "ms", "propio_ms", "memoria_mb", "nivel"]
+        if not self.tramos:
+            return pd.DataFrame(columns=columnas)
+        df = pd.DataFrame([asdict(t) for t in self.tramos])
+        hijos = df[df["padre"] >= 0].groupby("padre")["duracion"].sum()
+        nivel = [0] * len(df)
+        for i, padre in enumerate(df["padre"]):
+            nivel[i] = nivel[padre] + 1 if padre >= 0 else 0
+        return pd.DataFrame({
+            "tramo": ["  " * n + nombre for n, nombre in zip(nivel, df["nombre"])],
+            "categoria": df["categoria"],
+            "inicio_ms": (df["inicio"] * 1000).round(1),
+            "ms": (df["duracion"] * 1000).round(2),
+            "propio_ms": ((df["duracion"] - hijos.reindex(df.index, fill_value=0.0)) * 1000).round(2),
+            "memoria_mb": (df["memoria"] / 2**20).round(2),
+            "nivel": nivel,
+        })
+
+    def resumen(self) -> "pd.DataFrame":
+        """Tiempo acumulado por nombre de tramo, de mayor a menor."""
+        tabla = self.tabla()
+        tabla["tramo"] = tabla["tramo"].str.strip()
+        return (tabla.groupby(["tramo", "categoria"], sort=False)
+                .agg(llamadas=("ms", "size"), ms=("ms", "sum"), propio_ms=("propio_ms", "sum"),
+                     memoria_mb=("memoria_mb", "sum"))
+                .sort_values("propio_ms", ascending=False).reset_index())
+
+    def registros(self) -> List[Dict[str, Any]]:
+        """Tramos como registros estructurados (uno por tramo) con marca de tiempo absoluta."""
+        return [
+            {"ts": self.epoca + t.inicio, "tramo": t.nombre, "categoria": t.categoria,
+             "ms": round(t.duracion * 1000, 3), "memoria_bytes": t.memoria, "hilo": t.hilo,
+             "padre": t.padre, **t.atributos}
+            for t in self.tramos
+        ]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Formato Trace Event (chrome://tracing, Perfetto): tramos "X" y contadores "C"."""
+        pid = os.getpid()
+        eventos = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.nombre}}]
+        for t in self.tramos:
+            eventos.append({"name": t.nombre, "cat": t.categoria, "ph": "X", "pid": pid, "tid": t.hilo,
+                            "ts": round(t.inicio * 1e6, 1), "dur": round(t.duracion * 1e6, 1),
+                            "args": {"memoria_mb": round(t.memoria / 2**20, 3), **t.atributos}})
+        fin = round(self.total() * 1e6, 1)
+        for nombre, valor in self.contadores.items():
+            eventos.append({"name": nombre, "ph": "C", "pid": pid, "ts": fin, "args": {"valor": valor}})
+        return {"traceEvents": eventos, "displayTimeUnit": "ms"}
+
+
+# --------------------------------------
+# API de instrumentación
+# --------------------------------------
+def activo() -> Optional[Perfilador]:
+    return _activo.get()
+
+
+def activar(perfilador: Optional[Perfilador]) -> contextvars.Token:
+    """Hace de `perfilador` el activo en el contexto actual (hasta `desactivar`)."""
+    _padre.set(-1)
+    return _activo.set(perfilador)
+
+
+def desactivar(token: contextvars.Token) -> None:
+    _activo.reset(token)
+
+
+@contextlib.contextmanager
+def perfilando(perfilador: Optional[Perfilador] = None) -> Iterator[Perfilador]:
+    perfilador = perfilador or Perfilador()
+    token = activar(perfilador)
+    try:
+        yield perfilador
+    finally:
+        desactivar(token)
+
+
+@contextlib.contextmanager
+def tramo(nombre: str, categoria: str = "calculo", **atributos: Any) -> Iterator[None]:
+    """Mide el bloque: duración, delta de memoria y tramo contenedor."""
+    perfilador = _activo.get()
+    registrar = _log.isEnabledFor(logging.DEBUG)
+    if perfilador is None and not registrar:
+        yield
+        return
+    if perfilador is None:
+        perfilador = Perfilador()
+    t = Tramo(nombre, categoria, time.perf_counter() - perfilador.origen, hilo=threading.get_ident(),
+              padre=_padre.get(), atributos=atributos)
+    indice = perfilador._abrir(t)
+    token = _padre.set(indice)
+    memoria = rss_bytes()
+    try:
+        yield
+    finally:
+        t.duracion = time.perf_counter() - perfilador.origen - t.inicio
+        t.memoria = rss_bytes() - memoria
+        _padre.reset(token)
+        if registrar:
+            _log.debug(json.dumps({"tramo": nombre, "categoria": categoria, "ms": round(t.duracion * 1000, 3),
+                                   "memoria_bytes": t.memoria, **atributos}, default=str))
+
+
+def contar(nombre: str, n: int = 1) -> None:
+    """Suma `n` al contador `nombre` del perfilador activo (p. ej. "cache.aciertos")."""
+    perfilador = _activo.get()
+    if perfilador is not None:
+        perfilador.contar(nombre, n)
+
+
+def medido(nombre: Optional[str] = None, categoria: str = "calculo") -> Callable:
+    """Decorador: envuelve cada llamada de la función en un tramo."""
+    def decorador(f: Callable) -> Callable:
+        etiqueta = nombre or f"{f.__module__.rsplit('.', 1)[-1]}.{f.__qualname__}"
+
+        @functools.wraps(f)
+        def envoltura(*args, **kwargs):
+            with tramo(etiqueta, categoria):
+                return f(*args, **kwargs)
+
+        return envoltura
+
+    return decorador
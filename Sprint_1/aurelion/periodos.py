@@ -0,0 +1,214 @@
+"""Comparativas entre períodos: deltas, crecimiento, ventanas móviles e interanual.
+
+A partir del cubo diario (`aurelion.cubo`) se arma, una vez por versión de
+datos, un arreglo denso de sumas acumuladas por día para cada porción:
+
+    acumulado[porcion][valor, d, medida] = suma de `medida` en los días [0, d)
+
+con `porcion` en "total", "medio_pago", "categoria" o "ciudad" y las medidas
+de `cubo.MEDIDAS` (ventas, unidades, importe). La suma de cualquier rango de
+fechas es una resta de dos posiciones (O(1) por valor de la porción), así que
+comparar dos rangos arbitrarios o calcular ventanas de 7/30/90 días no vuelve
+a filtrar ni agrupar filas de `ventas`.
+
+- `totales`: medidas de un rango por valor de la porción.
+- `comparar`: rango actual contra otro (por defecto, el de igual largo
+  inmediatamente anterior) con delta y crecimiento %.
+- `interanual`: `comparar` contra el mismo rango un año antes.
+- `ventanas`: sumas móviles por día y su crecimiento interanual.
+
+Como en el cubo, por `categoria` "ventas" cuenta las ventas con al menos una
+línea de la categoría. Los arreglos se guardan en
+`BD/.cache/periodos-<version>/periodos.npz`.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from aurelion import cubo as cubo_mod
+from aurelion import datos, perfil
+
+PORCIONES = ("total", "medio_pago", "categoria", "ciudad")
+VENTANAS = (7, 30, 90)
+
+Fecha = Union[str, date, pd.Timestamp]
+
+
+@dataclass
+class Periodos:
+    version: str
+    inicio: np.datetime64                 # primer día con datos (resolución de día)
+    dias: int
+    valores: Dict[str, np.ndarray]        # porción -> valores (texto), en el orden de `acumulado`
+    acumulado: Dict[str, np.ndarray]      # porción -> (valores, dias + 1, medidas)
+
+    @property
+    def fin(self) -> np.datetime64:
+        return self.inicio + np.timedelta64(max(self.dias - 1, 0), "D")
+
+
+def _dia(fecha: Fecha) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(fecha).date(), "D")
+
+
+def _acumular(tabla: pd.DataFrame, porcion: str, inicio: np.datetime64, dias: int) -> Tuple[np.ndarray, np.ndarray]:
+    dia = (tabla["periodo"].to_numpy("datetime64[D]") - inicio).astype(np.int64)
+    if porcion == "total":
+        codigos, valores = np.zeros(len(tabla), dtype=np.int64), np.array(["total"])
+    else:
+        codigos, valores = pd.factorize(tabla[porcion].astype(str), sort=True)
+        valores = np.asarray(valores, dtype=str)
+    denso = np.zeros((len(valores), dias, len(cubo_mod.MEDIDAS)))
+    np.add.at(denso, (codigos, dia), tabla[cubo_mod.MEDIDAS].to_numpy(dtype=float))
+    acumulado = np.zeros((len(valores), dias + 1, len(cubo_mod.MEDIDAS)))
+    np.cumsum(denso, axis=1, out=acumulado[:, 1:])
+    return valores, acumulado
+
+
+@perfil.medido()
+def construir_periodos(cubo: cubo_mod.Cubo) -> Periodos:
+    ventas, lineas = cubo.ventas["dia"], cubo.lineas["dia"]
+    if ventas.empty:
+        inicio, dias = np.datetime64("1970-01-01", "D"), 0
+    else:
+        fechas = ventas["periodo"].to_numpy("datetime64[D]")
+        inicio, dias = fechas.min(), int((fechas.max() - fechas.min()).astype(np.int64)) + 1
+    valores, acumulado = {}, {}
+    for porcion in PORCIONES:
+        # El conteo de ventas es exacto en el cubo de ventas; por categoría hace falta el de líneas.
+        tabla = lineas if porcion == "categoria" else ventas
+        valores[porcion], acumulado[porcion] = _acumular(tabla, porcion, inicio, dias)
+    return Periodos(cubo.version, inicio, dias, valores, acumulado)
+
+
+def _guardar(periodos: Periodos, carpeta: Path) -> None:
+    arreglos = {"inicio": np.array([periodos.inicio]), "dias": np.array([periodos.dias])}
+    for porcion in PORCIONES:
+        arreglos[f"{porcion}_valores"] = periodos.valores[porcion]
+        arreglos[f"{porcion}_acumulado"] = periodos.acumulado[porcion]
+    datos.publicar_carpeta(carpeta, lambda tmp: np.savez(tmp / "periodos.npz", **arreglos))
+
+
+def _leer(carpeta: Path, version: str) -> Periodos:
+    with np.load(carpeta / "periodos.npz") as z:
+        return Periodos(version, z["inicio"][0], int(z["dias"][0]),
+                        {p: z[f"{p}_valores"] for p in PORCIONES},
+                        {p: z[f"{p}_acumulado"] for p in PORCIONES})
+
+
+@perfil.medido(categoria="carga")
+def cargar_periodos(base: Path = datos.BD_PATH) -> Periodos:
+    """Sumas acumuladas de la versión de datos actual, leídas de disco o construidas desde el cubo."""
+    version = datos.version_datos(base)
+    carpeta = datos.dir_version("periodos", version, base)
+    if not (carpeta / "periodos.npz").exists():
+        with datos.bloqueo("periodos", base):
+            # Otro hilo o proceso pudo publicarlas mientras se esperaba el bloqueo.
+            if not (carpeta / "periodos.npz").exists():
+                perfil.contar("periodos.fallos")
+                periodos = construir_periodos(cubo_mod.cargar_cubo(base))
+                _guardar(periodos, carpeta)
+                datos.descartar_versiones("periodos", version, base)
+                return periodos
+    perfil.contar("periodos.aciertos")
+    return _leer(carpeta, version)
+
+
+# --------------------------------------
+# Consultas
+# --------------------------------------
+def _sumas(periodos: Periodos, porcion: str, desde: np.ndarray, hasta: np.ndarray) -> np.ndarray:
+    """Suma de cada medida en los días [desde, hasta] (posiciones; fuera del rango de datos cuenta 0)."""
+    if porcion not in PORCIONES:
+        raise ValueError(f"Porción desconocida: {porcion} (opciones: {', '.join(PORCIONES)})")
+    a = np.clip(desde, 0, periodos.dias)
+    b = np.clip(hasta + 1, 0, periodos.dias)
+    acumulado = periodos.acumulado[porcion]
+    return acumulado[:, np.maximum(b, a)] - acumulado[:, a]
+
+
+def _posicion(periodos: Periodos, fecha: Fecha) -> int:
+    return int((_dia(fecha) - periodos.inicio).astype(np.int64))
+
+
+def _crecimiento(actual: np.ndarray, anterior: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(anterior != 0, 100 * (actual - anterior) / anterior, np.nan)
+
+
+def totales(periodos: Periodos, desde: Fecha, hasta: Fecha, por: str = "total") -> pd.DataFrame:
+    """Ventas, unidades e importe en [desde, hasta] por valor de `por`."""
+    sumas = _sumas(periodos, por, np.array([_posicion(periodos, desde)]), np.array([_posicion(periodos, hasta)]))[:, 0]
+    tabla = pd.DataFrame(sumas, columns=cubo_mod.MEDIDAS)
+    tabla.insert(0, por, periodos.valores[por])
+    return tabla.astype({"ventas": "int64", "unidades": "int64"})
+
+
+@perfil.medido()
+def comparar(periodos: Periodos, desde: Fecha, hasta: Fecha, desde_anterior: Optional[Fecha] = None,
+             hasta_anterior: Optional[Fecha] = None, por: str = "total") -> pd.DataFrame:
+    """Medidas de [desde, hasta] contra [desde_anterior, hasta_anterior], por valor de `por`.
+
+    Sin rango anterior se usa el de igual largo que termina el día antes de
+    `desde`. Devuelve una fila por valor y medida con `actual`, `anterior`,
+    `delta` y `crecimiento_pct` (nulo si el anterior es 0).
+    """
+    a, b = _posicion(periodos, desde), _posicion(periodos, hasta)
+    if desde_anterior is None or hasta_anterior is None:
+        a_ant, b_ant = a - (b - a + 1), a - 1
+    else:
+        a_ant, b_ant = _posicion(periodos, desde_anterior), _posicion(periodos, hasta_anterior)
+    sumas = _sumas(periodos, por, np.array([a, a_ant]), np.array([b, b_ant]))
+    actual, anterior = sumas[:, 0, :], sumas[:, 1, :]
+    valores = periodos.valores[por]
+    return pd.DataFrame({
+        por: np.repeat(valores, len(cubo_mod.MEDIDAS)),
+        "medida": np.tile(cubo_mod.MEDIDAS, len(valores)),
+        "actual": actual.ravel(),
+        "anterior": anterior.ravel(),
+        "delta": (actual - anterior).ravel(),
+        "crecimiento_pct": _crecimiento(actual, anterior).ravel(),
+    })
+
+
+def interanual(periodos: Periodos, desde: Fecha, hasta: Fecha, por: str = "total") -> pd.DataFrame:
+    """`comparar` contra el mismo rango de fechas un año antes."""
+    un_anio = pd.DateOffset(years=1)
+    return comparar(periodos, desde, hasta, pd.Timestamp(desde) - un_anio, pd.Timestamp(hasta) - un_anio, por)
+
+
+@perfil.medido()
+def ventanas(periodos: Periodos, medida: str = "importe", por: str = "total",
+             dias: Sequence[int] = VENTANAS) -> pd.DataFrame:
+    """Sumas móviles de `medida` para cada día con datos y cada ventana de `dias`.
+
+    Una fila por día, valor de `por` y ventana, con `valor` (suma de los
+    últimos `ventana` días), `anio_anterior` (la misma ventana un año antes)
+    y `crecimiento_interanual_pct`.
+    """
+    m = cubo_mod.MEDIDAS.index(medida)
+    fechas = periodos.inicio + np.arange(periodos.dias).astype("timedelta64[D]")
+    fin = np.arange(periodos.dias)
+    fin_anterior = (pd.DatetimeIndex(fechas) - pd.DateOffset(years=1)).to_numpy("datetime64[D]")
+    fin_anterior = (fin_anterior - periodos.inicio).astype(np.int64)
+    valores = periodos.valores[por]
+    partes = []
+    for ventana in dias:
+        actual = _sumas(periodos, por, fin - ventana + 1, fin)[:, :, m]
+        anterior = _sumas(periodos, por, fin_anterior - ventana + 1, fin_anterior)[:, :, m]
+        partes.append(pd.DataFrame({
+            "fecha": np.tile(fechas, len(valores)),
+            por: np.repeat(valores, periodos.dias),
+            "ventana": ventana,
+            "valor": actual.ravel(),
+            "anio_anterior": anterior.ravel(),
+            "crecimiento_interanual_pct": _crecimiento(actual, anterior).ravel(),
+        }))
+    if not partes:
+        return pd.DataFrame(columns=["fecha", por, "ventana", "valor", "anio_anterior", "crecimiento_interanual_pct"])
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,331 @@
+"""Precálculo en segundo plano: recalcula los artefactos caros cuando cambian los datos.
+
+Un `Planificador` corre un event loop de asyncio en un hilo propio que:
+
+- cada `INTERVALO` segundos (o al pedírselo con `despertar`) calcula la versión
+  de datos de cada artefacto (`datos.version_datos` de sus tablas) y encola los
+  que quedaron desactualizados;
+- reparte la cola de prioridad entre `hilos` trabajadores, que ejecutan el
+  cálculo en un `ThreadPoolExecutor` (el loop solo coordina, nunca calcula).
+
+Mientras un artefacto se recalcula, `resultado` sigue devolviendo el último
+valor bueno (aunque sea de la versión anterior); solo la primera vez espera a
+que esté. `priorizar(pagina)` adelanta en la cola los artefactos de la página
+que se está viendo, y un `resultado` que tiene que esperar adelanta el suyo
+por encima de todos. `estado()` resume cada artefacto: estado, duración del
+último cálculo, antigüedad del valor y hace cuánto está desactualizado.
+
+Los artefactos (`ARTEFACTOS`) son los de la app con sus parámetros por
+defecto: segmentos RFM, cubo y sumas por período, ventas por medio de pago,
+totales y Top-10 de clientes, y la validación de Fuentes. Los que salen de
+`aurelion.api` quedan además en la caché compartida.
+
+    plan = Planificador(base)
+    plan.priorizar("Temas")
+    plan.resultado("segmentos_rfm")     # último valor bueno
+    plan.estado()                       # DataFrame para mostrar
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from aurelion import api, datos, perfil
+from aurelion import cubo as cubo_mod
+from aurelion import periodos as periodos_mod
+
+INTERVALO = float(os.environ.get("AURELION_PLANIFICADOR_INTERVALO", "2"))
+# Un trabajador por defecto, para dejarle la CPU a la app. Cada agregado
+# persistido se construye con `datos.bloqueo` de su nombre, así que la app puede
+# pedir directamente el mismo artefacto mientras se precalcula (espera y lee el
+# publicado) y se pueden usar más trabajadores.
+HILOS = int(os.environ.get("AURELION_PLANIFICADOR_HILOS", "1"))
+TOP_N = 10
+# Un cálculo que falla se reintenta tras REINTENTO_S segundos, duplicando la
+# espera en cada fallo seguido hasta REINTENTO_MAX_S (o ya, si cambian los datos).
+REINTENTO_S = float(os.environ.get("AURELION_PLANIFICADOR_REINTENTO", "5"))
+REINTENTO_MAX_S = 300.0
+
+# Prioridades (menor sale primero).
+URGENTE, PAGINA_ACTUAL, FONDO = 0, 1, 2
+
+
+@dataclass
+class Artefacto:
+    calcular: Callable[[Path], Any]
+    tablas: Tuple[str, ...]
+    paginas: Tuple[str, ...]
+
+
+ARTEFACTOS: Dict[str, Artefacto] = {}
+
+
+def artefacto(tablas: Tuple[str, ...] = datos.TABLAS, paginas: Tuple[str, ...] = ("Temas",)):
+    """Registra un artefacto precalculable en `ARTEFACTOS` (en orden de registro)."""
+    def decorador(f: Callable[[Path], Any]) -> Callable[[Path], Any]:
+        ARTEFACTOS[f.__name__.lstrip("_")] = Artefacto(f, tablas, paginas)
+        return f
+
+    return decorador
+
+
+# --------------------------------------
+# Artefactos
+# --------------------------------------
+@artefacto(tablas=("clientes", "ventas"))
+def _totales(base: Path) -> Dict[str, int]:
+    return api.totales(base=base)
+
+
+@artefacto(tablas=("clientes", "ventas"))
+def _top_clientes(base: Path) -> pd.DataFrame:
+    return api.top_clientes(TOP_N, base=base)
+
+
+@artefacto(tablas=("clientes", "ventas", "detalle_ventas"))
+def _segmentos_rfm(base: Path) -> pd.DataFrame:
+    return api.segmentos_rfm(base=base)
+
+
+@artefacto(tablas=("ventas",))
+def _ventas_por_pago(base: Path) -> pd.DataFrame:
+    return api.ventas_por_pago(base=base)
+
+
+@artefacto()
+def _cubo(base: Path) -> cubo_mod.Cubo:
+    return cubo_mod.cargar_cubo(base)
+
+
+@artefacto()
+def _periodos(base: Path) -> periodos_mod.Periodos:
+    return periodos_mod.cargar_periodos(base)
+
+
+@artefacto(paginas=("Fuentes",))
+def _validacion(base: Path) -> pd.DataFrame:
+    return api.validacion_datos(base=base)
+
+
+# --------------------------------------
+# Planificador
+# --------------------------------------
+@dataclass
+class Estado:
+    valor: Any = None
+    version: Optional[str] = None          # versión del último valor bueno
+    version_datos: Optional[str] = None    # versión actual de los datos
+    intentada: Optional[str] = None        # última versión que se empezó a calcular
+    calculando: bool = False
+    error: Optional[str] = None
+    calculado: Optional[float] = None      # time.time() del último valor bueno
+    duracion: Optional[float] = None       # segundos del último cálculo (bueno o fallido)
+    detectado: Optional[float] = None      # time.time() en que se vio la versión actual
+    fallos: int = 0                        # fallos seguidos de la versión actual
+    reintento: float = 0.0                 # time.time() desde el que se puede reintentar
+
+    def puede_intentar(self, ahora: float) -> bool:
+        return (self.version_datos is not None and self.intentada != self.version_datos
+                and not self.calculando and ahora >= self.reintento)
+
+    @property
+    def obsoleto(self) -> bool:
+        return self.version is not None and self.version != self.version_datos
+
+    @property
+    def nombre_estado(self) -> str:
+        if self.calculando:
+            return "calculando"
+        if self.error is not None:
+            return "error"
+        if self.version is not None and self.version == self.version_datos:
+            return "listo"
+        return "en cola" if self.version_datos is not None else "pendiente"
+
+
+class Planificador:
+    """Precalcula `ARTEFACTOS` de `base` en segundo plano y sirve el último valor bueno."""
+
+    def __init__(self, base: Path = datos.BD_PATH, hilos: int = HILOS, intervalo: float = INTERVALO) -> None:
+        self.base = Path(base)
+        self.hilos = hilos
+        self.intervalo = intervalo
+        self.pagina: Optional[str] = None
+        self._estados = {nombre: Estado() for nombre in ARTEFACTOS}
+        self._primer_valor = {nombre: threading.Event() for nombre in ARTEFACTOS}
+        self._urgentes: set = set()
+        self._lock = threading.Lock()
+        self._orden = itertools.count()
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="aurelion-precalculo")
+        self._loop = asyncio.new_event_loop()
+        self._cola: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._despertar = asyncio.Event()
+        self._detenido = False
+        self._hilo = threading.Thread(target=self._loop.run_until_complete, args=(self._principal(),),
+                                      name="aurelion-planificador", daemon=True)
+        self._hilo.start()
+
+    # -- desde otros hilos (app, CLI) ---------------------------------------
+    def despertar(self) -> None:
+        """Revisa ya si cambiaron los datos, sin esperar al próximo intervalo."""
+        self._loop.call_soon_threadsafe(self._despertar.set)
+
+    def priorizar(self, pagina: Optional[str]) -> None:
+        """Adelanta en la cola los artefactos de `pagina`."""
+        if pagina != self.pagina:
+            self.pagina = pagina
+            self._loop.call_soon_threadsafe(self._reencolar)
+
+    def resultado(self, nombre: str, timeout: Optional[float] = None) -> Any:
+        """Último valor bueno de `nombre` (puede ser de una versión anterior si se está recalculando).
+
+        Si todavía no hay ninguno, lo pasa al frente de la cola y espera. Si el
+        último intento falló y aún no toca reintentar, lanza `RuntimeError` sin
+        esperar (el llamador puede calcularlo por su cuenta).
+        """
+        estado = self._estados[nombre]
+        with self._lock:
+            if estado.version is not None:
+                perfil.contar("planificador.obsoletos" if estado.obsoleto else "planificador.aciertos")
+                return estado.valor
+            if estado.error is not None and not estado.calculando:
+                if time.time() < estado.reintento:
+                    raise RuntimeError(f"No se pudo calcular {nombre}: {estado.error}")
+                self._primer_valor[nombre].clear()   # se espera el reintento, no el error anterior
+            self._urgentes.add(nombre)
+        perfil.contar("planificador.esperas")
+        self._loop.call_soon_threadsafe(self._reencolar)
+        self.despertar()
+        with perfil.tramo(f"planificador.espera.{nombre}", "calculo"):
+            if not self._primer_valor[nombre].wait(timeout):
+                raise TimeoutError(f"{nombre} no terminó de calcularse en {timeout} s")
+        with self._lock:
+            if estado.version is None:
+                raise RuntimeError(f"No se pudo calcular {nombre}: {estado.error}")
+            return estado.valor
+
+    def estado(self) -> pd.DataFrame:
+        """Estado, duración, antigüedad y desactualización de cada artefacto."""
+        ahora = time.time()
+        filas = []
+        with self._lock:
+            for nombre, e in self._estados.items():
+                filas.append({
+                    "artefacto": nombre,
+                    "estado": e.nombre_estado,
+                    "prioridad": self._prioridad(nombre),
+                    "duracion_s": e.duracion,
+                    "antiguedad_s": None if e.calculado is None else ahora - e.calculado,
+                    "desactualizado_s": ahora - e.detectado if e.obsoleto and e.detectado else 0.0,
+                    "version": e.version,
+                    "error": e.error,
+                    "reintento_s": max(e.reintento - ahora, 0.0) if e.error is not None else None,
+                })
+        return pd.DataFrame(filas)
+
+    @property
+    def ocupado(self) -> bool:
+        """Hay artefactos sin revisar, en cola o calculándose."""
+        with self._lock:
+            return any(e.nombre_estado in ("pendiente", "en cola", "calculando") for e in self._estados.values())
+
+    def detener(self) -> None:
+        self._detenido = True
+        self.despertar()
+        self._hilo.join()
+        self._ejecutor.shutdown(wait=False, cancel_futures=True)
+
+    # -- dentro del loop -----------------------------------------------------
+    def _prioridad(self, nombre: str) -> int:
+        if nombre in self._urgentes:
+            return URGENTE
+        return PAGINA_ACTUAL if self.pagina in ARTEFACTOS[nombre].paginas else FONDO
+
+    def _encolar(self, nombre: str, version: str) -> None:
+        # Las entradas no se reordenan: se agrega otra y `_trabajador` saltea las que ya no valen.
+        self._cola.put_nowait((self._prioridad(nombre), next(self._orden), nombre, version))
+
+    def _reencolar(self) -> None:
+        ahora = time.time()
+        with self._lock:
+            pendientes = [(n, e.version_datos) for n, e in self._estados.items() if e.puede_intentar(ahora)]
+        for nombre, version in pendientes:
+            self._encolar(nombre, version)
+
+    def _versiones(self) -> Dict[str, str]:
+        por_tablas: Dict[Tuple[str, ...], str] = {}
+        for art in ARTEFACTOS.values():
+            if art.tablas not in por_tablas:
+                por_tablas[art.tablas] = datos.version_datos(self.base, art.tablas)
+        return {nombre: por_tablas[art.tablas] for nombre, art in ARTEFACTOS.items()}
+
+    async def _revisar(self) -> None:
+        try:
+            versiones = await self._loop.run_in_executor(None, self._versiones)
+        except FileNotFoundError:
+            return   # faltan tablas en disco: no hay nada que precalcular
+        ahora = time.time()
+        with self._lock:
+            nuevas = []
+            for nombre, version in versiones.items():
+                estado = self._estados[nombre]
+                if version != estado.version_datos:
+                    estado.version_datos, estado.detectado = version, ahora
+                    estado.fallos, estado.reintento = 0, 0.0
+                    nuevas.append((nombre, version))
+                elif estado.error is not None and estado.puede_intentar(ahora):
+                    nuevas.append((nombre, version))   # reintento tras un fallo
+        for nombre, version in nuevas:
+            self._encolar(nombre, version)
+
+    async def _trabajador(self) -> None:
+        while True:
+            _, _, nombre, version = await self._cola.get()
+            estado = self._estados[nombre]
+            with self._lock:
+                if version != estado.version_datos or not estado.puede_intentar(time.time()):
+                    continue
+                estado.intentada, estado.calculando = version, True
+                if estado.version is None:
+                    self._primer_valor[nombre].clear()   # un `resultado` que espera no ve el error anterior
+            inicio = time.perf_counter()
+            try:
+                valor = await self._loop.run_in_executor(self._ejecutor, ARTEFACTOS[nombre].calcular, self.base)
+            except Exception as e:
+                with self._lock:
+                    estado.error = f"{type(e).__name__}: {e}"
+                    # La versión queda sin intentar, para que `_revisar` la vuelva a encolar.
+                    estado.intentada = None
+                    estado.fallos += 1
+                    estado.reintento = time.time() + min(REINTENTO_S * 2 ** (estado.fallos - 1), REINTENTO_MAX_S)
+            else:
+                with self._lock:
+                    estado.valor, estado.version, estado.calculado = valor, version, time.time()
+                    estado.error, estado.fallos, estado.reintento = None, 0, 0.0
+            finally:
+                with self._lock:
+                    estado.calculando = False
+                    estado.duracion = time.perf_counter() - inicio
+                    self._urgentes.discard(nombre)
+                self._primer_valor[nombre].set()
+
+    async def _principal(self) -> None:
+        trabajadores = [asyncio.create_task(self._trabajador()) for _ in range(self.hilos)]
+        while not self._detenido:
+            await self._revisar()
+            try:
+                await asyncio.wait_for(self._despertar.wait(), self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+            self._despertar.clear()
+        for t in trabajadores:
+            t.cancel()
+        await asyncio.gather(*trabajadores, return_exceptions=True)
@@ -0,0 +1,124 @@
+"""Indicadores RFM (Recencia, Frecuencia, Monetización) por cliente.
+
+El cálculo se separa en dos pasos:
+
+1. `agregados_rfm`: reducciones por cliente sobre `ventas` + `detalle_ventas`
+   (última compra, cantidad de ventas e importe total). Es lo caro, porque
+   recorre todo el historial.
+2. `puntuar_rfm`: puntajes por cuantil (1..q) y segmento Nuevo / Activo /
+   Inactivo a partir de los agregados. Recorre solo una fila por cliente.
+
+Cuando llega un día nuevo de ventas, `actualizar_agregados` combina los
+agregados previos con los del delta y solo recalcula los clientes afectados;
+después alcanza con volver a puntuar.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from aurelion import perfil
+
+COLUMNAS = ["ultima_compra", "frecuencia", "monetizacion"]
+
+SEGMENTOS = ["Nuevo", "Activo", "Inactivo"]
+
+
+@perfil.medido()
+def agregados_rfm(ventas: pd.DataFrame, detalle_ventas: pd.DataFrame) -> pd.DataFrame:
+    """Agregados RFM indexados por `id_cliente`.
+
+    `frecuencia` cuenta filas de `ventas` (id_venta es PK) y `monetizacion`
+    suma el `importe` de sus líneas de detalle.
+    """
+    importe_venta = detalle_ventas.groupby("id_venta", sort=False)["importe"].sum()
+    base = pd.DataFrame({
+        "id_cliente": ventas["id_cliente"].to_numpy(),
+        "fecha": ventas["fecha"].to_numpy(),
+        "importe": importe_venta.reindex(ventas["id_venta"].to_numpy()).fillna(0.0).to_numpy(),
+    })
+    return base.groupby("id_cliente").agg(
+        ultima_compra=("fecha", "max"),
+        frecuencia=("fecha", "size"),
+        monetizacion=("importe", "sum"),
+    )
+
+
+def actualizar_agregados(agregados: pd.DataFrame, ventas_nuevas: pd.DataFrame,
+                         detalle_nuevo: pd.DataFrame) -> pd.DataFrame:
+    """Suma al estado `agregados` un lote de ventas nuevas con su detalle.
+
+    Solo se tocan los clientes presentes en `ventas_nuevas`; el costo depende
+    del tamaño del lote y de la cantidad de clientes, no del historial.
+    `detalle_nuevo` debe contener las líneas de las ventas de `ventas_nuevas`.
+    """
+    delta = agregados_rfm(ventas_nuevas, detalle_nuevo)
+    if delta.empty:
+        return agregados
+    afectados = delta.index
+    previo = agregados.reindex(afectados)
+    combinado = pd.DataFrame({
+        "ultima_compra": np.maximum(previo["ultima_compra"].fillna(delta["ultima_compra"]), delta["ultima_compra"]),
+        "frecuencia": previo["frecuencia"].fillna(0).astype("int64") + delta["frecuencia"],
+        "monetizacion": previo["monetizacion"].fillna(0.0) + delta["monetizacion"],
+    }, index=afectados)
+
+    resultado = agregados.reindex(agregados.index.union(afectados))
+    resultado.loc[afectados, COLUMNAS] = combinado[COLUMNAS]
+    return resultado.astype({"frecuencia": "int64"})
+
+
+def _puntaje(valores: pd.Series, q: int) -> pd.Series:
+    # Percentil con empates promediados: valores iguales reciben el mismo puntaje.
+    pct = valores.rank(pct=True, method="average")
+    return np.ceil(pct * q).clip(1, q).fillna(1).astype("int8")
+
+
+@perfil.medido()
+def puntuar_rfm(agregados: pd.DataFrame, clientes: Optional[pd.DataFrame] = None,
+                fecha_ref: Optional[pd.Timestamp] = None, q: int = 5,
+                dias_nuevo: int = 90, dias_activo: int = 90) -> pd.DataFrame:
+    """Puntajes R/F/M (1..q) y segmento por cliente.
+
+    - Si se pasa `clientes`, se incluyen los clientes sin compras y se usa
+      `fecha_alta` para marcar como "Nuevo" a quien se dio de alta hace
+      `dias_nuevo` días o menos.
+    - "Activo" si la última compra fue hace `dias_activo` días o menos;
+      el resto queda "Inactivo".
+    - `fecha_ref` por defecto es la última compra registrada.
+    """
+    tabla = agregados
+    if clientes is not None:
+        tabla = clientes.set_index("id_cliente")[["fecha_alta"]].join(agregados, how="left")
+    if fecha_ref is None:
+        fecha_ref = tabla["ultima_compra"].max()
+    fecha_ref = pd.Timestamp(fecha_ref)
+
+    recencia = (fecha_ref - tabla["ultima_compra"]).dt.days
+    frecuencia = tabla["frecuencia"].fillna(0).astype("int64")
+    monetizacion = tabla["monetizacion"].fillna(0.0)
+
+    nuevo = np.zeros(len(tabla), dtype=bool)
+    if "fecha_alta" in tabla:
+        nuevo = ((fecha_ref - tabla["fecha_alta"]).dt.days <= dias_nuevo).to_numpy()
+    activo = (recencia <= dias_activo).to_numpy()
+    segmento = np.select([nuevo, activo], SEGMENTOS[:2], SEGMENTOS[2])
+
+    resultado = pd.DataFrame({
+        "recencia": recencia,
+        "frecuencia": frecuencia,
+        "monetizacion": monetizacion,
+        "r": _puntaje(-recencia, q),
+        "f": _puntaje(frecuencia, q),
+        "m": _puntaje(monetizacion, q),
+    }, index=tabla.index)
+    resultado["rfm"] = resultado["r"].astype(str) + resultado["f"].astype(str) + resultado["m"].astype(str)
+    resultado["segmento"] = pd.Categorical(segmento, categories=SEGMENTOS)
+    return resultado
+
+
+def segmentos_rfm(ventas: pd.DataFrame, detalle_ventas: pd.DataFrame,
+                  clientes: Optional[pd.DataFrame] = None, **kwargs) -> pd.DataFrame:
+    """Atajo: agregados + puntajes sobre el historial completo."""
+    return puntuar_rfm(agregados_rfm(ventas, detalle_ventas), clientes, **kwargs)
@@ -0,0 +1,251 @@
+"""Generador de datos sintéticos con la forma de `BD/`, a escala configurable.
+
+Los parámetros se estiman de la muestra real (`Parametros.desde_muestra`):
+distribución de ciudades con sus coordenadas, medios de pago, categorías,
+precios, líneas por venta, cantidades y estacionalidad por mes y día de la
+semana. Se mantiene el esquema exacto de las cuatro tablas, incluyendo los
+campos denormalizados (`nombre_cliente`, `email`, `nombre_producto`, ...).
+
+La generación es por bloques y con semilla fija, así que se pueden producir
+10**8 ventas sin tenerlas en memoria y dos corridas dan los mismos archivos.
+
+    python -m aurelion.sintetico --ventas 1e6 --destino /tmp/bd_1e6 --formato parquet
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from aurelion import datos
+
+# Filas de ventas por bloque de generación.
+BLOQUE = 1_000_000
+
+
+@dataclass
+class Parametros:
+    ciudades: Dict[str, tuple] = field(default_factory=dict)   # ciudad -> (prob, lat, lon)
+    medios_pago: Dict[str, float] = field(default_factory=dict)
+    categorias: Dict[str, float] = field(default_factory=dict)
+    nombres: List[str] = field(default_factory=list)
+    apellidos: List[str] = field(default_factory=list)
+    productos: List[str] = field(default_factory=list)
+    precios: np.ndarray = field(default_factory=lambda: np.array([1000.0]))
+    lineas_por_venta: Dict[int, float] = field(default_factory=lambda: {1: 1.0})
+    cantidades: Dict[int, float] = field(default_factory=lambda: {1: 1.0})
+    peso_mes: np.ndarray = field(default_factory=lambda: np.ones(12))
+    peso_dia_semana: np.ndarray = field(default_factory=lambda: np.ones(7))
+    inicio: pd.Timestamp = pd.Timestamp("2023-01-01")
+    fin: pd.Timestamp = pd.Timestamp("2024-12-31")
+
+    @classmethod
+    def desde_muestra(cls, base: Path = datos.BD_PATH) -> "Parametros":
+        clientes = datos.cargar_tabla("clientes", base)
+        productos = datos.cargar_tabla("productos", base)
+        ventas = datos.cargar_tabla("ventas", base)
+        detalle = datos.cargar_tabla("detalle_ventas", base)
+
+        geo = clientes.groupby("ciudad", observed=True).agg(n=("id_cliente", "size"), lat=("latitud", "mean"),
+                                                            lon=("longitud", "mean"))
+        geo["p"] = geo["n"] / geo["n"].sum()
+        nombres = clientes["nombre_cliente"].str.split(" ", n=1, expand=True)
+
+        meses = ventas["fecha"].dt.month.value_counts().reindex(range(1, 13))
+        peso_mes = meses.fillna(meses.mean()).to_numpy(dtype=float)
+        dias = ventas["fecha"].dt.dayofweek.value_counts().reindex(range(7), fill_value=0).to_numpy(dtype=float)
+
+        return cls(
+            ciudades={str(c): (f.p, f.lat, f.lon) for c, f in geo.iterrows()},
+            medios_pago=_frecuencias(ventas["medio_pago"].astype(str)),
+            categorias=_frecuencias(productos["categoria"].astype(str)),
+            nombres=sorted(nombres[0].dropna().unique()),
+            apellidos=sorted(nombres[1].dropna().unique()),
+            productos=list(productos["nombre_producto"].astype(str)),
+            precios=productos["precio_unitario"].to_numpy(dtype=float),
+            lineas_por_venta=_frecuencias(detalle.groupby("id_venta").size()),
+            cantidades=_frecuencias(detalle["cantidad"]),
+            peso_mes=peso_mes,
+            peso_dia_semana=dias + 1.0,
+            inicio=min(clientes["fecha_alta"].min(), ventas["fecha"].min()),
+            fin=max(ventas["fecha"].max(), clientes["fecha_alta"].max()),
+        )
+
+
+def _frecuencias(serie: pd.Series) -> Dict:
+    conteo = serie.value_counts(normalize=True).sort_index()
+    return {k: float(v) for k, v in conteo.items()}
+
+
+def _elegir(rng: np.random.Generator, dist: Dict, n: int) -> np.ndarray:
+    claves = np.array(list(dist))
+    probs = np.array(list(dist.values()), dtype=float)
+    return claves[rng.choice(len(claves), size=n, p=probs / probs.sum())]
+
+
+def escalas_por_defecto(n_ventas: int) -> Dict[str, int]:
+    """Tamaño de cada tabla para `n_ventas` (proporciones parecidas a la muestra)."""
+    return {
+        "ventas": n_ventas,
+        "clientes": max(100, n_ventas // 10),
+        "productos": int(min(100_000, max(100, n_ventas // 1000))),
+    }
+
+
+def generar_clientes(p: Parametros, n: int, rng: np.random.Generator) -> pd.DataFrame:
+    nombres = rng.choice(p.nombres, n)
+    apellidos = rng.choice(p.apellidos, n)
+    ids = np.arange(1, n + 1, dtype=np.int32)
+    ciudades = _elegir(rng, {c: v[0] for c, v in p.ciudades.items()}, n)
+    lat = np.array([p.ciudades[c][1] for c in ciudades]) + rng.normal(0, 0.03, n)
+    lon = np.array([p.ciudades[c][2] for c in ciudades]) + rng.normal(0, 0.03, n)
+    dias = int((p.fin - p.inicio).days) + 1
+    nombre_completo = pd.Series(nombres, dtype=object) + " " + pd.Series(apellidos, dtype=object)
+    email = (pd.Series(nombres, dtype=object).str.lower() + "." + pd.Series(apellidos, dtype=object).str.lower()
+             + ids.astype(str).astype(object) + "@mail.com")
+    return pd.DataFrame({
+        "id_cliente": ids,
+        "nombre_cliente": nombre_completo,
+        "email": email,
+        "ciudad": ciudades,
+        "fecha_alta": p.inicio + pd.to_timedelta(np.sort(rng.integers(0, dias, n)), unit="D"),
+        "latitud": lat.round(4),
+        "longitud": lon.round(4),
+    })
+
+
+def generar_productos(p: Parametros, n: int, rng: np.random.Generator) -> pd.DataFrame:
+    base = np.array(p.productos, dtype=object)[np.arange(n) % len(p.productos)]
+    sufijo = np.where(np.arange(n) < len(p.productos), "", " v" + (np.arange(n) // len(p.productos)).astype(str))
+    precios = rng.choice(p.precios, n) * rng.uniform(0.9, 1.1, n)
+    return pd.DataFrame({
+        "id_producto": np.arange(1, n + 1, dtype=np.int32),
+        "nombre_producto": base + sufijo,
+        "categoria": _elegir(rng, p.categorias, n),
+        "precio_unitario": precios.round(0),
+    })
+
+
+def _fechas(p: Parametros, n: int, rng: np.random.Generator) -> pd.Series:
+    calendario = pd.date_range(p.inicio, p.fin, freq="D")
+    pesos = p.peso_mes[calendario.month - 1] * p.peso_dia_semana[calendario.dayofweek]
+    return pd.Series(calendario[rng.choice(len(calendario), size=n, p=pesos / pesos.sum())])
+
+
+def generar_ventas(p: Parametros, clientes: pd.DataFrame, productos: pd.DataFrame, n_ventas: int,
+                   semilla: int = 0, bloque: int = BLOQUE) -> Iterator[tuple]:
+    """Bloques `(ventas, detalle_ventas)` con ids consecutivos."""
+    rng = np.random.default_rng(semilla + 1)
+    lineas = np.array(list(p.lineas_por_venta), dtype=np.int64)
+    prob_lineas = np.array(list(p.lineas_por_venta.values()))
+    nombres_cli = clientes["nombre_cliente"].to_numpy()
+    emails_cli = clientes["email"].to_numpy()
+    precios = productos["precio_unitario"].to_numpy()
+    nombres_prod = productos["nombre_producto"].to_numpy()
+    # Clientes con actividad desigual: unos pocos compran mucho (Zipf acotado).
+    actividad = 1.0 / np.arange(1, len(clientes) + 1) ** 0.3
+    actividad = rng.permutation(actividad / actividad.sum())
+
+    for inicio in range(0, n_ventas, bloque):
+        n = min(bloque, n_ventas - inicio)
+        id_venta = np.arange(inicio + 1, inicio + n + 1, dtype=np.int32)
+        pos_cli = rng.choice(len(clientes), size=n, p=actividad)
+        ventas = pd.DataFrame({
+            "id_venta": id_venta,
+            "fecha": _fechas(p, n, rng),
+            "id_cliente": clientes["id_cliente"].to_numpy()[pos_cli],
+            "nombre_cliente": nombres_cli[pos_cli],
+            "email": emails_cli[pos_cli],
+            "medio_pago": _elegir(rng, p.medios_pago, n),
+        })
+        por_venta = lineas[rng.choice(len(lineas), size=n, p=prob_lineas / prob_lineas.sum())]
+        n_lineas = int(por_venta.sum())
+        pos_prod = rng.integers(0, len(productos), n_lineas)
+        cantidad = _elegir(rng, p.cantidades, n_lineas).astype(np.int32)
+        detalle = pd.DataFrame({
+            "id_venta": np.repeat(id_venta, por_venta),
+            "id_producto": productos["id_producto"].to_numpy()[pos_prod],
+            "nombre_producto": nombres_prod[pos_prod],
+            "cantidad": cantidad,
+            "precio_unitario": precios[pos_prod],
+            "importe": cantidad * precios[pos_prod],
+        })
+        yield ventas, detalle
+
+
+class _Escritor:
+    """Escribe bloques de una tabla en CSV o Parquet sin acumularlos."""
+
+    def __init__(self, path: Path, formato: str) -> None:
+        self.path, self.formato, self._writer = path, formato, None
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        if self.formato == "csv":
+            # Fechas como en BD/ (AAAA-MM-DD), que es lo que aceptan los lectores.
+            df = df.assign(**{c: df[c].dt.strftime("%Y-%m-%d") for c in df.columns
+                              if pd.api.types.is_datetime64_any_dtype(df[c])})
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            if self.formato == "parquet":
+                self._writer = pq.ParquetWriter(str(self.path), tabla.schema)
+            else:
+                self._writer = pacsv.CSVWriter(str(self.path), tabla.schema)
+        self._writer.write_table(tabla)
+
+    def cerrar(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def generar(destino: Path, n_ventas: int, formato: str = "csv", semilla: int = 0,
+            parametros: Optional[Parametros] = None, bloque: int = BLOQUE) -> Dict[str, int]:
+    """Escribe las cuatro tablas en `destino` y devuelve la cantidad de filas de cada una."""
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    p = parametros or Parametros.desde_muestra()
+    rng = np.random.default_rng(semilla)
+    tamanos = escalas_por_defecto(n_ventas)
+    ext = ".parquet" if formato == "parquet" else ".csv"
+
+    filas = {}
+    clientes = generar_clientes(p, tamanos["clientes"], rng)
+    productos = generar_productos(p, tamanos["productos"], rng)
+    for nombre, df in (("clientes", clientes), ("productos", productos)):
+        escritor = _Escritor(destino / f"{nombre}{ext}", formato)
+        escritor.escribir(df)
+        escritor.cerrar()
+        filas[nombre] = len(df)
+
+    escritores = {t: _Escritor(destino / f"{t}{ext}", formato) for t in ("ventas", "detalle_ventas")}
+    filas.update(ventas=0, detalle_ventas=0)
+    try:
+        for ventas, detalle in generar_ventas(p, clientes, productos, n_ventas, semilla, bloque):
+            escritores["ventas"].escribir(ventas)
+            escritores["detalle_ventas"].escribir(detalle)
+            filas["ventas"] += len(ventas)
+            filas["detalle_ventas"] += len(detalle)
+    finally:
+        for escritor in escritores.values():
+            escritor.cerrar()
+    return filas
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m aurelion.sintetico", description=__doc__.splitlines()[0])
+    parser.add_argument("--ventas", type=float, required=True, help="Cantidad de ventas (admite 1e6).")
+    parser.add_argument("--destino", type=Path, required=True)
+    parser.add_argument("--formato", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+    filas = generar(args.destino, int(args.ventas), args.formato, args.semilla)
+    print(", ".join(f"{t}: {n:,}" for t, n in filas.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Agregaciones fuera de memoria (por bloques) para datasets más grandes que la RAM.
+
+Las tablas se leen desde su archivo fuente en bloques acotados y cada bloque
+produce un agregado parcial que se fusiona con los anteriores. La memoria de
+trabajo queda limitada por `memoria_max` (bytes) y por la cantidad de grupos,
+no por la cantidad de filas.
+
+El límite se configura por parámetro o con la variable de entorno
+`AURELION_MEMORIA_MAX` (en MB). El bloque leído usa una fracción del límite:
+el resto queda para la conversión a pandas y los agregados parciales.
+
+Conteos de distintos (`nunique`):
+- `DistintosExacto`: exacto. Para enteros no negativos (los ids) usa un mapa
+  de bits: `max_id / 8` bytes sin importar cuántas filas haya.
+- `HyperLogLog`: aproximado (error típico ~1.04 / sqrt(2**p)), memoria fija de
+  `2**p` bytes por contador.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from aurelion import datos, lectores, perfil
+
+MEMORIA_MAX = int(os.environ.get("AURELION_MEMORIA_MAX", "256")) << 20
+
+# Fracción de `memoria_max` que se destina al bloque leído.
+FRACCION_BLOQUE = 4
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+# --------------------------------------
+# Conteo de distintos
+# --------------------------------------
+class DistintosExacto:
+    """Conteo exacto de valores distintos, fusionable entre bloques."""
+
+    def __init__(self) -> None:
+        self.bits = np.zeros(0, dtype=np.uint8)
+        self.otros = np.array([])
+
+    def agregar(self, valores) -> None:
+        valores = pd.unique(np.asarray(valores))
+        valores = valores[~pd.isna(valores)]
+        if valores.dtype.kind in "iu" and (len(valores) == 0 or valores.min() >= 0):
+            self._marcar(np.sort(valores.astype(np.int64)))
+        else:
+            self.otros = np.union1d(self.otros, valores) if len(self.otros) else np.sort(valores)
+
+    def _marcar(self, ids: np.ndarray) -> None:
+        if len(ids) == 0:
+            return
+        byte = ids >> 3
+        if byte[-1] >= len(self.bits):
+            self.bits = np.concatenate([self.bits, np.zeros(int(byte[-1]) + 1 - len(self.bits), dtype=np.uint8)])
+        mascara = np.left_shift(1, ids & 7).astype(np.uint8)
+        inicios = np.flatnonzero(np.r_[True, byte[1:] != byte[:-1]])
+        self.bits[byte[inicios]] |= np.bitwise_or.reduceat(mascara, inicios)
+
+    def fusionar(self, otro: "DistintosExacto") -> None:
+        n = max(len(self.bits), len(otro.bits))
+        bits = np.zeros(n, dtype=np.uint8)
+        bits[:len(self.bits)] |= self.bits
+        bits[:len(otro.bits)] |= otro.bits
+        self.bits = bits
+        if len(otro.otros):
+            self.otros = np.union1d(self.otros, otro.otros) if len(self.otros) else otro.otros
+
+    def total(self) -> int:
+        return int(_POPCOUNT[self.bits].sum(dtype=np.int64)) + len(self.otros)
+
+
+def _largo_bits(x: np.ndarray) -> np.ndarray:
+    """Cantidad de bits de cada uint64 > 0 (búsqueda binaria con corrimientos, sin pasar a float)."""
+    largo = np.ones(len(x), dtype=np.int64)
+    for paso in (32, 16, 8, 4, 2, 1):
+        alto = x >> np.uint64(paso)
+        mayor = alto != 0
+        x = np.where(mayor, alto, x)
+        largo += mayor * paso
+    return largo
+
+
+class HyperLogLog:
+    """Estimador HyperLogLog de cardinalidad con `2**p` registros."""
+
+    def __init__(self, p: int = 14) -> None:
+        self.p = p
+        self.m = 1 << p
+        self.registros = np.zeros(self.m, dtype=np.uint8)
+
+    def agregar(self, valores) -> None:
+        valores = np.asarray(valores)
+        valores = valores[~pd.isna(valores)]
+        if len(valores) == 0:
+            return
+        h = pd.util.hash_array(valores)
+        idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+        resto = (h << np.uint64(self.p)) | np.uint64(1 << (self.p - 1))
+        # Posición del primer bit en 1 (contando desde 1) en los 64 - p bits restantes.
+        rango = (65 - _largo_bits(resto)).astype(np.uint8)
+        np.maximum.at(self.registros, idx, rango)
+
+    def fusionar(self, otro: "HyperLogLog") -> None:
+        np.maximum(self.registros, otro.registros, out=self.registros)
+
+    def total(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimado = alpha * self.m ** 2 / np.sum(np.ldexp(1.0, -self.registros.astype(np.int64)))
+        vacios = int((self.registros == 0).sum())
+        if estimado <= 2.5 * self.m and vacios:
+            estimado = self.m * np.log(self.m / vacios)
+        return int(round(estimado))
+
+
+def nuevo_contador(exacto: bool = True) -> Union[DistintosExacto, HyperLogLog]:
+    return DistintosExacto() if exacto else HyperLogLog()
+
+
+# --------------------------------------
+# Lectura por bloques
+# --------------------------------------
+def iterar_tabla(tabla: str, columnas: Optional[List[str]] = None, base: Path = datos.BD_PATH,
+                 memoria_max: int = MEMORIA_MAX) -> Iterator[pd.DataFrame]:
+    """Bloques de `tabla` leídos de su fuente sin cargarla entera."""
+    fuente = datos.buscar_fuente(tabla, base)
+    if fuente is None:
+        raise FileNotFoundError(f"No se encontró {tabla} en {base}")
+    yield from lectores.leer_por_bloques(fuente, tabla, max(1 << 16, memoria_max // FRACCION_BLOQUE),
+                                         columnas=columnas)
+
+
+def contar_distintos(tabla: str, columna: str, exacto: bool = True, base: Path = datos.BD_PATH,
+                     memoria_max: int = MEMORIA_MAX) -> int:
+    contador = nuevo_contador(exacto)
+    for bloque in iterar_tabla(tabla, [columna], base, memoria_max):
+        contador.agregar(bloque[columna].to_numpy())
+    return contador.total()
+
+
+def distintos_por_grupo(tabla: str, por: str, columna: str, exacto: bool = True,
+                        base: Path = datos.BD_PATH, memoria_max: int = MEMORIA_MAX) -> pd.Series:
+    """`groupby(por)[columna].nunique()` por bloques, con un contador por grupo.
+
+    Pensado para pocos grupos (p. ej. `medio_pago`): cada grupo mantiene su
+    propio contador.
+    """
+    contadores: Dict = {}
+    for bloque in iterar_tabla(tabla, [por, columna], base, memoria_max):
+        for grupo, valores in bloque.groupby(por, observed=True)[columna]:
+            contadores.setdefault(grupo, nuevo_contador(exacto)).agregar(valores.to_numpy())
+    return pd.Series({g: c.total() for g, c in contadores.items()}, name=columna, dtype="int64")
+
+
+_COMBINAR = {"sum": "sum", "size": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def agregar_por_grupo(tabla: str, por: str, agregaciones: Dict[str, tuple],
+                      base: Path = datos.BD_PATH, memoria_max: int = MEMORIA_MAX) -> pd.DataFrame:
+    """Agregaciones descomponibles (`sum`, `size`, `count`, `min`, `max`) por bloques.
+
+    `agregaciones` tiene la forma de `groupby().agg()` con nombre:
+    `{"importe_total": ("importe", "sum")}`. Los parciales se vuelven a reducir
+    cuando superan el presupuesto de memoria, así el estado queda acotado por
+    la cantidad de grupos.
+    """
+    columnas = list(dict.fromkeys([por] + [col for col, _ in agregaciones.values()]))
+    combinar = {nombre: _COMBINAR[op] for nombre, (_, op) in agregaciones.items()}
+    parciales: List[pd.DataFrame] = []
+    acumulado = 0
+    for bloque in iterar_tabla(tabla, columnas, base, memoria_max):
+        parcial = bloque.groupby(por, observed=True).agg(**agregaciones)
+        parciales.append(parcial)
+        acumulado += int(parcial.memory_usage(deep=True).sum())
+        if acumulado > memoria_max // FRACCION_BLOQUE:
+            parciales = [pd.concat(parciales).groupby(level=0, observed=True).agg(combinar)]
+            acumulado = int(parciales[0].memory_usage(deep=True).sum())
+    if not parciales:
+        return pd.DataFrame(columns=list(agregaciones)).rename_axis(por)
+    return pd.concat(parciales).groupby(level=0, observed=True).agg(combinar)
+
+
+# --------------------------------------
+# Agregaciones de la app
+# --------------------------------------
+@perfil.medido(categoria="bloques")
+def metricas_totales(exacto: bool = True, base: Path = datos.BD_PATH,
+                     memoria_max: int = MEMORIA_MAX) -> Dict[str, int]:
+    """"Clientes totales" y "Ventas totales" del Tema 1."""
+    return {
+        "clientes": contar_distintos("clientes", "id_cliente", exacto, base, memoria_max),
+        "ventas": contar_distintos("ventas", "id_venta", exacto, base, memoria_max),
+    }
+
+
+@perfil.medido(categoria="bloques")
+def compras_por_cliente(base: Path = datos.BD_PATH, memoria_max: int = MEMORIA_MAX) -> pd.DataFrame:
+    """Ventas por cliente. Como `id_venta` es PK, el conteo de filas es el `nunique`."""
+    conteo = agregar_por_grupo("ventas", "id_cliente", {"compras": ("id_venta", "size")}, base, memoria_max)
+    return conteo.reset_index()
+
+
+@perfil.medido(categoria="bloques")
+def ventas_por_pago(exacto: bool = True, base: Path = datos.BD_PATH,
+                    memoria_max: int = MEMORIA_MAX) -> pd.DataFrame:
+    serie = distintos_por_grupo("ventas", "medio_pago", "id_venta", exacto, base, memoria_max)
+    resultado = serie.sort_values(ascending=False).rename("ventas").rename_axis("medio_pago").reset_index()
+    resultado["medio_pago"] = resultado["medio_pago"].astype(str)
+    return resultado
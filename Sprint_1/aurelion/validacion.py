@@ -0,0 +1,195 @@
+"""Validación vectorizada de las tablas de Tienda Aurelion.
+
+Reglas (todas operan sobre columnas completas, sin bucles por fila):
+
+- `columnas`: columnas obligatorias del esquema (`aurelion.esquema`).
+- `nulos`: claves y fechas sin valor.
+- `pk`: unicidad de `id_cliente`, `id_producto` e `id_venta`.
+- `fk`: ventas → clientes, detalle_ventas → ventas y → productos.
+- `importe`: `importe == cantidad * precio_unitario` (tolerancia de centavos).
+- `no_negativo`: precios, cantidades e importes >= 0.
+
+El resultado es un `Reporte` con un `Problema` por regla incumplida, con la
+cantidad de filas afectadas y algunos ejemplos, para mostrar en la app,
+devolver por la API o guardar como JSON.
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from aurelion import esquema
+
+# Claves primarias por tabla.
+PK = {"clientes": "id_cliente", "productos": "id_producto", "ventas": "id_venta"}
+
+# (tabla, columna) -> (tabla referida, columna referida)
+FK = {
+    ("ventas", "id_cliente"): ("clientes", "id_cliente"),
+    ("detalle_ventas", "id_venta"): ("ventas", "id_venta"),
+    ("detalle_ventas", "id_producto"): ("productos", "id_producto"),
+}
+
+NO_NEGATIVOS = {
+    "productos": ["precio_unitario"],
+    "detalle_ventas": ["cantidad", "precio_unitario", "importe"],
+}
+
+NO_NULOS = {
+    "clientes": ["id_cliente"],
+    "productos": ["id_producto"],
+    "ventas": ["id_venta", "id_cliente", "fecha"],
+    "detalle_ventas": ["id_venta", "id_producto", "cantidad", "importe"],
+}
+
+# Diferencia admitida entre `importe` y `cantidad * precio_unitario`.
+TOLERANCIA_IMPORTE = 0.01
+
+MAX_EJEMPLOS = 5
+
+
+@dataclass
+class Problema:
+    tabla: str
+    regla: str
+    columna: str
+    filas: int
+    ejemplos: List[Any] = field(default_factory=list)
+    severidad: str = "error"
+    detalle: str = ""
+
+
+@dataclass
+class Reporte:
+    problemas: List[Problema] = field(default_factory=list)
+    filas: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not any(p.severidad == "error" for p in self.problemas)
+
+    def a_dataframe(self) -> pd.DataFrame:
+        columnas = ["tabla", "regla", "columna", "filas", "ejemplos", "severidad", "detalle"]
+        df = pd.DataFrame([asdict(p) for p in self.problemas], columns=columnas)
+        df["ejemplos"] = df["ejemplos"].map(lambda v: ", ".join(map(str, v)))
+        return df
+
+    def a_dict(self) -> Dict[str, Any]:
+        return {"ok": self.ok, "filas": self.filas, "problemas": [asdict(p) for p in self.problemas]}
+
+
+def _ejemplos(valores) -> List[Any]:
+    return [v.item() if hasattr(v, "item") else v for v in pd.unique(np.asarray(valores))[:MAX_EJEMPLOS]]
+
+
+def _clave(df: pd.DataFrame, tabla: str, mascara: np.ndarray) -> List[Any]:
+    """Ejemplos identificados por la PK de la tabla (o por número de fila)."""
+    columna = PK.get(tabla, "id_venta")
+    if columna in df.columns:
+        return _ejemplos(df[columna].to_numpy()[mascara])
+    return _ejemplos(np.flatnonzero(mascara))
+
+
+def validar_columnas(tablas: Dict[str, pd.DataFrame]) -> List[Problema]:
+    problemas = []
+    for tabla, df in tablas.items():
+        faltantes = [c for c in esquema.columnas(tabla) if c not in df.columns]
+        if faltantes:
+            problemas.append(Problema(tabla, "columnas", ", ".join(faltantes), len(df),
+                                      detalle="Columnas obligatorias ausentes"))
+        for col, tipo in esquema.ESQUEMAS[tabla].items():
+            if col not in df.columns:
+                continue
+            real = df[col].dtype
+            esperado_fecha = tipo == "datetime" and pd.api.types.is_datetime64_any_dtype(real)
+            esperado_num = tipo in ("int32", "float64") and pd.api.types.is_numeric_dtype(real)
+            if tipo in ("datetime", "int32", "float64") and not (esperado_fecha or esperado_num):
+                problemas.append(Problema(tabla, "tipo", col, len(df),
+                                          detalle=f"Se esperaba {tipo}, se leyó {real}"))
+    return problemas
+
+
+def validar_nulos(tablas: Dict[str, pd.DataFrame]) -> List[Problema]:
+    problemas = []
+    for tabla, columnas in NO_NULOS.items():
+        df = tablas.get(tabla)
+        if df is None:
+            continue
+        for col in columnas:
+            if col not in df.columns:
+                continue
+            mascara = df[col].isna().to_numpy()
+            if mascara.any():
+                problemas.append(Problema(tabla, "nulos", col, int(mascara.sum()), _clave(df, tabla, mascara),
+                                          detalle="Valores faltantes"))
+    return problemas
+
+
+def validar_pk(tablas: Dict[str, pd.DataFrame]) -> List[Problema]:
+    problemas = []
+    for tabla, col in PK.items():
+        df = tablas.get(tabla)
+        if df is None or col not in df.columns:
+            continue
+        mascara = df[col].duplicated(keep=False).to_numpy()
+        if mascara.any():
+            problemas.append(Problema(tabla, "pk", col, int(mascara.sum()), _ejemplos(df[col].to_numpy()[mascara]),
+                                      detalle="Clave primaria repetida"))
+    return problemas
+
+
+def validar_fk(tablas: Dict[str, pd.DataFrame]) -> List[Problema]:
+    problemas = []
+    for (tabla, col), (ref, col_ref) in FK.items():
+        df, df_ref = tablas.get(tabla), tablas.get(ref)
+        if df is None or df_ref is None or col not in df.columns or col_ref not in df_ref.columns:
+            continue
+        valores = df[col].to_numpy()
+        mascara = ~np.isin(valores, df_ref[col_ref].to_numpy()) & df[col].notna().to_numpy()
+        if mascara.any():
+            problemas.append(Problema(tabla, "fk", col, int(mascara.sum()), _ejemplos(valores[mascara]),
+                                      detalle=f"Sin correspondencia en {ref}.{col_ref}"))
+    return problemas
+
+
+def validar_importe(tablas: Dict[str, pd.DataFrame]) -> List[Problema]:
+    df = tablas.get("detalle_ventas")
+    columnas = ["cantidad", "precio_unitario", "importe"]
+    # Una columna que no es numérica ya la reporta `validar_columnas` como "tipo".
+    if df is None or not all(c in df.columns and pd.api.types.is_numeric_dtype(df[c]) for c in columnas):
+        return []
+    esperado = df["cantidad"].to_numpy(dtype=float) * df["precio_unitario"].to_numpy(dtype=float)
+    mascara = np.abs(df["importe"].to_numpy(dtype=float) - esperado) > TOLERANCIA_IMPORTE
+    if not mascara.any():
+        return []
+    return [Problema("detalle_ventas", "importe", "importe", int(mascara.sum()), _clave(df, "detalle_ventas", mascara),
+                     detalle="importe distinto de cantidad * precio_unitario")]
+
+
+def validar_no_negativos(tablas: Dict[str, pd.DataFrame]) -> List[Problema]:
+    problemas = []
+    for tabla, columnas in NO_NEGATIVOS.items():
+        df = tablas.get(tabla)
+        if df is None:
+            continue
+        for col in columnas:
+            if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]):
+                continue
+            mascara = (df[col] < 0).to_numpy()
+            if mascara.any():
+                problemas.append(Problema(tabla, "no_negativo", col, int(mascara.sum()),
+                                          _clave(df, tabla, mascara), detalle="Valores negativos"))
+    return problemas
+
+
+REGLAS = [validar_columnas, validar_nulos, validar_pk, validar_fk, validar_importe, validar_no_negativos]
+
+
+def validar(tablas: Dict[str, pd.DataFrame], reglas: Optional[List] = None) -> Reporte:
+    """Aplica `reglas` (todas por defecto) a las tablas presentes en `tablas`."""
+    reporte = Reporte(filas={t: int(len(df)) for t, df in tablas.items()})
+    for regla in reglas or REGLAS:
+        reporte.problemas.extend(regla(tablas))
+    return reporte
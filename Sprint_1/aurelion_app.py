@@ -1,28 +1,40 @@
-
 # Tienda Aurelion - App Interactiva (Streamlit)
 # ------------------------------------------------
 # Requisitos:
-#   pip install streamlit pandas openpyxl
+#   pip install streamlit pandas pyarrow scipy openpyxl
 #
 # Ejecutar:
-#   streamlit run streamlit_aurelion_app_logo_fixed.py
+#   streamlit run aurelion_app.py
 #
 # Estructura esperada:
 #   AURELION/
-#   ├── streamlit_aurelion_app_logo_fixed.py
-#   ├── BD/
-#   │   ├── clientes.xlsx
-#   │   ├── productos.xlsx
-#   │   ├── ventas.xlsx
-#   │   └── detalle_ventas.xlsx
+#   ├── aurelion_app.py
+#   ├── aurelion/            (acceso a datos: lectores, esquema y caché columnar)
+#   ├── BD/                  (cada tabla en .parquet, .csv, .csv.gz o .xlsx)
+#   │   ├── clientes.*
+#   │   ├── productos.*
+#   │   ├── ventas.*
+#   │   ├── detalle_ventas.*
+#   │   └── .cache/          (generada: tablas en Arrow IPC)
 #   └── IMAGES/
 #       └── LOGO.png
 #       └── LOGO2.png
 
+from __future__ import annotations
+
+import json
+
 import streamlit as st
-import pandas as pd
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Tuple
+
+# pandas y la analítica se importan solo en las páginas con datos (ver más abajo y
+# aurelion.arranque): Pseudocódigo, Diagrama y Resumen arrancan sin cargarlos.
+from aurelion import arranque, perfil
+
+# Cada rerun tiene su perfilador: tramos de carga, cálculo y render (panel lateral).
+perfilador = perfil.Perfilador("aurelion_app")
+perfil.activar(perfilador)
 
 # Configuración de la página
 st.set_page_config(
@@ -55,61 +67,222 @@ st.markdown("<hr>", unsafe_allow_html=True)
 # --------------------------------------
 # Funciones auxiliares
 # --------------------------------------
-@st.cache_data(show_spinner=False)
-def load_excel_or_prompt(default_path: Path, label: str) -> pd.DataFrame:
-    if default_path.exists():
-        return pd.read_excel(default_path)
-    st.info(f"No se encontró **{default_path.name}**. Subilo para continuar.")
-    file = st.file_uploader(f"Subir {label} ({default_path.name})", type=["xlsx"], key=f"uploader_{label}")
+@st.cache_resource(show_spinner=False, max_entries=1, on_release=lambda tablas: tablas.cerrar())
+def _load_cached_tables(firmas: Tuple) -> datos.TablasPerezosas:
+    # `firmas` (mtime, tamaño de cada fuente) es la clave: si cambia un archivo se recarga
+    # y la instancia anterior se cierra (solo se conserva la de los datos vigentes).
+    # Una instancia compartida entre sesiones; cada tabla se carga cuando una página la usa.
+    return datos.TablasPerezosas(base_path)
+
+def tablas_en_disco() -> datos.TablasPerezosas:
+    fuentes = [datos.buscar_fuente(t, base_path) for t in datos.TABLAS]
+    return _load_cached_tables(tuple(datos.firma_fuente(f) if f else None for f in fuentes))
+
+def load_table_or_prompt(label: str, columnas: Optional[Tuple[str, ...]] = None) -> pd.DataFrame:
+    # Carga diferida: solo la tabla (y las columnas) que pide la página actual.
+    if datos.buscar_fuente(label, base_path) is not None:
+        with st.spinner(f"Cargando {label}..."):
+            return tablas_en_disco().cargar(label, columnas)
+    st.info(f"No se encontró **{label}** (parquet, csv, csv.gz o xlsx) en BD/. Subilo para continuar.")
+    file = st.file_uploader(f"Subir {label}", type=["parquet", "csv", "gz", "xlsx"], key=f"uploader_{label}")
     if file is not None:
-        return pd.read_excel(file)
+        df = datos.leer_fuente(file, label)
+        return df if columnas is None else df[list(columnas)]
     st.stop()
 
-def dtype_to_scale(dtype: str, colname: str) -> str:
-    d = dtype.lower()
-    name = colname.lower()
-    if any(k in name for k in ["id_", "email", "nombre", "ciudad", "categoria", "medio_pago", "id"]):
-        if "id" in name:
-            return "Nominal (identificador)"
-        return "Nominal (categórica)"
-    if "datetime" in d or "date" in d:
-        return "Temporal (fecha/tiempo)"
-    if "int" in d or "float" in d:
-        if any(k in name for k in ["cantidad", "precio", "importe", "monto", "total"]):
-            return "Razón (numérica)"
-        return "Intervalo / Razón (numérica)"
-    return "Nominal"
-
-def schema_table(df: pd.DataFrame) -> pd.DataFrame:
-    return pd.DataFrame({
-        "columna": df.columns,
-        "dtype_pandas": [str(df[c].dtype) for c in df.columns],
-        "escala_aprox": [dtype_to_scale(str(df[c].dtype), c) for c in df.columns]
-    })
+def archivo_de(label: str) -> str:
+    # El archivo de BD/ que se usa para la tabla, en el formato que esté.
+    fuente = datos.buscar_fuente(label, base_path)
+    return fuente.name if fuente is not None else f"{label} (sin archivo en BD/)"
+
+def muestra_de(label: str, n: int = 5) -> pd.DataFrame:
+    if datos.buscar_fuente(label, base_path) is not None:
+        return datos.muestra(label, n, base_path)
+    return load_table_or_prompt(label).head(n)
 
 # --------------------------------------
 # Rutas relativas
 # --------------------------------------
 base_path = Path(__file__).parent / "BD"
 
-data_paths: Dict[str, Path] = {
-    "clientes": base_path / "clientes.xlsx",
-    "productos": base_path / "productos.xlsx",
-    "ventas": base_path / "ventas.xlsx",
-    "detalle_ventas": base_path / "detalle_ventas.xlsx",
-}
+# Páginas que usan datos: al entrar se precalienta en segundo plano la caché
+# columnar de las tablas en disco (Pseudocódigo, Diagrama y Resumen no cargan nada).
+PAGINAS_CON_DATOS = ("Temas", "Fuentes")
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_cached_star(version: str) -> estrella.Estrella:
+    # Un índice por versión de datos (solo la vigente), compartido entre sesiones.
+    return estrella.cargar_estrella(base_path)
+
+def load_star() -> estrella.Estrella:
+    if all(datos.buscar_fuente(t, base_path) is not None for t in datos.TABLAS):
+        return _load_cached_star(datos.version_datos(base_path))
+    # Alguna tabla vino del uploader: se indexa en memoria sin persistir.
+    return estrella.construir_estrella(*(load_table_or_prompt(t) for t in datos.TABLAS))
+
+@st.cache_resource(show_spinner=False)
+def planificador_global() -> planificador.Planificador:
+    # Un planificador por proceso, compartido entre sesiones: recalcula en segundo
+    # plano cuando cambian los datos y sirve el último resultado bueno mientras tanto.
+    return planificador.Planificador(base_path)
+
+def precalculado(nombre: str):
+    # Si el precálculo en segundo plano falló (p. ej. un error transitorio), se calcula
+    # en esta ejecución; el planificador lo reintenta con espera creciente.
+    try:
+        return planificador_global().resultado(nombre)
+    except RuntimeError:
+        perfil.contar("planificador.respaldos")
+        return planificador.ARTEFACTOS[nombre].calcular(base_path)
+
+def load_cube() -> cubo.Cubo:
+    if all(datos.buscar_fuente(t, base_path) is not None for t in datos.TABLAS):
+        return precalculado("cubo")
+    return cubo.construir_cubo(load_star())
+
+def load_periods() -> periodos.Periodos:
+    # Las sumas acumuladas quedan en memoria: cualquier par de rangos se responde sin recalcular.
+    if all(datos.buscar_fuente(t, base_path) is not None for t in datos.TABLAS):
+        return precalculado("periodos")
+    return periodos.construir_periodos(load_cube())
 
-with st.spinner("Cargando datasets..."):
-    clientes = load_excel_or_prompt(data_paths["clientes"], "clientes")
-    productos = load_excel_or_prompt(data_paths["productos"], "productos")
-    ventas = load_excel_or_prompt(data_paths["ventas"], "ventas")
-    detalle_ventas = load_excel_or_prompt(data_paths["detalle_ventas"], "detalle_ventas")
+# --------------------------------------
+# Resultados derivados
+# --------------------------------------
+# Con los datos en BD/ se usa aurelion.api (caché compartida entre sesiones y
+# procesos), y lo que precalcula el planificador se toma de ahí; si alguna tabla
+# vino del uploader se calcula en memoria (`datos_en_disco` se define al entrar
+# a una página con datos).
+def top_clientes_por_compras(n: int = 10, por_bloques: bool = False) -> pd.DataFrame:
+    if datos_en_disco and n == planificador.TOP_N and not por_bloques:
+        return precalculado("top_clientes")
+    if datos_en_disco:
+        return api.top_clientes(n, por_bloques, base=base_path)
+    return analitica.top_clientes(analitica.compras_por_cliente(load_star()), n)
+
+def totales_tema1(por_bloques: bool = False) -> Dict[str, int]:
+    if datos_en_disco and not por_bloques:
+        return precalculado("totales")
+    if datos_en_disco:
+        return api.totales(por_bloques, base=base_path)
+    return analitica.totales(load_table_or_prompt("clientes", ("id_cliente",)),
+                             load_table_or_prompt("ventas", ("id_venta",)))
+
+def ventas_por_medio_pago(por_bloques: bool = False) -> pd.DataFrame:
+    if datos_en_disco and not por_bloques:
+        return precalculado("ventas_por_pago")
+    if datos_en_disco:
+        return api.ventas_por_pago(por_bloques, base=base_path)
+    return analitica.ventas_por_pago(load_table_or_prompt("ventas", ("id_venta", "medio_pago")))
+
+def segmentos_clientes() -> pd.DataFrame:
+    if datos_en_disco:
+        return precalculado("segmentos_rfm")
+    return rfm.segmentos_rfm(load_table_or_prompt("ventas", ("id_venta", "id_cliente", "fecha")),
+                             load_table_or_prompt("detalle_ventas", ("id_venta", "importe")),
+                             load_table_or_prompt("clientes", ("id_cliente", "fecha_alta")))
+
+def schema_table_de(label: str) -> pd.DataFrame:
+    if datos.buscar_fuente(label, base_path) is not None:
+        return api.esquema(label, base=base_path)
+    return analitica.schema_table(load_table_or_prompt(label))
+
+def validacion_tablas() -> pd.DataFrame:
+    if datos_en_disco:
+        return precalculado("validacion")
+    # La validación necesita las tablas completas (con sus columnas desnormalizadas), no las compactas.
+    return validacion.validar({t: datos.cargar_tabla(t, base_path) if datos.buscar_fuente(t, base_path) is not None
+                               else load_table_or_prompt(t) for t in datos.TABLAS}).a_dataframe()
+
+def indice_geo_en_memoria() -> geo.IndiceGeo:
+    return geo.construir_indice(load_table_or_prompt("clientes", ("id_cliente", "latitud", "longitud")),
+                                load_table_or_prompt("ventas", ("id_venta", "id_cliente")),
+                                load_table_or_prompt("detalle_ventas", ("id_venta", "importe")))
+
+def densidad_geografica() -> pd.DataFrame:
+    if datos_en_disco:
+        return api.densidad_geo(base=base_path)
+    return geo.densidad(indice_geo_en_memoria())
+
+def ventas_en_radio(lat: float, lon: float, km: float) -> Dict[str, float]:
+    if datos_en_disco:
+        return api.ventas_cerca(lat, lon, km, base=base_path)
+    return geo.totales(geo.en_radio(indice_geo_en_memoria(), lat, lon, km))
+
+def productos_juntos(id_producto: int, k: int = 10) -> pd.DataFrame:
+    if datos_en_disco:
+        return api.comprados_juntos(id_producto, k, base=base_path)
+    return canasta.juntos(canasta.construir_canasta(load_table_or_prompt("detalle_ventas", ("id_venta", "id_producto"))),
+                          id_producto, k)
+
+def reglas_de_canasta(n: int = 20) -> pd.DataFrame:
+    if datos_en_disco:
+        return api.reglas_asociacion(n=n, base=base_path)
+    detalle = load_table_or_prompt("detalle_ventas", ("id_venta", "id_producto"))
+    return canasta.reglas(canasta.construir_canasta(detalle)).head(n)
+
+def serie_pagos(grano: str, medida: str, categorias: Tuple[str, ...] = ()) -> pd.DataFrame:
+    if datos_en_disco:
+        return api.serie_pagos(grano, medida, categorias, base=base_path)
+    return analitica.serie_por_pago(load_cube(), grano, medida, categorias)
 
 # --------------------------------------
 # Navegación lateral
 # --------------------------------------
 st.sidebar.title("Navegación")
-section = st.sidebar.radio("Ir a:", ["Temas", "Fuentes", "Pseudocódigo", "Diagrama", "Resumen Sprint 1"])
+# `?seccion=Diagrama` en la URL abre directamente esa página.
+if "seccion" not in st.session_state and st.query_params.get("seccion") in arranque.PAGINAS:
+    st.session_state.seccion = st.query_params["seccion"]
+section = st.sidebar.radio("Ir a:", arranque.PAGINAS, key="seccion")
+st.query_params["seccion"] = section
+
+# El modo por bloques solo se muestra en las páginas con datos; se conserva su
+# valor mientras se visitan las demás.
+if "modo_bloques" in st.session_state:
+    st.session_state.modo_bloques = st.session_state.modo_bloques
+
+if section in PAGINAS_CON_DATOS:
+    import pandas as pd
+    from aurelion import (analitica, api, canasta, cubo, datos, estrella, exportar, geo, periodos, planificador, rfm,
+                          streaming, validacion)
+
+    datos_en_disco = all(datos.buscar_fuente(t, base_path) is not None for t in datos.TABLAS)
+    modo_bloques = st.sidebar.checkbox(
+        "Modo por bloques (datos > RAM)",
+        key="modo_bloques",
+        help=f"Calcula las métricas leyendo BD/ por bloques, con un tope de "
+             f"{streaming.MEMORIA_MAX >> 20} MB (variable AURELION_MEMORIA_MAX).",
+    )
+    tablas_en_disco().precargar(*(t for t in datos.TABLAS if datos.buscar_fuente(t, base_path) is not None))
+
+    if datos_en_disco:
+        plan = planificador_global()
+        # Los artefactos de la página actual salen primero de la cola de precálculo.
+        plan.priorizar(section)
+        recalculando = plan.ocupado
+
+        with st.sidebar.expander("🕒 Precálculo en segundo plano"):
+            # Mientras hay trabajos, solo este fragmento se refresca (cada 1 s); al
+            # terminar, un rerun completo muestra los resultados nuevos.
+            @st.fragment(run_every=1.0 if recalculando else None)
+            def estado_precalculo() -> None:
+                if recalculando and not plan.ocupado:
+                    st.rerun()
+                estado = plan.estado()
+                obsoletos = estado.loc[estado["desactualizado_s"] > 0, "artefacto"]
+                if len(obsoletos):
+                    st.caption(f"Se muestra la versión anterior de {', '.join(obsoletos)} mientras se recalcula.")
+                st.dataframe(estado.drop(columns=["version", "prioridad"]).round(3),
+                             use_container_width=True, hide_index=True)
+                st.caption(f"Se revisan cambios en BD/ cada {plan.intervalo:g} s; "
+                           "primero se calcula lo de la página actual.")
+
+            estado_precalculo()
+
+panel_perfil = st.sidebar.checkbox(
+    "Panel de rendimiento",
+    help="Tiempos, memoria y aciertos de caché de cada paso de esta ejecución.",
+)
 
 
 # --------------------------------------
@@ -136,17 +309,58 @@ if section == "Temas":
             """
         )
 
-        with st.expander("Vista rápida de datos relacionados (clientes + ventas)"):
-            ventas_c = ventas.merge(clientes[["id_cliente", "ciudad", "fecha_alta"]], on="id_cliente", how="left")
-            compras_por_cliente = ventas_c.groupby("id_cliente")["id_venta"].nunique().rename("compras").reset_index()
-            top_clientes = compras_por_cliente.sort_values("compras", ascending=False).head(10)
+        with st.expander("Vista rápida de datos relacionados (clientes + ventas)"), perfil.tramo("app.tema1_top10", "pagina"):
+            totales = totales_tema1(modo_bloques)
+            top_clientes = top_clientes_por_compras(10, modo_bloques)
 
             col1, col2 = st.columns(2)
-            col1.metric("Clientes totales", int(clientes["id_cliente"].nunique()))
-            col2.metric("Ventas totales", int(ventas["id_venta"].nunique()))
+            col1.metric("Clientes totales", int(totales["clientes"]))
+            col2.metric("Ventas totales", int(totales["ventas"]))
             st.write("**Top 10 por cantidad de compras**")
             st.dataframe(top_clientes, use_container_width=True, hide_index=True)
 
+        with st.expander("Indicadores RFM y segmentación (Nuevos / Activos / Inactivos)"), perfil.tramo("app.tema1_rfm", "pagina"):
+            tabla_rfm = segmentos_clientes()
+            conteo = tabla_rfm["segmento"].value_counts(sort=False)
+            cols = st.columns(len(conteo))
+            for col, (segmento, cantidad) in zip(cols, conteo.items()):
+                col.metric(segmento, int(cantidad))
+            st.caption("Fecha de referencia: última compra registrada. Puntajes R/F/M por quintil (1 = bajo, 5 = alto).")
+            st.dataframe(tabla_rfm.sort_values(["r", "f", "m"], ascending=False).reset_index(),
+                         use_container_width=True, hide_index=True)
+
+        with st.expander("🗺️ Mapa de ventas por zona"), perfil.tramo("app.tema1_mapa", "pagina"):
+            celdas = densidad_geografica()
+            if celdas.empty:
+                st.info("Los clientes no tienen coordenadas cargadas.")
+            else:
+                # Radio del punto proporcional a la raíz de las ventas de la celda (en metros).
+                escala = celdas["ventas"].max() or 1
+                celdas = celdas.assign(radio=(celdas["ventas"] / escala) ** 0.5 * geo.CELDA_KM * 500 + 100)
+                st.map(celdas, latitude="latitud", longitude="longitud", size="radio")
+                st.caption(f"Cada punto es una celda de {geo.CELDA_KM:g} km × {geo.CELDA_KM:g} km con clientes.")
+
+                centro = celdas.loc[celdas["ventas"].idxmax()]
+                col_lat, col_lon, col_km = st.columns(3)
+                lat = col_lat.number_input("Latitud", value=round(float(centro["latitud"]), 4), format="%.4f")
+                lon = col_lon.number_input("Longitud", value=round(float(centro["longitud"]), 4), format="%.4f")
+                km = col_km.slider("Radio (km)", 1, 100, 10)
+                cerca = ventas_en_radio(lat, lon, float(km))
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Clientes en el radio", cerca["clientes"])
+                col2.metric("Ventas", cerca["ventas"])
+                col3.metric("Importe", f"{cerca['importe']:,.0f}")
+
+        with st.expander("🧺 Productos que se compran juntos"), perfil.tramo("app.tema1_canasta", "pagina"):
+            catalogo = load_table_or_prompt("productos", ("id_producto", "nombre_producto"))
+            nombres = dict(zip(catalogo["id_producto"], catalogo["nombre_producto"]))
+            elegido = st.selectbox("Producto", list(nombres), format_func=lambda i: f"{i} — {nombres[i]}")
+            st.dataframe(productos_juntos(int(elegido), 10), use_container_width=True, hide_index=True)
+            st.caption("Lift > 1: se compran juntos más de lo esperable por azar. "
+                       "Confianza: proporción de las ventas del producto elegido que incluyen al otro.")
+            st.write("**Reglas de asociación con mayor lift**")
+            st.dataframe(reglas_de_canasta(20), use_container_width=True, hide_index=True)
+
     if "Tema 2" in tema:
         st.markdown("### 💳 Tema 2 — Preferencias de pago y su impacto en las ventas")
         st.markdown(
@@ -159,11 +373,97 @@ if section == "Temas":
             """
         )
 
-        with st.expander("Vista rápida: Ventas por método de pago"):
-            ventas_por_pago = ventas.groupby("medio_pago")["id_venta"].nunique().sort_values(ascending=False).reset_index()
-            ventas_por_pago.columns = ["medio_pago", "ventas"]
+        with st.expander("Vista rápida: Ventas por método de pago"), perfil.tramo("app.tema2_pagos", "pagina"):
+            ventas_por_pago = ventas_por_medio_pago(modo_bloques)
             st.dataframe(ventas_por_pago, use_container_width=True, hide_index=True)
 
+        with st.expander("Evolución temporal por método de pago"), perfil.tramo("app.tema2_serie", "pagina"):
+            col_g, col_m = st.columns(2)
+            grano = col_g.radio("Grano", list(cubo.GRANOS), index=2, horizontal=True, key="grano_pago")
+            medida = col_m.radio("Medida", cubo.MEDIDAS, horizontal=True, key="medida_pago")
+            categorias = st.multiselect("Filtrar por categoría",
+                                        list(load_table_or_prompt("productos", ("categoria",))["categoria"].cat.categories))
+            st.line_chart(serie_pagos(grano, medida, tuple(categorias)))
+            if categorias:
+                st.caption("Con filtro de categoría, *ventas* cuenta ventas con al menos un producto de esas categorías.")
+
+        with st.expander("📊 Comparativa entre períodos"), perfil.tramo("app.tema2_comparativa", "pagina"):
+            acumulados = load_periods()
+            inicio, fin = pd.Timestamp(acumulados.inicio).date(), pd.Timestamp(acumulados.fin).date()
+            rango = st.date_input("Período actual", (max(inicio, fin - pd.Timedelta(days=29)), fin),
+                                  min_value=inicio, max_value=fin, key="rango_comparativa")
+            col_c, col_p = st.columns(2)
+            contra = col_c.radio("Comparar con", ["Período anterior", "Mismo período del año anterior"],
+                                 horizontal=True, key="contra_comparativa")
+            por = col_p.selectbox("Por", periodos.PORCIONES, key="por_comparativa")
+            if len(rango) == 2:
+                if contra == "Período anterior":
+                    comparativa = periodos.comparar(acumulados, rango[0], rango[1], por=por)
+                else:
+                    comparativa = periodos.interanual(acumulados, rango[0], rango[1], por=por)
+                st.dataframe(comparativa, use_container_width=True, hide_index=True)
+
+            col_w, col_v = st.columns(2)
+            ventana = col_w.radio("Ventana móvil (días)", periodos.VENTANAS, index=1, horizontal=True, key="ventana_movil")
+            medida_movil = col_v.radio("Medida", cubo.MEDIDAS, index=2, horizontal=True, key="medida_movil")
+            moviles = periodos.ventanas(acumulados, medida_movil, por, (ventana,))
+            st.line_chart(moviles.pivot(index="fecha", columns=por, values="valor"))
+            st.caption("Crecimiento interanual = ventana actual contra la misma ventana un año antes "
+                       "(columna *crecimiento_interanual_pct* en `python -m aurelion consulta ventanas_moviles`).")
+
+    with st.expander("⬇️ Descargas (CSV, CSV gzip, Parquet)"), perfil.tramo("app.temas_descargas", "pagina"):
+        if not datos_en_disco:
+            st.info("Las descargas leen las tablas de BD/: subí los archivos a esa carpeta para habilitarlas.")
+        else:
+            col_f, col_t = st.columns(2)
+            nombre_fuente = col_f.selectbox("Datos", sorted(exportar.FUENTES), key="fuente_descarga")
+            formato = col_t.radio("Formato", list(exportar.FORMATOS), horizontal=True, key="formato_descarga")
+            parametros = {}
+            if nombre_fuente in ("cubo", "detalle_ventas"):
+                acumulados = load_periods()
+                inicio, fin = pd.Timestamp(acumulados.inicio).date(), pd.Timestamp(acumulados.fin).date()
+                rango = st.date_input("Fechas", (inicio, fin), min_value=inicio, max_value=fin, key="rango_descarga")
+                if len(rango) == 2:
+                    parametros.update(desde=str(rango[0]), hasta=str(rango[1]))
+                medios = load_table_or_prompt("ventas", ("medio_pago",))["medio_pago"]
+                parametros["medio_pago"] = tuple(st.multiselect("Medio de pago", sorted(medios.astype(str).unique()),
+                                                                key="medio_descarga"))
+            if nombre_fuente == "cubo":
+                col_g, col_p = st.columns(2)
+                parametros["grano"] = col_g.radio("Grano", list(cubo.GRANOS), index=2, horizontal=True,
+                                                  key="grano_descarga")
+                parametros["por"] = tuple(col_p.multiselect("Por", cubo.DIMENSIONES, ["medio_pago"], key="por_descarga"))
+            if st.button("Preparar archivo", key="preparar_descarga"):
+                st.session_state["exportacion"] = exportar.solicitar(nombre_fuente, formato, base_path, **parametros)
+
+            pedido = st.session_state.get("exportacion")
+            if pedido is not None:
+                # El archivo se escribe en un hilo de fondo; mientras tanto solo este
+                # fragmento se vuelve a ejecutar (cada 1 s) para ver si ya está.
+                pendiente = not pedido.lista
+
+                @st.fragment(run_every=1.0 if pendiente else None)
+                def estado_descarga() -> None:
+                    if not pedido.lista:
+                        st.caption(f"Generando {pedido.nombre_archivo}…")
+                    elif pendiente:
+                        st.rerun()   # un rerun completo detiene el refresco periódico
+                    elif pedido.error is not None:
+                        st.error(f"No se pudo exportar: {pedido.error}")
+                    elif pedido.resultado().stat().st_size > exportar.DESCARGA_MAX_BYTES:
+                        # Streamlit guarda en memoria el archivo entero que entrega: por encima del tope
+                        # no se ofrece el botón.
+                        st.info(f"El archivo supera {exportar.DESCARGA_MAX_BYTES >> 20} MiB y no se descarga "
+                                f"desde la app. Está en el servidor: `{pedido.resultado()}`.")
+                    else:
+                        # `leer` se llama recién al hacer clic y entrega el archivo abierto.
+                        st.download_button(f"Descargar {pedido.nombre_archivo}", data=pedido.leer,
+                                           file_name=pedido.nombre_archivo, mime=pedido.mime)
+                        st.caption(f"{pedido.resultado().stat().st_size / 1024:,.0f} KiB · se reutiliza "
+                                   "mientras no cambien los datos ni los filtros.")
+
+                estado_descarga()
+
 # --------------------------------------
 # FUENTES
 # --------------------------------------
@@ -171,25 +471,41 @@ if section == "Fuentes":
     st.subheader("Fuentes — Datasets de referencia")
     st.caption("**Fuente general:** Archivos provistos para el TP de Tienda Aurelion (datasets sintéticos).")
 
-    with st.expander("📁 clientes.xlsx — Definición, estructura, tipos y escala"):
+    with st.expander(f"📁 {archivo_de('clientes')} — Definición, estructura, tipos y escala"), perfil.tramo("app.fuentes_clientes", "pagina"):
         st.markdown("**Definición:** Maestro de clientes con datos básicos de identificación y alta.")
-        st.dataframe(schema_table(clientes), use_container_width=True, hide_index=True)
-        st.dataframe(clientes.head(), use_container_width=True)
+        st.dataframe(schema_table_de("clientes"), use_container_width=True, hide_index=True)
+        st.dataframe(muestra_de("clientes"), use_container_width=True)
 
-    with st.expander("📁 ventas.xlsx — Definición, estructura, tipos y escala"):
+    with st.expander(f"📁 {archivo_de('ventas')} — Definición, estructura, tipos y escala"), perfil.tramo("app.fuentes_ventas", "pagina"):
         st.markdown("**Definición:** Cabecera de ventas con la fecha, el cliente asociado y el método de pago.")
-        st.dataframe(schema_table(ventas), use_container_width=True, hide_index=True)
-        st.dataframe(ventas.head(), use_container_width=True)
+        st.dataframe(schema_table_de("ventas"), use_container_width=True, hide_index=True)
+        st.dataframe(muestra_de("ventas"), use_container_width=True)
 
-    with st.expander("📁 detalle_ventas.xlsx — Definición, estructura, tipos y escala"):
+    with st.expander(f"📁 {archivo_de('detalle_ventas')} — Definición, estructura, tipos y escala"), perfil.tramo("app.fuentes_detalle_ventas", "pagina"):
         st.markdown("**Definición:** Detalle de cada venta con cantidades, precios e importes.")
-        st.dataframe(schema_table(detalle_ventas), use_container_width=True, hide_index=True)
-        st.dataframe(detalle_ventas.head(), use_container_width=True)
+        st.dataframe(schema_table_de("detalle_ventas"), use_container_width=True, hide_index=True)
+        st.dataframe(muestra_de("detalle_ventas"), use_container_width=True)
 
-    with st.expander("📁 productos.xlsx — Definición, estructura, tipos y escala"):
+    with st.expander(f"📁 {archivo_de('productos')} — Definición, estructura, tipos y escala"), perfil.tramo("app.fuentes_productos", "pagina"):
         st.markdown("**Definición:** Catálogo de productos con su categoría y precio unitario.")
-        st.dataframe(schema_table(productos), use_container_width=True, hide_index=True)
-        st.dataframe(productos.head(), use_container_width=True)
+        st.dataframe(schema_table_de("productos"), use_container_width=True, hide_index=True)
+        st.dataframe(muestra_de("productos"), use_container_width=True)
+
+    with st.expander("✅ Validación — claves, relaciones, importes y no negatividad"), perfil.tramo("app.fuentes_validacion", "pagina"):
+        problemas = validacion_tablas()
+        if problemas.empty:
+            st.success("Sin problemas: claves primarias únicas, claves foráneas completas, "
+                       "importe = cantidad × precio_unitario y sin valores negativos.")
+        else:
+            st.warning(f"{len(problemas)} reglas con problemas.")
+            st.dataframe(problemas, use_container_width=True, hide_index=True)
+
+    if datos_en_disco:
+        with st.expander("💾 Memoria — representación compacta por tabla"), perfil.tramo("app.fuentes_memoria", "pagina"):
+            st.markdown("En memoria, ventas y detalle no repiten el nombre/email del cliente ni el nombre/precio "
+                        "del producto (se obtienen de `clientes` y `productos` al pedirlos), los enteros usan el "
+                        "tipo más chico posible y los textos repetidos se codifican como categorías.")
+            st.dataframe(api.memoria_tablas(base=base_path), use_container_width=True, hide_index=True)
 
 st.markdown(
     """
@@ -221,106 +537,21 @@ if section == "Pseudocódigo":
     # ---------- Tema 1 ----------
     if "Tema 1" in tema_pseudo:
         st.markdown("### 🧠 Tema 1 — Comportamiento de clientes y fidelización")
-        st.code(
-            """
-INICIO
-    CARGAR dataset de clientes
-    CARGAR dataset de ventas
-    UNIR ambos datasets POR id_cliente
-    CALCULAR frecuencia_compra = cantidad de ventas por cliente
-    CALCULAR recencia = fecha_actual - última_compra
-    CALCULAR monetización = suma de importes por cliente
-    CLASIFICAR clientes EN:
-        - Nuevos (fecha_alta reciente)
-        - Activos (recencia baja)
-        - Inactivos (recencia alta)
-    MOSTRAR métricas de fidelización
-FIN
-            """,
-            language="text"
-        )
+        st.code(arranque.contenido("pseudocodigo_tema1.txt"), language="text")
 
     # ---------- Tema 2 ----------
     if "Tema 2" in tema_pseudo:
         st.markdown("### 💳 Tema 2 — Preferencias de pago y su impacto")
-        st.code(
-            """
-INICIO
-    CARGAR dataset de ventas
-    AGRUPAR ventas POR medio_pago
-    CONTAR cantidad de operaciones por método
-    CALCULAR importe_total POR método de pago
-    ORDENAR resultados de mayor a menor
-    GENERAR gráfico de barras:
-        - Eje X: medios de pago
-        - Eje Y: cantidad de ventas o importes
-    IDENTIFICAR el método más utilizado
-    RECOMENDAR promociones basadas en los resultados
-FIN
-            """,
-            language="text"
-        )
-        
+        st.code(arranque.contenido("pseudocodigo_tema2.txt"), language="text")
+
 # --------------------------------------
 # DIAGRAMA
 # --------------------------------------
 if section == "Diagrama":
     st.subheader("🧭 Diagrama de flujo — App Tienda Aurelion")
 
-    dot = r'''
-    digraph G {
-      bgcolor="transparent";
-      rankdir=TB;  // 👈 orientación vertical (Top to Bottom)
-      fontsize=10;
-
-      node [shape=rectangle, style="rounded,filled", fillcolor="#F7F7F9",
-            color="#B8B8C4", fontname="Helvetica", fontsize=10];
-      edge [color="#73FF86", penwidth=1.8];  // 💚 color de las flechas
-
-      start  [shape=circle, label="Inicio", fillcolor="#E8F5E9"];
-      load   [label="Cargar datasets (BD/*.xlsx)\nload_excel_or_prompt()", fillcolor="#E3F2FD"];
-      header [label="Header: LOGO (IMAGES/LOGO2.png)\n+ título/subtítulo", fillcolor="#F3E5F5"];
-      nav    [label="Sidebar: radio('Temas','Fuentes','Pseudocódigo','Diagrama')", fillcolor="#FFFDE7"];
-
-      temas   [label="Página: Temas", fillcolor="#E8EAF6"];
-      tsel    [label="selectbox: Tema 1 / Tema 2", fillcolor="#E8EAF6"];
-      t2      [label="Tema 1: KPIs + Top10 clientes\n(expander)", fillcolor="#E8EAF6"];
-      t3      [label="Tema 2: Ventas por medio de pago\n(expander)", fillcolor="#E8EAF6"];
-
-      fuentes [label="Página: Fuentes", fillcolor="#E0F2F1"];
-      f1      [label="clientes.xlsx\n(schema_table + head)", fillcolor="#E0F2F1"];
-      f2      [label="ventas.xlsx\n(schema_table + head)", fillcolor="#E0F2F1"];
-      f3      [label="detalle_ventas.xlsx\n(schema_table + head)", fillcolor="#E0F2F1"];
-      f4      [label="productos.xlsx\n(schema_table + head)", fillcolor="#E0F2F1"];
-
-      pseudo  [label="Página: Pseudocódigo", fillcolor="#FFF3E0"];
-      psel    [label="selectbox: Tema 1 / Tema 2", fillcolor="#FFF3E0"];
-      pc2     [label="Pseudocódigo Tema 1", fillcolor="#FFF3E0"];
-      pc3     [label="Pseudocódigo Tema 2", fillcolor="#FFF3E0"];
-
-      start -> load -> header -> nav;
-
-      nav -> temas;
-      nav -> fuentes;
-      nav -> pseudo;
-      nav -> start [style=dotted, color="#F291FF",fontcolor="#F291FF", label="(volver)", fontsize=10];
-
-      temas -> tsel;
-      tsel -> t2;
-      tsel -> t3;
-
-      fuentes -> f1;
-      fuentes -> f2;
-      fuentes -> f3;
-      fuentes -> f4;
-
-      pseudo -> psel;
-      psel -> pc2;
-      psel -> pc3;
-    }
-    '''
-
-    st.graphviz_chart(dot, use_container_width=True)
+    # El DOT se dibuja en el navegador: no hace falta el paquete graphviz de Python.
+    st.graphviz_chart(arranque.contenido("diagrama.dot"), use_container_width=True)
     st.caption("El diagrama refleja el flujo actual de navegación y vistas de la app, sin análisis adicionales.")
 
 # --------------------------------------
@@ -328,42 +559,27 @@ if section == "Diagrama":
 # --------------------------------------
 if section == "Resumen Sprint 1":
     st.subheader("📘 Resumen — Sprint 1")
+    st.markdown(arranque.contenido("resumen_sprint1.md"))
 
-    st.markdown(
-        """
-        ### 🛒 Tienda Aurelion — Aplicación Interactiva (Sprint 1)
-
-        **Objetivo del Sprint:**  
-        Construir la base funcional de la aplicación interactiva en Streamlit, permitiendo visualizar datos,
-        navegar entre secciones y presentar los fundamentos analíticos del proyecto *Tienda Aurelion*.
-
-        ---
-
-        ### ✅ Entregables logrados
-
-        - Estructura completa del proyecto **AURELION/**
-          - Subcarpetas organizadas: `BD/` y `IMAGES/`
-          - Archivo principal: `aurelion_app.py`
-          - Documentación: `requirements.txt` y `README.md`
-        - **Interfaz Streamlit** con encabezado, logo y navegación lateral.
-        - **Carga dinámica** de datasets Excel (`clientes`, `ventas`, `productos`, `detalle_ventas`).
-        - **Visualización de temas del TP**:
-          - *Tema 1:* Comportamiento de clientes y fidelización.  
-          - *Tema 2:* Preferencias de pago y su impacto.
-        - **Pseudocódigo y Diagrama de flujo** integrados en la app.
-        - **Esquema de datos** automático con tipo y escala estimada.
-
-        ---
-
-        ### 💡 Próximos pasos — Sprint 2 (Análisis)
-
-        - Incorporar **indicadores RFM (Recencia, Frecuencia, Monetización)**.
-        - Agregar **gráficos interactivos** (barras, líneas, tortas, mapas de calor).
-        - Crear paneles de **insights automáticos** y **segmentación de clientes**.
-        - Integrar **descargas CSV** y comparativas entre períodos.
-        - Mejorar la **presentación visual** (temas, colores, disposición).
-
-        ---
-   
-        """
-    )
+# --------------------------------------
+# PANEL DE RENDIMIENTO
+# --------------------------------------
+if panel_perfil:
+    with st.sidebar.expander("⏱️ Rendimiento de esta ejecución", expanded=True):
+        st.metric("Tiempo total", f"{perfilador.total() * 1000:.0f} ms")
+        if perfilador.contadores:
+            st.write({k: v for k, v in sorted(perfilador.contadores.items())})
+        st.write("**Tramos** (propio = sin los tramos internos)")
+        st.dataframe(perfilador.tabla().drop(columns="nivel"), use_container_width=True, hide_index=True)
+        st.write("**Acumulado por tramo**")
+        st.dataframe(perfilador.resumen(), use_container_width=True, hide_index=True)
+        from aurelion import cache
+
+        stats = cache.cache_global().estadisticas()
+        st.caption(f"Caché compartida (todas las sesiones): {stats['aciertos']} aciertos, "
+                   f"{stats['fallos']} fallos, {stats['entradas']} entradas, {stats['bytes'] / 2**20:.1f} MB.")
+        st.download_button("Descargar traza (chrome://tracing)", json.dumps(perfilador.chrome_trace()),
+                           file_name="aurelion_traza.json", mime="application/json")
+        st.download_button("Descargar registros (JSONL)",
+                           "\n".join(json.dumps(r, default=str) for r in perfilador.registros()),
+                           file_name="aurelion_tramos.jsonl", mime="application/x-ndjson")
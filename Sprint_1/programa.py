@@ -8,107 +8,135 @@ del archivo.
 Reglas aplicadas:
 - Bucle principal que muestra el menú y permite volver hasta elegir Salir.
 - Funciones sencillas por sección: `mostrar_tema()`, `mostrar_metadatos()`, etc.
+- Cada sección es un texto armado una sola vez al importar el módulo (`TEMA`,
+  `METADATOS`, ..., `MENU`) que se imprime con un único `print`.
 """
 
 from typing import Callable
 
 
+TEMA = "\n".join([
+    "\n=== 1. Tema, problema y objetivo ===\n",
+    "Tema: Análisis del comportamiento de los clientes",
+    "",
+    "Problema: Se sospecha que existen inconsistencias en el comportamiento de compra de los clientes en temporadas del año, dado que los costes operativos se han elevado por la poca rotación de productos.",
+    "",
+    "Solución: Se va a realizar un análisis de serie de tiempo en ventas",
+    "\n---\n",
+])
+
+
 def mostrar_tema() -> None:
-    print("\n=== 1. Tema, problema y objetivo ===\n")
-    print("Tema: Análisis del comportamiento de los clientes")
-    print()
-    print("Problema: Se sospecha que existen inconsistencias en el comportamiento de compra de los clientes en temporadas del año, dado que los costes operativos se han elevado por la poca rotación de productos.")
-    print()
-    print("Solución: Se va a realizar un análisis de serie de tiempo en ventas")
-    print("\n---\n")
+    print(TEMA)
+
+
+METADATOS = "\n".join([
+    "\n=== 2. Metadatos del dataset de referencia ===\n",
+    "A continuación se proponen tablas de metadatos para cada archivo Excel: Clientes.xlsx, Detalle_ventas.xlsx, Productos.xlsx y Ventas.xlsx\n",
+    "--- Clientes ---",
+    "ID_Cliente: Int, Cuantitativo, Discreto",
+    "Nombre_Cliente: Str, Cualitativo, Nominal",
+    "Email: Str, Cualitativo, Nominal",
+    "Ciudad: Str, Cualitativo, Nominal",
+    "Fecha_alta: DateTime, Cuantitativo, Intervalo",
+    "",
+    "--- Productos ---",
+    "ID_producto: Int, Cuantitativo, Discreto",
+    "nombre_producto: Str, Cualitativo, Nominal",
+    "categoria: Str, Cualitativo, Nominal",
+    "precio_unitario: Float, Cuantitativo, Continuo",
+    "",
+    "--- Ventas ---",
+    "ID_venta: Int, Cuantitativo, Discreto",
+    "fecha: DateTime, Cuantitativo, Intervalo",
+    "ID_cliente: Int, Cuantitativo, Discreto",
+    "nombre_cliente: Str, Cualitativo, Nominal",
+    "email: Str, Cualitativo, Nominal",
+    "medio_pago: Str, Cualitativo, Nominal",
+    "",
+    "--- Detalle_ventas ---",
+    "ID_Venta: Int, Cuantitativo, Discreto (FK)",
+    "ID_Producto: Int, Cuantitativo, Discreto (FK)",
+    "nombre_producto: Str, Cualitativo, Nominal",
+    "cantidad: Int, Cuantitativo, Discreto",
+    "precio_unitario: Float, Cuantitativo, Continuo",
+    "importe: Float, Cuantitativo, Continuo",
+    "\n---\n",
+])
 
 
 def mostrar_metadatos() -> None:
-    print("\n=== 2. Metadatos del dataset de referencia ===\n")
-    print("A continuación se proponen tablas de metadatos para cada archivo Excel: Clientes.xlsx, Detalle_ventas.xlsx, Productos.xlsx y Ventas.xlsx\n")
-    print("--- Clientes ---")
-    print("ID_Cliente: Int, Cuantitativo, Discreto")
-    print("Nombre_Cliente: Str, Cualitativo, Nominal")
-    print("Email: Str, Cualitativo, Nominal")
-    print("Ciudad: Str, Cualitativo, Nominal")
-    print("Fecha_alta: DateTime, Cuantitativo, Intervalo")
-    print()
-    print("--- Productos ---")
-    print("ID_producto: Int, Cuantitativo, Discreto")
-    print("nombre_producto: Str, Cualitativo, Nominal")
-    print("categoria: Str, Cualitativo, Nominal")
-    print("precio_unitario: Float, Cuantitativo, Continuo")
-    print()
-    print("--- Ventas ---")
-    print("ID_venta: Int, Cuantitativo, Discreto")
-    print("fecha: DateTime, Cuantitativo, Intervalo")
-    print("ID_cliente: Int, Cuantitativo, Discreto")
-    print("nombre_cliente: Str, Cualitativo, Nominal")
-    print("email: Str, Cualitativo, Nominal")
-    print("medio_pago: Str, Cualitativo, Nominal")
-    print()
-    print("--- Detalle_ventas ---")
-    print("ID_Venta: Int, Cuantitativo, Discreto (FK)")
-    print("ID_Producto: Int, Cuantitativo, Discreto (FK)")
-    print("nombre_producto: Str, Cualitativo, Nominal")
-    print("cantidad: Int, Cuantitativo, Discreto")
-    print("precio_unitario: Float, Cuantitativo, Continuo")
-    print("importe: Float, Cuantitativo, Continuo")
-    print("\n---\n")
+    print(METADATOS)
+
+
+RELACIONES = "\n".join([
+    "\n=== 3. Relación de entidades ===\n",
+    "Relaciones esperadas entre tablas:\n",
+    "- Clientes (PK: ID Cliente)",
+    "- Productos (PK: ID Producto)",
+    "- Ventas (PK: ID Venta, FK: ID Cliente -> Clientes.ID Cliente)",
+    "- Detalle_ventas (PK: ID Venta -> Ventas.ID Venta, FK: ID Producto -> Productos.ID Producto)",
+    "\nEjemplo en texto:\nClientes.ID Cliente (1) <--- (N) Ventas.ID Cliente\nVentas.ID Venta (1) <--- (N) Detalle_ventas.ID Venta\nProductos.ID Producto (1) <--- (N) Detalle_ventas.ID Producto",
+    "\n---\n",
+])
 
 
 def mostrar_relaciones() -> None:
-    print("\n=== 3. Relación de entidades ===\n")
-    print("Relaciones esperadas entre tablas:\n")
-    print("- Clientes (PK: ID Cliente)")
-    print("- Productos (PK: ID Producto)")
-    print("- Ventas (PK: ID Venta, FK: ID Cliente -> Clientes.ID Cliente)")
-    print("- Detalle_ventas (PK: ID Venta -> Ventas.ID Venta, FK: ID Producto -> Productos.ID Producto)")
-    print("\nEjemplo en texto:\nClientes.ID Cliente (1) <--- (N) Ventas.ID Cliente\nVentas.ID Venta (1) <--- (N) Detalle_ventas.ID Venta\nProductos.ID Producto (1) <--- (N) Detalle_ventas.ID Producto")
-    print("\n---\n")
+    print(RELACIONES)
+
+
+DIAGRAMA = "\n".join([
+    "\n=== 4. Diagrama del programa (pseudocódigo) ===\n",
+    "Inicio",
+    "  Cargar texto de documentación desde 'documentacion.md' a memoria (o incrustar directamente en variables)",
+    "  Mientras True:",
+    "    Mostrar menú principal con opciones numeradas (1..6)",
+    "    Leer opción del usuario",
+    "    Si opción == 1: mostrar sección 'Tema, problema y solución'",
+    "    Si opción == 2: mostrar sección 'Metadatos del dataset de referencia'",
+    "    Si opción == 3: mostrar sección 'Relación de entidades'",
+    "    Si opción == 4: mostrar sección 'Diagrama del programa'",
+    "    Si opción == 5: mostrar sección 'Sugerencias y mejoras con Copilot'",
+    "    Si opción == 6: salir del programa",
+    "    Si entrada inválida: mostrar mensaje de error y volver a mostrar menú",
+    "  FinMientras",
+    "Fin",
+    "\n---\n",
+])
 
 
 def mostrar_diagrama() -> None:
-    print("\n=== 4. Diagrama del programa (pseudocódigo) ===\n")
-    print("Inicio")
-    print("  Cargar texto de documentación desde 'documentacion.md' a memoria (o incrustar directamente en variables)")
-    print("  Mientras True:")
-    print("    Mostrar menú principal con opciones numeradas (1..6)")
-    print("    Leer opción del usuario")
-    print("    Si opción == 1: mostrar sección 'Tema, problema y solución'")
-    print("    Si opción == 2: mostrar sección 'Metadatos del dataset de referencia'")
-    print("    Si opción == 3: mostrar sección 'Relación de entidades'")
-    print("    Si opción == 4: mostrar sección 'Diagrama del programa'")
-    print("    Si opción == 5: mostrar sección 'Sugerencias y mejoras con Copilot'")
-    print("    Si opción == 6: salir del programa")
-    print("    Si entrada inválida: mostrar mensaje de error y volver a mostrar menú")
-    print("  FinMientras")
-    print("Fin")
-    print("\n---\n")
+    print(DIAGRAMA)
+
+
+SUGERENCIAS = "\n".join([
+    "\n=== 5. Sugerencias y mejoras con Copilot ===\n",
+    "- Añadir validaciones de esquema cuando se carguen los archivos .xlsx (columnas obligatorias, tipos, no-negatividad de precios y cantidades).",
+    "- Implementar tests unitarios para las funciones que parsean y validan metadatos.",
+    "- Añadir una opción en la GUI para exportar la documentación a PDF usando reportlab o weasyprint.",
+    "- Añadir una página de resumen con KPIs (ventas totales, clientes activos, top 10 productos) que se actualice al cargar los datos reales.",
+    "- Manejar localizaciones/fechas con dateutil y normalizar los formatos de fecha.",
+    "\n---\n",
+])
 
 
 def mostrar_sugerencias() -> None:
-    print("\n=== 5. Sugerencias y mejoras con Copilot ===\n")
-    print("- Añadir validaciones de esquema cuando se carguen los archivos .xlsx (columnas obligatorias, tipos, no-negatividad de precios y cantidades).")
-    print("- Implementar tests unitarios para las funciones que parsean y validan metadatos.")
-    print("- Añadir una opción en la GUI para exportar la documentación a PDF usando reportlab o weasyprint.")
-    print("- Añadir una página de resumen con KPIs (ventas totales, clientes activos, top 10 productos) que se actualice al cargar los datos reales.")
-    print("- Manejar localizaciones/fechas con dateutil y normalizar los formatos de fecha.")
-    print("\n---\n")
+    print(SUGERENCIAS)
+
+
+MENU = "\n".join([
+    "\nVisor de Documentación - Tienda Aurelion",
+    "1. Tema, problema y solución",
+    "2. Metadatos del dataset de referencia",
+    "3. Relación de entidades",
+    "4. Diagrama del programa",
+    "5. Sugerencias y mejoras con Copilot",
+    "6. Salir",
+])
 
 
 def mostrar_menu() -> None:
-    opciones = [
-        "1. Tema, problema y solución",
-        "2. Metadatos del dataset de referencia",
-        "3. Relación de entidades",
-        "4. Diagrama del programa",
-        "5. Sugerencias y mejoras con Copilot",
-        "6. Salir",
-    ]
-    print("\nVisor de Documentación - Tienda Aurelion")
-    for opt in opciones:
-        print(opt)
+    print(MENU)
 
 
 def main() -> None:
@@ -0,0 +1,125 @@
+"""Fixtures de las pruebas: un juego de datos sintético (`aurelion.sintetico`).
+
+Las pruebas comparan cada camino rápido (deltas, bloques, cubo, sumas
+acumuladas, índices, exportaciones) contra una referencia directa en pandas
+sobre las mismas tablas, leídas con `pd.read_csv`.
+
+    cd Sprint_1 && python -m pytest -q
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+# Las cachés compartidas leen su carpeta del entorno al importar `aurelion`:
+# se apuntan a un temporal para no tocar las de `BD/` ni las de otra sesión.
+_TMP = Path(tempfile.mkdtemp(prefix="aurelion-pruebas-"))
+os.environ["AURELION_CACHE_DIR"] = str(_TMP / "derivados")
+os.environ["AURELION_EXPORT_DIR"] = str(_TMP / "exportes")
+
+from aurelion import cubo, datos, sintetico  # noqa: E402
+
+N_VENTAS = 3000
+FECHAS = {"clientes": ["fecha_alta"], "ventas": ["fecha"]}
+
+
+def leer_csv(base: Path, tabla: str) -> pd.DataFrame:
+    """Referencia: la tabla tal cual, sin esquema ni caché."""
+    return pd.read_csv(base / f"{tabla}.csv", parse_dates=FECHAS.get(tabla, []))
+
+
+@pytest.fixture(scope="session")
+def base(tmp_path_factory) -> Path:
+    """Carpeta con las cuatro tablas sintéticas en CSV. Las pruebas no la modifican."""
+    destino = tmp_path_factory.mktemp("bd")
+    sintetico.generar(destino, N_VENTAS, formato="csv", semilla=0)
+    return destino
+
+
+@pytest.fixture(scope="session")
+def crudas(base) -> Dict[str, pd.DataFrame]:
+    return {t: leer_csv(base, t) for t in datos.TABLAS}
+
+
+@pytest.fixture(scope="session")
+def filas_unidas(crudas) -> pd.DataFrame:
+    """Referencia: una fila por línea de detalle con la fecha, el medio de pago, la categoría y la ciudad."""
+    return (crudas["detalle_ventas"]
+            .merge(crudas["ventas"][["id_venta", "fecha", "medio_pago", "id_cliente"]], on="id_venta")
+            .merge(crudas["productos"][["id_producto", "categoria"]], on="id_producto")
+            .merge(crudas["clientes"][["id_cliente", "ciudad"]], on="id_cliente"))
+
+
+# --------------------------------------
+# Comparaciones
+# --------------------------------------
+def assert_tabla_igual(obtenido: pd.DataFrame, esperado: pd.DataFrame) -> None:
+    """Mismas columnas y filas en el mismo orden: números con tolerancia, fechas exactas, el resto como texto."""
+    assert list(obtenido.columns) == list(esperado.columns)
+    assert len(obtenido) == len(esperado)
+    for columna in esperado.columns:
+        a, b = obtenido[columna], esperado[columna]
+        if pd.api.types.is_numeric_dtype(b):
+            np.testing.assert_allclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float), err_msg=columna)
+        elif pd.api.types.is_datetime64_any_dtype(b):
+            assert (a.to_numpy("datetime64[ns]") == b.to_numpy("datetime64[ns]")).all(), columna
+        else:
+            assert (a.astype(str).to_numpy() == b.astype(str).to_numpy()).all(), columna
+
+
+def assert_cubo_igual(a: cubo.Cubo, b: cubo.Cubo) -> None:
+    """Las mismas celdas en los dos cubos de cada grano, sin importar el orden ni las categorías."""
+    for tipo in ("ventas", "lineas"):
+        for grano in cubo.GRANOS:
+            x, y = getattr(a, tipo)[grano], getattr(b, tipo)[grano]
+            claves = [c for c in y.columns if c not in cubo.MEDIDAS]
+            x, y = (t.astype({c: str for c in claves[1:]}).sort_values(claves).reset_index(drop=True) for t in (x, y))
+            assert_tabla_igual(x, y)
+
+
+class BaseCreciente:
+    """Copia de `base` con las primeras `corte` ventas; `anexar` agrega las siguientes al final de los CSV.
+
+    Las líneas se copian tal cual de los CSV originales, así que después de
+    anexar todo la carpeta es idéntica a `base`.
+    """
+
+    def __init__(self, base: Path, crudas: Dict[str, pd.DataFrame], ruta: Path, corte: int) -> None:
+        self.ruta = ruta
+        self.ventas = crudas["ventas"]
+        self.detalle = crudas["detalle_ventas"]
+        self._lineas = {t: (base / f"{t}.csv").read_text(encoding="utf-8").splitlines(keepends=True)
+                        for t in ("ventas", "detalle_ventas")}
+        for tabla in ("clientes", "productos"):
+            (ruta / f"{tabla}.csv").write_bytes((base / f"{tabla}.csv").read_bytes())
+        for tabla in ("ventas", "detalle_ventas"):
+            (ruta / f"{tabla}.csv").write_text(self._lineas[tabla][0], encoding="utf-8")
+        self.cargadas = 0
+        self.anexar(corte)
+
+    def anexar(self, n: int) -> pd.DataFrame:
+        """Anexa las `n` ventas siguientes con su detalle y devuelve esas ventas."""
+        nuevas = self.ventas.iloc[self.cargadas:self.cargadas + n]
+        lineas = self.detalle.index[self.detalle["id_venta"].isin(nuevas["id_venta"])]
+        for tabla, filas in (("ventas", nuevas.index), ("detalle_ventas", lineas)):
+            with open(self.ruta / f"{tabla}.csv", "a", encoding="utf-8", newline="") as f:
+                # La línea 0 es el encabezado.
+                f.writelines(self._lineas[tabla][i + 1] for i in filas)
+        self.cargadas += len(nuevas)
+        return nuevas
+
+
+@pytest.fixture
+def creciente(base, crudas, tmp_path) -> BaseCreciente:
+    """Copia de `base` con la mitad de las ventas, para probar los anexos."""
+    return BaseCreciente(base, crudas, tmp_path, len(crudas["ventas"]) // 2)
@@ -0,0 +1,43 @@
+"""Analítica sobre la estrella: conteos por cliente y por medio de pago contra pandas."""
+
+import numpy as np
+import pandas as pd
+
+from aurelion import analitica, perfil
+from aurelion.estrella import construir_estrella
+
+
+def por_cliente(compras: pd.DataFrame) -> dict:
+    return {(None if pd.isna(k) else int(k)): int(v) for k, v in zip(compras["id_cliente"], compras["compras"])}
+
+
+def test_compras_por_cliente(crudas):
+    compras = analitica.compras_por_cliente(construir_estrella(**crudas))
+    esperado = crudas["ventas"]["id_cliente"].value_counts()
+    obtenido = por_cliente(compras)
+    assert len(compras) == len(crudas["clientes"])
+    assert {k: v for k, v in obtenido.items() if v} == esperado.to_dict()
+    assert sum(obtenido.values()) == len(crudas["ventas"])
+
+
+def test_ventas_de_clientes_desconocidos_no_se_pierden(crudas):
+    ventas = crudas["ventas"].copy()
+    # Dos ventas de un cliente que no está en `clientes` y una sin cliente.
+    ventas["id_cliente"] = ventas["id_cliente"].astype(float)
+    desconocido = crudas["clientes"]["id_cliente"].max() + 1
+    ventas.loc[ventas.index[:2], "id_cliente"] = desconocido
+    ventas.loc[ventas.index[2], "id_cliente"] = np.nan
+    with perfil.perfilando() as p:
+        compras = analitica.compras_por_cliente(construir_estrella(**{**crudas, "ventas": ventas}))
+    assert p.contadores.get("analitica.ventas_sin_cliente") == 3
+    obtenido = por_cliente(compras)
+    assert obtenido[desconocido] == 2 and obtenido[None] == 1
+    assert sum(obtenido.values()) == len(ventas)
+    assert analitica.top_clientes(compras, len(compras))["compras"].sum() == len(ventas)
+
+
+def test_ventas_por_pago(crudas):
+    obtenido = analitica.ventas_por_pago(crudas["ventas"])
+    esperado = crudas["ventas"]["medio_pago"].value_counts()
+    assert dict(zip(obtenido["medio_pago"], obtenido["ventas"])) == esperado.to_dict()
+    assert obtenido["ventas"].is_monotonic_decreasing
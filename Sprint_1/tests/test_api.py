@@ -0,0 +1,124 @@
+"""CLI y servidor HTTP: las consultas del registro contra el mismo cálculo con pandas."""
+
+import json
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pandas as pd
+import pytest
+
+from aurelion import __main__ as cli
+from aurelion import api
+
+
+def correr(capsys, *argv):
+    """Código de salida, JSON impreso (o texto si no es JSON) y stderr de `python -m aurelion ...`."""
+    codigo = cli.main([str(a) for a in argv])
+    salida, errores = capsys.readouterr()
+    try:
+        return codigo, json.loads(salida), errores
+    except ValueError:
+        return codigo, salida.strip(), errores
+
+
+def top(crudas, n: int) -> dict:
+    compras = crudas["ventas"]["id_cliente"].value_counts()
+    return compras[compras >= compras.nlargest(n).min()].to_dict()
+
+
+# --------------------------------------
+# CLI
+# --------------------------------------
+def test_listar(base, capsys):
+    codigo, catalogo, _ = correr(capsys, "--bd", base, "listar")
+    assert codigo == 0
+    assert catalogo.keys() == api.CONSULTAS.keys()
+    assert catalogo["top_clientes"]["parametros"] == {"n": 10, "por_bloques": False}
+    assert catalogo["ventas_cerca"]["parametros"]["lat"] is None
+
+
+def test_consulta(base, crudas, capsys):
+    codigo, filas, _ = correr(capsys, "--bd", base, "consulta", "top_clientes", "n=5")
+    assert codigo == 0 and len(filas) == 5
+    # Con empates en el quinto lugar cualquiera de los empatados es válido.
+    esperado = top(crudas, 5)
+    assert all(esperado[f["id_cliente"]] == f["compras"] for f in filas)
+    _, pagos, _ = correr(capsys, "--bd", base, "consulta", "ventas_por_pago", "por_bloques=si")
+    assert {f["medio_pago"]: f["ventas"] for f in pagos} == crudas["ventas"]["medio_pago"].value_counts().to_dict()
+
+
+@pytest.mark.parametrize("parametro", ["n=diez", "limite=3"])
+def test_consulta_con_parametros_invalidos(base, capsys, parametro):
+    codigo, _, errores = correr(capsys, "--bd", base, "consulta", "top_clientes", parametro)
+    assert codigo == 2 and errores.startswith("Error:")
+    with pytest.raises(SystemExit):
+        cli.main(["--bd", str(base), "consulta", "top_clientes", "n"])
+
+
+def test_exportar_con_salida(base, crudas, capsys, tmp_path):
+    salida = tmp_path / "pagos.csv"
+    codigo, ruta, _ = correr(capsys, "--bd", base, "exportar", "compras_por_cliente", "--salida", salida)
+    assert codigo == 0 and ruta == str(salida)
+    obtenido = pd.read_csv(salida)
+    esperado = crudas["ventas"]["id_cliente"].value_counts()
+    assert dict(zip(obtenido["id_cliente"], obtenido["compras"])) == esperado.to_dict()
+
+
+def test_traza(base, crudas, capsys, tmp_path):
+    traza = tmp_path / "traza.json"
+    codigo, totales, resumen = correr(capsys, "--bd", base, "--traza", traza, "consulta", "totales")
+    assert codigo == 0
+    assert totales == {"clientes": len(crudas["clientes"]), "ventas": len(crudas["ventas"])}
+    eventos = json.loads(traza.read_text(encoding="utf-8"))["traceEvents"]
+    assert any(e.get("ph") == "X" for e in eventos)
+    # El resumen de tramos va a stderr para no mezclarse con el JSON.
+    assert "cache.totales" in resumen
+
+
+def test_convertir_parametros():
+    convertidos = api.convertir_parametros(api.CONSULTAS["serie_pagos"], {"grano": "semana", "categorias": "A,B,"})
+    assert convertidos == {"grano": "semana", "categorias": ("A", "B")}
+    convertidos = api.convertir_parametros(api.CONSULTAS["ventas_cerca"], {"lat": "-31.4", "km": "2"})
+    assert convertidos == {"lat": -31.4, "km": 2.0}
+    with pytest.raises(ValueError):
+        api.convertir_parametros(api.CONSULTAS["totales"], {"base": "/tmp"})
+
+
+# --------------------------------------
+# Servidor HTTP
+# --------------------------------------
+@pytest.fixture(scope="module")
+def servidor(base):
+    manejador = type("Manejador", (cli._Manejador,), {"base": base, "log_message": lambda *a: None})
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), manejador)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def pedir(url: str):
+    try:
+        with urlopen(url, timeout=30) as respuesta:
+            return respuesta.status, json.loads(respuesta.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_http_catalogo_y_consulta(servidor, crudas):
+    estado, catalogo = pedir(f"{servidor}/consultas")
+    assert estado == 200 and catalogo.keys() == api.CONSULTAS.keys()
+    estado, filas = pedir(f"{servidor}/consulta/top_clientes?n=3")
+    assert estado == 200 and len(filas) == 3
+    esperado = top(crudas, 3)
+    assert all(esperado[f["id_cliente"]] == f["compras"] for f in filas)
+
+
+@pytest.mark.parametrize("ruta,codigo", [("/consulta/no_existe", 404), ("/consulta/top_clientes?n=diez", 400),
+                                         ("/consulta/top_clientes?limite=3", 400), ("/otra", 404)])
+def test_http_errores(servidor, ruta, codigo):
+    estado, cuerpo = pedir(f"{servidor}{ruta}")
+    assert estado == codigo and "error" in cuerpo
@@ -0,0 +1,35 @@
+"""Arranque: importaciones diferidas."""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aurelion import arranque
+
+
+@pytest.fixture
+def lento(tmp_path, monkeypatch):
+    """Nombre de un módulo cuyo import tarda, para que los hilos lo toquen a medio cargar."""
+    (tmp_path / "aurelion_prueba_lento.py").write_text("import time\ntime.sleep(0.2)\nVALOR = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "aurelion_prueba_lento", raising=False)
+    yield "aurelion_prueba_lento"
+    sys.modules.pop("aurelion_prueba_lento", None)
+
+
+def test_perezoso_importa_en_el_primer_acceso(lento):
+    modulo = arranque.perezoso(lento)
+    assert not hasattr(sys.modules.get(lento), "VALOR")
+    assert modulo.VALOR == 42
+
+
+def test_perezoso_entre_hilos(lento):
+    modulo = arranque.perezoso(lento)
+    with ThreadPoolExecutor(8) as ejecutor:
+        assert list(ejecutor.map(lambda _: modulo.VALOR, range(8))) == [42] * 8
+
+
+def test_perezoso_modulo_inexistente():
+    with pytest.raises(ModuleNotFoundError):
+        arranque.perezoso("aurelion_no_existe")
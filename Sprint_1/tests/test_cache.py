@@ -0,0 +1,123 @@
+"""Caché compartida: expulsión LRU por tamaño, vencimiento por TTL y claves por versión de las tablas."""
+
+import pickle
+import types
+
+import pandas as pd
+import pytest
+
+from aurelion import cache, datos, perfil
+
+VALOR = list(range(1000))
+
+
+class Reloj:
+    """`time.time` que avanza solo cuando se le pide."""
+
+    def __init__(self) -> None:
+        self.ahora = 1_000_000.0
+
+    def time(self) -> float:
+        return self.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch) -> Reloj:
+    reloj = Reloj()
+    monkeypatch.setattr(cache, "time", types.SimpleNamespace(time=reloj.time))
+    return reloj
+
+
+@pytest.fixture
+def almacen(tmp_path, reloj) -> cache.CacheCompartida:
+    """Caché vacía con lugar para unas tres entradas de `VALOR` y un TTL de una hora."""
+    tamano = len(pickle.dumps(VALOR, protocol=pickle.HIGHEST_PROTOCOL))
+    return cache.CacheCompartida(tmp_path / "derivados", max_bytes=3 * tamano + 10, ttl=3600)
+
+
+def test_obtener_lo_guardado(almacen):
+    assert almacen.obtener("a") == (False, None)
+    almacen.guardar("a", {"valor": 1}, "f")
+    assert almacen.obtener("a") == (True, {"valor": 1})
+    stats = almacen.estadisticas()
+    assert (stats["aciertos"], stats["fallos"], stats["entradas"]) == (1, 1, 1)
+
+
+def test_expulsa_la_menos_usada(almacen, reloj):
+    for clave in "abc":
+        almacen.guardar(clave, VALOR)
+        reloj.ahora += 1
+    # Leer "a" la vuelve la más reciente: al pasarse del tamaño se va "b".
+    assert almacen.obtener("a")[0]
+    reloj.ahora += 1
+    almacen.guardar("d", VALOR)
+    assert [almacen.obtener(c)[0] for c in "abcd"] == [True, False, True, True]
+    stats = almacen.estadisticas()
+    assert (stats["expulsiones"], stats["entradas"]) == (1, 3)
+    assert stats["bytes"] <= almacen.max_bytes
+    assert not (almacen.carpeta / "b.pkl").exists()
+
+
+def test_vence_por_ttl(almacen, reloj):
+    almacen.guardar("corta", VALOR, ttl=10)
+    almacen.guardar("larga", VALOR)
+    reloj.ahora += 11
+    assert almacen.obtener("corta") == (False, None)
+    assert almacen.obtener("larga")[0]
+    # La vencida se borra al guardar otra, sin contar como expulsión.
+    almacen.guardar("otra", VALOR)
+    assert not (almacen.carpeta / "corta.pkl").exists()
+    assert almacen.estadisticas()["expulsiones"] == 0
+
+
+def test_archivo_roto_es_un_fallo(almacen):
+    almacen.guardar("a", VALOR)
+    (almacen.carpeta / "a.pkl").write_bytes(b"roto")
+    assert almacen.obtener("a") == (False, None)
+    assert almacen.estadisticas()["entradas"] == 0
+
+
+def test_limpiar(almacen):
+    almacen.guardar("a", VALOR)
+    almacen.obtener("a")
+    almacen.limpiar()
+    assert almacen.estadisticas() == {"aciertos": 0, "fallos": 0, "expulsiones": 0, "entradas": 0, "bytes": 0}
+    assert list(almacen.carpeta.glob("*.pkl")) == []
+
+
+# --------------------------------------
+# Decorador
+# --------------------------------------
+def test_compartido_invalida_solo_por_sus_tablas(creciente, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "cache_global", lambda: cache.CacheCompartida(tmp_path / "derivados"))
+    llamadas = []
+
+    @cache.compartido(tablas=lambda argumentos: (argumentos["tabla"],))
+    def filas(tabla: str, base=creciente.ruta, limite: int = 0) -> int:
+        llamadas.append(tabla)
+        return len(datos.cargar_tabla(tabla, base))
+
+    def contar(*args, **kwargs):
+        with perfil.perfilando() as p:
+            valor = filas(*args, **kwargs)
+        return valor, p.contadores.get("cache.aciertos", 0)
+
+    assert contar("ventas") == (len(creciente.ventas) // 2, 0)
+    assert contar("productos") == (len(pd.read_csv(creciente.ruta / "productos.csv")), 0)
+    # Los valores por defecto son parte de la clave: `limite=0` explícito es la misma entrada.
+    assert contar("ventas", limite=0)[1] == 1
+    assert contar("ventas", limite=5)[1] == 0
+    creciente.anexar(100)
+    assert contar("ventas") == (len(creciente.ventas) // 2 + 100, 0)
+    assert contar("productos")[1] == 1
+    assert llamadas == ["ventas", "productos", "ventas", "ventas"]
+
+
+def test_compartido_sin_archivos_no_cachea(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "cache_global", lambda: pytest.fail("no debería usar la caché"))
+
+    @cache.compartido(tablas=("ventas",))
+    def doble(x: int, base=tmp_path) -> int:
+        return 2 * x
+
+    assert doble(21) == 42
@@ -0,0 +1,104 @@
+"""Canasta: co-ocurrencias, reglas y Apriori contra un conteo directo de los pares de cada venta."""
+
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aurelion import canasta
+
+# Con pocos miles de ventas y cien productos, cada par aparece en pocas ventas.
+SOPORTE = 0.001
+
+
+@pytest.fixture(scope="module")
+def completa(crudas) -> canasta.Canasta:
+    return canasta.construir_canasta(crudas["detalle_ventas"])
+
+
+@pytest.fixture(scope="module")
+def conjuntos(crudas) -> Counter:
+    """Referencia: ventas que contienen cada conjunto de 1 a 4 productos."""
+    cuenta = Counter()
+    for productos in crudas["detalle_ventas"].groupby("id_venta")["id_producto"].unique():
+        productos = sorted(int(p) for p in productos)
+        for tamano in (1, 2, 3, 4):
+            cuenta.update(combinations(productos, tamano))
+    return cuenta
+
+
+def test_frecuencias(crudas, completa, conjuntos):
+    assert completa.n_ventas == crudas["detalle_ventas"]["id_venta"].nunique()
+    assert dict(zip(completa.productos.tolist(), completa.frecuencia.tolist())) == \
+        {a: n for (a, *resto), n in conjuntos.items() if not resto}
+
+
+def test_juntos(completa, conjuntos):
+    n = completa.n_ventas
+    for producto in completa.productos[:: 17]:
+        producto = int(producto)
+        resultado = canasta.juntos(completa, producto, k=len(completa.productos))
+        esperado = {(b if a == producto else a): c for (a, *resto), c in conjuntos.items()
+                    if len(resto) == 1 and producto in (a, resto[0]) for b in resto}
+        assert dict(zip(resultado["id_producto"], resultado["ventas_juntos"])) == esperado
+        frecuencia = conjuntos[(producto,)]
+        otra = np.array([conjuntos[(int(b),)] for b in resultado["id_producto"]])
+        np.testing.assert_allclose(resultado["confianza"], resultado["ventas_juntos"] / frecuencia)
+        np.testing.assert_allclose(resultado["lift"], resultado["ventas_juntos"] * n / (frecuencia * otra))
+        assert resultado["lift"].is_monotonic_decreasing
+    assert canasta.juntos(completa, -1).empty
+
+
+@pytest.mark.parametrize("confianza_min,lift_min", [(0.0, 0.0), (0.05, 1.0), (0.1, 2.0)])
+def test_reglas(completa, conjuntos, confianza_min, lift_min):
+    n = completa.n_ventas
+    esperado = {}
+    for (a, *resto), juntas in conjuntos.items():
+        if len(resto) != 1 or juntas < SOPORTE * n:
+            continue
+        b = resto[0]
+        for x, y in ((a, b), (b, a)):
+            confianza = juntas / conjuntos[(x,)]
+            lift = juntas * n / (conjuntos[(x,)] * conjuntos[(y,)])
+            if confianza >= confianza_min and lift >= lift_min:
+                esperado[(x, y)] = (juntas, confianza, lift)
+    reglas = canasta.reglas(completa, SOPORTE, confianza_min, lift_min)
+    assert esperado
+    obtenido = {(int(r.antecedente), int(r.consecuente)): (r.ventas_juntos, r.confianza, r.lift)
+                for r in reglas.itertuples()}
+    assert obtenido.keys() == esperado.keys()
+    for clave, (juntas, confianza, lift) in esperado.items():
+        assert obtenido[clave][0] == juntas
+        assert obtenido[clave][1:] == pytest.approx((confianza, lift))
+    assert reglas["lift"].is_monotonic_decreasing
+
+
+@pytest.mark.parametrize("soporte_min,max_tamano", [(0.0005, 3), (0.0005, 4), (0.002, 3), (0.003, 2)])
+def test_conjuntos_frecuentes_igual_a_enumerar(completa, conjuntos, soporte_min, max_tamano):
+    minimo = soporte_min * completa.n_ventas
+    esperado = {c: n for c, n in conjuntos.items() if n >= minimo and len(c) <= max_tamano}
+    resultado = canasta.conjuntos_frecuentes(completa, soporte_min, max_tamano)
+    assert dict(zip(resultado["productos"], resultado["ventas"])) == esperado
+    np.testing.assert_allclose(resultado["soporte"], resultado["ventas"] / completa.n_ventas)
+
+
+def test_actualizar_igual_a_reconstruir(crudas, completa):
+    detalle = crudas["detalle_ventas"]
+    # Las ventas de un producto van todas al segundo lote: el catálogo crece al actualizar.
+    producto = int(detalle["id_producto"].value_counts().index[0])
+    con_producto = detalle.loc[detalle["id_producto"] == producto, "id_venta"].unique()
+    segundo = detalle["id_venta"].isin(con_producto) | (detalle["id_venta"] > detalle["id_venta"].median())
+    previa = canasta.construir_canasta(detalle[~segundo])
+    assert producto not in previa.productos
+    actualizada = previa
+    # Cada lote trae ventas nuevas completas, como los anexos.
+    for ventas in np.array_split(detalle.loc[segundo, "id_venta"].unique(), 3):
+        actualizada = canasta.actualizar_canasta(actualizada, detalle[detalle["id_venta"].isin(ventas)])
+
+    assert actualizada.n_ventas == completa.n_ventas
+    assert (actualizada.productos == completa.productos).all()
+    assert (actualizada.coocurrencia.toarray() == completa.coocurrencia.toarray()).all()
+    pd.testing.assert_frame_equal(canasta.reglas(actualizada, SOPORTE, 0.0, 0.0),
+                                  canasta.reglas(completa, SOPORTE, 0.0, 0.0))
@@ -0,0 +1,126 @@
+"""Cubo de ventas: roll-ups, filtros y actualización por delta contra un groupby sobre las filas."""
+
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aurelion import cubo, datos
+from aurelion.estrella import construir_estrella
+
+from conftest import assert_tabla_igual
+
+FRECUENCIAS = {"semana": "W", "mes": "M"}
+
+
+@pytest.fixture(scope="module")
+def tablas(base) -> Dict[str, pd.DataFrame]:
+    return {t: datos.cargar_tabla(t, base) for t in datos.TABLAS}
+
+
+@pytest.fixture(scope="module")
+def completo(tablas) -> cubo.Cubo:
+    return cubo.construir_cubo(construir_estrella(*(tablas[t] for t in datos.TABLAS)))
+
+
+def periodo(fechas: pd.Series, grano: str) -> pd.Series:
+    if grano == "dia":
+        return fechas.dt.normalize()
+    return fechas.dt.to_period(FRECUENCIAS[grano]).dt.start_time
+
+
+def por_lineas(lineas: pd.DataFrame, grano: str, por: Sequence[str]) -> pd.DataFrame:
+    """Ventas distintas, unidades e importe de `lineas` por período y `por`."""
+    agrupadas = lineas.assign(periodo=periodo(lineas["fecha"], grano)).groupby(["periodo", *por])
+    return agrupadas.agg(ventas=("id_venta", "nunique"), unidades=("cantidad", "sum"),
+                         importe=("importe", "sum")).reset_index()
+
+
+def referencia(lineas: pd.DataFrame, grano: str, por: Sequence[str]) -> pd.DataFrame:
+    por = list(por)
+    if "categoria" in por:
+        # Por categoría, "ventas" cuenta las ventas con al menos una línea de la categoría.
+        return por_lineas(lineas, grano, por)
+    por_venta = (lineas.groupby(["id_venta", "fecha", "medio_pago", "ciudad"], as_index=False)
+                 [["cantidad", "importe"]].sum())
+    agrupadas = por_venta.assign(periodo=periodo(por_venta["fecha"], grano)).groupby(["periodo", *por])
+    return agrupadas.agg(ventas=("id_venta", "size"), unidades=("cantidad", "sum"),
+                         importe=("importe", "sum")).reset_index()
+
+
+def normalizar(df: pd.DataFrame) -> pd.DataFrame:
+    claves = [c for c in df.columns if c not in cubo.MEDIDAS]
+    df = df.astype({c: str for c in claves if c != "periodo"})
+    df = df.astype({"ventas": "int64", "unidades": "int64", "importe": float})
+    return df.sort_values(claves).reset_index(drop=True)
+
+
+def assert_igual(obtenido: pd.DataFrame, esperado: pd.DataFrame) -> None:
+    assert_tabla_igual(normalizar(obtenido), normalizar(esperado[list(obtenido.columns)]))
+
+
+@pytest.mark.parametrize("grano", sorted(cubo.GRANOS))
+@pytest.mark.parametrize("por", [(), ("medio_pago",), ("ciudad",), ("categoria",), ("medio_pago", "categoria")])
+def test_consultar_igual_a_groupby(completo, filas_unidas, grano, por):
+    assert_igual(cubo.consultar(completo, grano, por), referencia(filas_unidas, grano, por))
+
+
+def test_consultar_con_filtros_y_rango(completo, filas_unidas):
+    ciudades = sorted(filas_unidas["ciudad"].unique())[:2]
+    desde, hasta = pd.Timestamp("2023-03-01"), pd.Timestamp("2023-08-01")
+    obtenido = cubo.consultar(completo, "mes", ["categoria"], {"ciudad": ciudades, "medio_pago": ["qr", "tarjeta"]},
+                              desde, hasta)
+    filtradas = filas_unidas[filas_unidas["ciudad"].isin(ciudades)
+                             & filas_unidas["medio_pago"].isin(["qr", "tarjeta"])]
+    esperado = referencia(filtradas, "mes", ["categoria"])
+    esperado = esperado[(esperado["periodo"] >= desde) & (esperado["periodo"] <= hasta)]
+    assert not obtenido.empty
+    assert_igual(obtenido, esperado)
+
+
+@pytest.mark.parametrize("grano", ["dia", "mes"])
+@pytest.mark.parametrize("por,otros", [((), {}), (("medio_pago",), {}), (("ciudad",), {"medio_pago": ["qr"]})])
+def test_varias_categorias_cuentan_cada_venta_una_vez(completo, filas_unidas, grano, por, otros):
+    categorias = sorted(filas_unidas["categoria"].unique())[:2]
+    elegidas = filas_unidas[filas_unidas["categoria"].isin(categorias)]
+    for dim, valores in otros.items():
+        elegidas = elegidas[elegidas[dim].isin(valores)]
+    assert (elegidas.groupby("id_venta")["categoria"].nunique() > 1).any()
+    obtenido = cubo.consultar(completo, grano, por, {"categoria": categorias, **otros})
+    assert_igual(obtenido, por_lineas(elegidas, grano, por))
+    assert obtenido["ventas"].sum() == elegidas["id_venta"].nunique()
+
+
+def test_varias_categorias_sin_mascara_de_bits(tablas, filas_unidas):
+    # Con 63 categorías o más el conjunto de cada venta no entra en un int64.
+    productos = tablas["productos"].assign(categoria=lambda p: "c" + (p["id_producto"] % 70).astype(str))
+    muchas = cubo.construir_cubo(construir_estrella(tablas["clientes"], productos, tablas["ventas"],
+                                                    tablas["detalle_ventas"]))
+    lineas = filas_unidas.drop(columns="categoria").merge(productos[["id_producto", "categoria"]], on="id_producto")
+    elegidas = lineas[lineas["categoria"].isin(["c1", "c2", "c69"])]
+    obtenido = cubo.consultar(muchas, "mes", filtros={"categoria": ["c1", "c2", "c69"]})
+    assert_igual(obtenido, por_lineas(elegidas, "mes", []))
+
+
+def test_dimension_desconocida(completo):
+    with pytest.raises(ValueError):
+        cubo.consultar(completo, "mes", ["producto"])
+
+
+@pytest.mark.parametrize("lotes", [2, 4])
+def test_actualizar_igual_a_reconstruir(tablas, completo, lotes):
+    ventas, detalle = tablas["ventas"], tablas["detalle_ventas"]
+    cortes = np.linspace(0, len(ventas), lotes + 1).astype(int)
+    actual = None
+    for inicio, fin in zip(cortes[:-1], cortes[1:]):
+        lote = ventas.iloc[inicio:fin]
+        detalle_lote = detalle[detalle["id_venta"].isin(lote["id_venta"])]
+        if actual is None:
+            estrella = construir_estrella(tablas["clientes"], tablas["productos"], lote, detalle_lote)
+            actual = cubo.construir_cubo(estrella)
+        else:
+            actual = cubo.actualizar_cubo(actual, lote, detalle_lote, tablas["clientes"], tablas["productos"])
+    for grano in cubo.GRANOS:
+        assert_igual(actual.ventas[grano], completo.ventas[grano])
+        assert_igual(actual.lineas[grano], completo.lineas[grano])
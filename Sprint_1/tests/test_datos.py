@@ -0,0 +1,158 @@
+"""Caché columnar: se construye una vez, se reutiliza y se invalida solo si cambia la fuente o el esquema."""
+
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aurelion import datos, perfil
+
+from conftest import assert_tabla_igual, leer_csv
+
+
+@pytest.fixture
+def copia(base, tmp_path):
+    """Copia de `base` sin cachés, que las pruebas pueden modificar."""
+    destino = tmp_path / "bd"
+    shutil.copytree(base, destino, ignore=shutil.ignore_patterns(datos.CACHE_DIRNAME))
+    return destino
+
+
+@pytest.fixture
+def construcciones(monkeypatch):
+    """Tablas que se parsearon y escribieron a la caché (`construir_cache`)."""
+    llamadas = []
+    construir = datos.construir_cache
+    monkeypatch.setattr(datos, "construir_cache",
+                        lambda tabla, *a, **k: llamadas.append(tabla) or construir(tabla, *a, **k))
+    return llamadas
+
+
+def cargar(tabla, base, **kwargs):
+    with perfil.perfilando() as p:
+        df = datos.cargar_tabla(tabla, base, **kwargs)
+    return df, p.contadores
+
+
+def test_primera_carga_construye_y_la_segunda_lee(copia, construcciones):
+    for tabla in datos.TABLAS:
+        df, contadores = cargar(tabla, copia)
+        assert contadores.get("columnar.fallos") == 1
+        assert_tabla_igual(df, leer_csv(copia, tabla))
+        df, contadores = cargar(tabla, copia)
+        assert contadores.get("columnar.aciertos") == 1
+        assert_tabla_igual(df, leer_csv(copia, tabla))
+    assert construcciones == list(datos.TABLAS)
+    assert (copia / datos.CACHE_DIRNAME / "ventas.arrow").exists()
+
+
+def test_mtime_distinto_con_el_mismo_contenido_no_reconstruye(copia, construcciones, monkeypatch):
+    datos.cargar_tabla("productos", copia)
+    fuente = copia / "productos.csv"
+    os.utime(fuente, ns=(fuente.stat().st_atime_ns, fuente.stat().st_mtime_ns + 10**9))
+    hashes = []
+    hash_archivo = datos.hash_archivo
+    monkeypatch.setattr(datos, "hash_archivo", lambda path, *a: hashes.append(path) or hash_archivo(path, *a))
+
+    _, contadores = cargar("productos", copia)
+    assert contadores.get("columnar.aciertos") == 1
+    assert hashes == [fuente] and construcciones == ["productos"]
+    # El meta queda con el mtime nuevo: la carga siguiente ni siquiera calcula el hash.
+    cargar("productos", copia)
+    assert hashes == [fuente]
+
+
+def test_contenido_distinto_reconstruye(copia, construcciones):
+    datos.cargar_tabla("productos", copia)
+    fuente = copia / "productos.csv"
+    lineas = fuente.read_text(encoding="utf-8").splitlines(keepends=True)
+    # Otro precio para el primer producto: el hash ya no coincide y no es un anexo.
+    campos = lineas[1].rstrip("\n").split(",")
+    campos[-1] = str(int(campos[-1]) + 1)
+    lineas[1] = ",".join(campos) + "\n"
+    fuente.write_text("".join(lineas), encoding="utf-8")
+    df, contadores = cargar("productos", copia)
+    assert contadores.get("columnar.fallos") == 1
+    assert construcciones == ["productos", "productos"]
+    assert_tabla_igual(df, leer_csv(copia, "productos"))
+
+
+def test_cambio_de_esquema_reconstruye(copia, construcciones, monkeypatch):
+    datos.cargar_tabla("clientes", copia)
+    version = datos._version_esquema
+    monkeypatch.setattr(datos, "_version_esquema", lambda tabla: version(tabla) + "-otra")
+    assert not datos.cache_vigente("clientes", copia)
+    datos.cargar_tabla("clientes", copia)
+    assert construcciones == ["clientes", "clientes"]
+    assert datos.cache_vigente("clientes", copia)
+
+
+def test_proyeccion_y_muestra(copia):
+    completa = leer_csv(copia, "ventas")
+    columnas = ["id_venta", "medio_pago"]
+    assert_tabla_igual(datos.cargar_tabla("ventas", copia, columnas), completa[columnas])
+    assert_tabla_igual(datos.muestra("ventas", 5, copia), completa.head(5))
+    assert list(datos.muestra("ventas", 0, copia).columns) == list(completa.columns)
+
+
+# --------------------------------------
+# Tablas perezosas
+# --------------------------------------
+@pytest.fixture
+def lecturas(monkeypatch):
+    """(tabla, columnas) de cada `cargar_tabla` que hace `TablasPerezosas`."""
+    llamadas = []
+    cargar_tabla = datos.cargar_tabla
+    monkeypatch.setattr(datos, "cargar_tabla",
+                        lambda tabla, base, columnas=None, **k: llamadas.append((tabla, columnas))
+                        or cargar_tabla(tabla, base, columnas, **k))
+    return llamadas
+
+
+def test_perezosas_memoiza_cada_proyeccion(copia, lecturas):
+    tablas = datos.TablasPerezosas(copia, compacta=False)
+    ventas = tablas.cargar("ventas", ["id_venta", "fecha"])
+    assert tablas.cargar("ventas", ("id_venta", "fecha")) is ventas
+    assert lecturas == [("ventas", ("id_venta", "fecha"))]
+    assert_tabla_igual(ventas, leer_csv(copia, "ventas")[["id_venta", "fecha"]])
+    # Con la tabla completa en memoria, una proyección nueva sale de ella sin leer.
+    completa = tablas["ventas"]
+    tablas.cargar("ventas", ["medio_pago"])
+    assert lecturas == [("ventas", ("id_venta", "fecha")), ("ventas", None)]
+    assert_tabla_igual(completa, leer_csv(copia, "ventas"))
+    assert set(tablas.cargadas()) == {"ventas[id_venta, fecha]", "ventas", "ventas[medio_pago]"}
+    assert tablas.cargadas()["ventas"] == int(completa.memory_usage(deep=True).sum())
+    tablas.cerrar()
+    assert tablas.cargadas() == {}
+
+
+def test_perezosas_compactas(copia):
+    tablas = datos.TablasPerezosas(copia)
+    detalle = tablas["detalle_ventas"]
+    assert "nombre_producto" not in detalle.columns
+    # Una columna desnormalizada pedida explícitamente sale de su dimensión.
+    nombres = tablas.cargar("detalle_ventas", ["id_venta", "nombre_producto"])
+    esperado = leer_csv(copia, "detalle_ventas")[["id_venta", "nombre_producto"]]
+    assert_tabla_igual(nombres, esperado)
+    tablas.cerrar()
+
+
+def test_perezosas_entre_hilos_lee_una_vez(copia, lecturas):
+    tablas = datos.TablasPerezosas(copia, compacta=False)
+    with ThreadPoolExecutor(8) as ejecutor:
+        resultados = list(ejecutor.map(lambda _: tablas["clientes"], range(8)))
+    assert all(df is resultados[0] for df in resultados)
+    assert lecturas == [("clientes", None)]
+    tablas.cerrar()
+
+
+def test_precargar_calienta_la_cache_sin_retener(copia, construcciones):
+    tablas = datos.TablasPerezosas(copia)
+    tablas.precargar("ventas", "productos")
+    for pendiente in tablas._pendientes.values():
+        pendiente.result()
+    assert sorted(construcciones) == ["productos", "ventas"]
+    assert tablas.cargadas() == {}
+    assert datos.cache_vigente("ventas", copia)
+    tablas.cerrar()
@@ -0,0 +1,45 @@
+"""Representación compacta: mismos valores que la tabla completa en menos bytes."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aurelion import datos, esquema
+
+from conftest import assert_tabla_igual
+
+
+@pytest.mark.parametrize("tabla", datos.TABLAS)
+def test_compacta_igual_a_completa(base, tabla):
+    completa = datos.cargar_tabla(tabla, base)
+    compacta = datos.cargar_tabla(tabla, base, compacta=True)
+    quitadas = list(esquema.DENORMALIZADAS.get(tabla, {}))
+    assert list(compacta.columns) == [c for c in completa.columns if c not in quitadas]
+    assert_tabla_igual(compacta, completa.drop(columns=quitadas))
+    # Las desnormalizadas pedidas salen de su dimensión con los mismos valores.
+    assert_tabla_igual(datos.cargar_tabla(tabla, base, list(completa.columns), compacta=True), completa)
+
+
+def test_tipos_compactos():
+    df = pd.DataFrame({"chico": np.arange(100, dtype="int64"), "grande": np.arange(100, dtype="int64") * 10**6,
+                       "repetido": ["a", "b"] * 50, "unico": [f"x{i}" for i in range(100)],
+                       "precio": np.linspace(0, 1, 100)})
+    compacta = esquema.compactar(df.copy(), "productos")
+    assert compacta.dtypes.astype(str).to_dict() == {"chico": "int8", "grande": "int32", "repetido": "category",
+                                                     "unico": "str", "precio": "float64"}
+    assert_tabla_igual(compacta, df)
+    assert esquema.compactar(df.iloc[:0].copy(), "productos").empty
+
+
+def test_memoria_tablas(base):
+    reporte = datos.memoria_tablas(base).set_index("tabla")
+    assert list(reporte.index) == list(datos.TABLAS)
+    for tabla in datos.TABLAS:
+        completa = datos.cargar_tabla(tabla, base)
+        fila = reporte.loc[tabla]
+        assert fila["filas"] == len(completa)
+        assert fila["bytes"] == completa.memory_usage(deep=True).sum()
+        assert fila["bytes_compacta"] == datos.cargar_tabla(tabla, base, compacta=True).memory_usage(deep=True).sum()
+        assert fila["ahorro_bytes"] == fila["bytes"] - fila["bytes_compacta"] > 0
+        assert fila["ahorro_pct"] == round(100 * fila["ahorro_bytes"] / fila["bytes"], 1)
+        assert fila["columnas_quitadas"] == ", ".join(esquema.DENORMALIZADAS.get(tabla, {}))
@@ -0,0 +1,45 @@
+"""Esquema estrella: posiciones precalculadas contra `merge` sobre las claves."""
+
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from aurelion import datos, estrella
+
+
+def assert_posiciones(e: estrella.Estrella, crudas) -> None:
+    ventas, detalle = crudas["ventas"], crudas["detalle_ventas"]
+    clientes, productos = crudas["clientes"], crudas["productos"]
+    assert (clientes["id_cliente"].to_numpy()[e.venta_cliente] == ventas["id_cliente"].to_numpy()).all()
+    assert (ventas["id_venta"].to_numpy()[e.linea_venta] == detalle["id_venta"].to_numpy()).all()
+    assert (productos["id_producto"].to_numpy()[e.linea_producto] == detalle["id_producto"].to_numpy()).all()
+
+
+def test_posiciones_igual_a_merge(crudas):
+    e = estrella.construir_estrella(**crudas)
+    assert_posiciones(e, crudas)
+    ciudad = e.atributo("clientes", "ciudad", grano="venta")
+    esperado = crudas["ventas"].merge(crudas["clientes"], on="id_cliente", how="left")["ciudad"]
+    assert (ciudad.astype(str).to_numpy() == esperado.astype(str).to_numpy()).all()
+
+
+def test_clave_faltante_queda_nula():
+    pos = estrella.posiciones(np.array([10, 20, 30]), np.array([30, 5, 10, 31]))
+    assert pos.tolist() == [2, -1, 0, -1]
+
+
+def test_cargas_simultaneas(crudas, creciente):
+    creciente.anexar(len(crudas["ventas"]))
+    for tabla in datos.TABLAS:
+        datos.cargar_tabla(tabla, creciente.ruta)
+    carpeta = datos.dir_version("estrella", datos.version_datos(creciente.ruta), creciente.ruta)
+    for _ in range(5):
+        shutil.rmtree(carpeta, ignore_errors=True)
+        with ThreadPoolExecutor(8) as ejecutor:
+            estrellas = list(ejecutor.map(lambda _: estrella.cargar_estrella(creciente.ruta), range(8)))
+        for e in estrellas:
+            assert_posiciones(e, crudas)
+        # Una sola carpeta publicada y ninguna temporal a la vista.
+        assert [p.name for p in carpeta.parent.glob("*estrella*")] == [carpeta.name]
+    assert_posiciones(estrella.cargar_estrella(creciente.ruta), crudas)
@@ -0,0 +1,102 @@
+"""Exportaciones por lotes: el archivo escrito contra la misma consulta hecha con pandas."""
+
+import pandas as pd
+import pytest
+
+from aurelion import cubo, exportar, perfil, rfm
+
+from conftest import assert_tabla_igual
+
+
+@pytest.fixture(autouse=True)
+def carpeta(tmp_path, monkeypatch):
+    """Caché de exportaciones vacía en cada prueba y lotes chicos para que haya varios."""
+    monkeypatch.setattr(exportar, "EXPORT_DIR", tmp_path)
+    monkeypatch.setattr(exportar, "FILAS_LOTE", 1000)
+    return tmp_path
+
+
+def leer(ruta, formato: str) -> pd.DataFrame:
+    if formato == "parquet":
+        return pd.read_parquet(ruta)
+    return pd.read_csv(ruta, compression="gzip" if formato == "csv.gz" else None)
+
+
+@pytest.mark.parametrize("formato", sorted(exportar.FORMATOS))
+def test_detalle_completo(base, crudas, formato):
+    ruta = exportar.exportar("detalle_ventas", formato, base)
+    assert ruta.name.endswith(exportar.FORMATOS[formato][0])
+    assert_tabla_igual(leer(ruta, formato), crudas["detalle_ventas"])
+
+
+@pytest.mark.parametrize("formato", ["csv", "parquet"])
+def test_detalle_filtrado(base, crudas, formato):
+    ventas, detalle = crudas["ventas"], crudas["detalle_ventas"]
+    productos = sorted(detalle["id_producto"].unique())[:30]
+    ruta = exportar.exportar("detalle_ventas", formato, base, desde="2023-06-01", hasta="2023-12-31",
+                             medio_pago="qr,tarjeta", id_producto=",".join(map(str, productos)))
+    elegidas = ventas.loc[ventas["fecha"].between("2023-06-01", "2023-12-31")
+                          & ventas["medio_pago"].isin(["qr", "tarjeta"]), "id_venta"]
+    esperado = detalle[detalle["id_venta"].isin(elegidas) & detalle["id_producto"].isin(productos)]
+    assert 0 < len(esperado) < len(detalle)
+    assert_tabla_igual(leer(ruta, formato), esperado)
+
+
+def test_compras_por_cliente(base, crudas):
+    obtenido = leer(exportar.exportar("compras_por_cliente", "csv", base), "csv")
+    esperado = crudas["ventas"]["id_cliente"].value_counts()
+    assert dict(zip(obtenido["id_cliente"], obtenido["compras"])) == esperado.to_dict()
+
+
+def test_segmentos_rfm(base, crudas):
+    obtenido = leer(exportar.exportar("segmentos_rfm", "parquet", base), "parquet").set_index("id_cliente")
+    esperado = rfm.segmentos_rfm(crudas["ventas"], crudas["detalle_ventas"], crudas["clientes"])
+    assert_tabla_igual(obtenido.sort_index(), esperado.sort_index())
+
+
+def test_cubo(base):
+    obtenido = leer(exportar.exportar("cubo", "csv", base, grano="semana", por="categoria,ciudad",
+                                      medio_pago="efectivo"), "csv")
+    esperado = cubo.consultar(cubo.cargar_cubo(base), "semana", ["categoria", "ciudad"], {"medio_pago": ["efectivo"]})
+    esperado["periodo"] = esperado["periodo"].dt.strftime("%Y-%m-%d")
+    obtenido["periodo"] = pd.to_datetime(obtenido["periodo"]).dt.strftime("%Y-%m-%d")
+    assert_tabla_igual(obtenido, esperado)
+
+
+def test_pedido_igual_reutiliza_el_archivo(base):
+    primero = exportar.exportar("detalle_ventas", "csv", base, medio_pago="qr,efectivo")
+    with perfil.perfilando() as p:
+        pedido = exportar.solicitar("detalle_ventas", "csv", base, medio_pago=("qr", "efectivo"))
+    assert p.contadores.get("exportar.aciertos") == 1
+    assert pedido.lista and pedido.resultado() == primero
+    with pedido.leer() as archivo:
+        assert archivo.read() == primero.read_bytes()
+
+
+def test_leer_regenera_si_la_cache_lo_borro(base, crudas):
+    pedido = exportar.solicitar("detalle_ventas", "parquet", base, medio_pago="qr")
+    ruta = pedido.resultado()
+    ruta.unlink()
+    with perfil.perfilando() as p:
+        with pedido.leer() as archivo:
+            obtenido = pd.read_parquet(archivo)
+    assert p.contadores.get("exportar.fallos") == 1
+    assert ruta.exists()
+    detalle, ventas = crudas["detalle_ventas"], crudas["ventas"]
+    elegidas = ventas.loc[ventas["medio_pago"] == "qr", "id_venta"]
+    assert_tabla_igual(obtenido, detalle[detalle["id_venta"].isin(elegidas)])
+
+
+def test_recorte_conserva_el_ultimo(base, carpeta, monkeypatch):
+    monkeypatch.setattr(exportar, "MAX_BYTES", 1)
+    viejo = exportar.exportar("compras_por_cliente", "csv", base)
+    nuevo = exportar.exportar("detalle_ventas", "csv.gz", base)
+    assert nuevo.exists() and not viejo.exists()
+    assert list(carpeta.iterdir()) == [nuevo]
+
+
+def test_pedidos_invalidos(base):
+    with pytest.raises(KeyError):
+        exportar.solicitar("ventas_crudas", "csv", base)
+    with pytest.raises(ValueError):
+        exportar.solicitar("detalle_ventas", "xlsx", base)
@@ -0,0 +1,106 @@
+"""Índice geográfico: radio, rectángulo y densidad contra un recorrido completo de los clientes."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aurelion import geo
+
+
+def haversine(lat, lon, lat2, lon2) -> np.ndarray:
+    p1, p2 = np.radians(lat), np.radians(lat2)
+    dp, dl = p2 - p1, np.radians(np.asarray(lon2) - lon)
+    a = np.sin(dp / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return 2 * geo.RADIO_TIERRA_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture(scope="module")
+def clientes(crudas) -> pd.DataFrame:
+    """Referencia: clientes con sus ventas e importe totales, por groupby."""
+    ventas, detalle = crudas["ventas"], crudas["detalle_ventas"]
+    importe = detalle.merge(ventas[["id_venta", "id_cliente"]], on="id_venta").groupby("id_cliente")["importe"].sum()
+    tabla = crudas["clientes"][["id_cliente", "latitud", "longitud"]].set_index("id_cliente")
+    tabla["ventas"] = ventas["id_cliente"].value_counts().reindex(tabla.index, fill_value=0)
+    tabla["importe"] = importe.reindex(tabla.index, fill_value=0.0)
+    return tabla
+
+
+@pytest.fixture(scope="module")
+def indice(crudas) -> geo.IndiceGeo:
+    return geo.construir_indice(crudas["clientes"], crudas["ventas"], crudas["detalle_ventas"])
+
+
+def assert_mismos_clientes(obtenido: pd.DataFrame, esperado: pd.DataFrame) -> None:
+    obtenido = obtenido.set_index("id_cliente").sort_index()
+    esperado = esperado.sort_index()
+    assert list(obtenido.index) == list(esperado.index)
+    assert (obtenido["ventas"].to_numpy() == esperado["ventas"].to_numpy()).all()
+    np.testing.assert_allclose(obtenido["importe"], esperado["importe"])
+
+
+def centros(clientes: pd.DataFrame):
+    rng = np.random.default_rng(0)
+    elegidos = clientes.iloc[rng.choice(len(clientes), 5, replace=False)]
+    # Clientes, puntos al azar dentro de la zona y uno lejos de todos.
+    yield from zip(elegidos["latitud"], elegidos["longitud"])
+    yield from zip(rng.uniform(clientes["latitud"].min(), clientes["latitud"].max(), 5),
+                   rng.uniform(clientes["longitud"].min(), clientes["longitud"].max(), 5))
+    yield -40.0, -70.0
+
+
+@pytest.mark.parametrize("km", [0.5, 3, 15, 60, 400])
+def test_en_radio_igual_a_recorrer_todos(indice, clientes, km):
+    for lat, lon in centros(clientes):
+        resultado = geo.en_radio(indice, lat, lon, km)
+        distancia = haversine(lat, lon, clientes["latitud"].to_numpy(), clientes["longitud"].to_numpy())
+        assert_mismos_clientes(resultado, clientes[distancia <= km])
+        assert resultado["distancia_km"].is_monotonic_increasing
+        assert geo.totales(resultado)["ventas"] == int(clientes.loc[distancia <= km, "ventas"].sum())
+
+
+def test_en_rectangulo_igual_a_filtrar(indice, clientes):
+    rng = np.random.default_rng(1)
+    lat, lon = clientes["latitud"], clientes["longitud"]
+    for _ in range(20):
+        lat_min, lat_max = np.sort(rng.uniform(lat.min() - 0.1, lat.max() + 0.1, 2))
+        lon_min, lon_max = np.sort(rng.uniform(lon.min() - 0.1, lon.max() + 0.1, 2))
+        dentro = lat.between(lat_min, lat_max) & lon.between(lon_min, lon_max)
+        assert_mismos_clientes(geo.en_rectangulo(indice, lat_min, lon_min, lat_max, lon_max), clientes[dentro])
+    # Bordes incluidos y rectángulo que contiene a todos.
+    fila = clientes.iloc[0]
+    punto = geo.en_rectangulo(indice, fila["latitud"], fila["longitud"], fila["latitud"], fila["longitud"])
+    assert clientes.index[0] in set(punto["id_cliente"])
+    todo = geo.en_rectangulo(indice, lat.min(), lon.min(), lat.max(), lon.max())
+    assert_mismos_clientes(todo, clientes)
+
+
+def test_densidad_y_teselas_suman_los_totales(indice, clientes):
+    densidad = geo.densidad(indice)
+    assert densidad["clientes"].sum() == len(clientes)
+    assert densidad["ventas"].sum() == clientes["ventas"].sum()
+    np.testing.assert_allclose(densidad["importe"].sum(), clientes["importe"].sum())
+    for zoom in (4, 10):
+        resumen = geo.teselas(indice, zoom)
+        assert resumen["ventas"].sum() == clientes["ventas"].sum()
+        fila = resumen.sort_values("ventas").iloc[-1]
+        plano = geo.tesela(indice, zoom, int(fila["x"]), int(fila["y"]), "ventas")
+        assert plano.sum() == fila["ventas"]
+
+
+def test_clientes_sin_coordenadas_quedan_fuera(crudas):
+    clientes = crudas["clientes"].copy()
+    clientes.loc[clientes.index[:10], "latitud"] = np.nan
+    indice = geo.construir_indice(clientes, crudas["ventas"], crudas["detalle_ventas"])
+    assert len(indice.id_cliente) == len(clientes) - 10
+    assert not set(clientes["id_cliente"].iloc[:10]) & set(indice.id_cliente)
+
+
+def test_actualizar_igual_a_reconstruir(crudas, indice):
+    ventas, detalle = crudas["ventas"], crudas["detalle_ventas"]
+    corte = len(ventas) // 3
+    previas = ventas.iloc[:corte]
+    parcial = geo.construir_indice(crudas["clientes"], previas, detalle[detalle["id_venta"].isin(previas["id_venta"])])
+    nuevas = ventas.iloc[corte:]
+    actualizado = geo.actualizar_indice(parcial, nuevas, detalle[detalle["id_venta"].isin(nuevas["id_venta"])])
+    for nombre in geo.ARRAYS:
+        np.testing.assert_allclose(getattr(actualizado, nombre), getattr(indice, nombre), err_msg=nombre)
@@ -0,0 +1,168 @@
+"""Ingesta solo-anexos: particiones, compactación y agregados por delta contra una lectura completa."""
+
+import dataclasses
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from aurelion import api, datos, incremental, perfil
+from aurelion import cubo as cubo_mod
+
+from conftest import assert_cubo_igual, assert_tabla_igual, leer_csv
+
+
+def meta(tabla, ruta):
+    return json.loads((ruta / datos.CACHE_DIRNAME / f"{tabla}.meta.json").read_text(encoding="utf-8"))
+
+
+# --------------------------------------
+# Caché columnar
+# --------------------------------------
+def test_anexo_se_guarda_como_particion(creciente):
+    datos.cargar_tabla("ventas", creciente.ruta)
+    creciente.anexar(300)
+    with perfil.perfilando() as p:
+        ventas = datos.cargar_tabla("ventas", creciente.ruta)
+    assert p.contadores.get("columnar.anexos") == 1
+    assert len(meta("ventas", creciente.ruta)["particiones"]) == 2
+    assert_tabla_igual(ventas, leer_csv(creciente.ruta, "ventas"))
+
+
+def test_varios_anexos_igual_a_leer_todo(base, creciente):
+    for tabla in ("ventas", "detalle_ventas"):
+        datos.cargar_tabla(tabla, creciente.ruta)
+    while creciente.cargadas < len(creciente.ventas):
+        nuevas = creciente.anexar(400)
+        for tabla in ("ventas", "detalle_ventas"):
+            datos.cargar_tabla(tabla, creciente.ruta)
+        assert meta("ventas", creciente.ruta)["marca"] == int(nuevas["id_venta"].max())
+    for tabla in ("ventas", "detalle_ventas"):
+        assert_tabla_igual(datos.cargar_tabla(tabla, creciente.ruta), leer_csv(base, tabla))
+        assert meta(tabla, creciente.ruta)["filas"] == len(leer_csv(base, tabla))
+
+
+def test_filas_anexadas_desde_una_version_previa(creciente):
+    datos.cargar_tabla("ventas", creciente.ruta)
+    origen = meta("ventas", creciente.ruta)["sha256"]
+    primeras, segundas = creciente.anexar(200), creciente.anexar(150)
+    datos.cargar_tabla("ventas", creciente.ruta)
+    creciente.anexar(100)
+    # Sin cargar: `huella_tabla` pone la caché al día antes de leer los anexos.
+    datos.huella_tabla("ventas", creciente.ruta)
+    delta = datos.filas_anexadas("ventas", origen, creciente.ruta)
+    assert len(delta) == len(primeras) + len(segundas) + 100
+    assert delta["id_venta"].iloc[0] == primeras["id_venta"].iloc[0]
+    assert datos.filas_anexadas("ventas", "otra-version", creciente.ruta) is None
+
+
+def test_compacta_una_vez_al_llegar_al_maximo(creciente, monkeypatch):
+    monkeypatch.setattr(datos, "MAX_PARTICIONES", 3)
+    construcciones = []
+    construir = datos.construir_cache
+    monkeypatch.setattr(datos, "construir_cache", lambda *a, **k: construcciones.append(a) or construir(*a, **k))
+
+    datos.cargar_tabla("ventas", creciente.ruta)
+    for _ in range(2):
+        creciente.anexar(100)
+        datos.cargar_tabla("ventas", creciente.ruta)
+    assert len(construcciones) == 1
+    assert len(meta("ventas", creciente.ruta)["particiones"]) == 3
+
+    creciente.anexar(100)
+    ventas = datos.cargar_tabla("ventas", creciente.ruta)
+    assert len(construcciones) == 2
+    assert meta("ventas", creciente.ruta)["particiones"] == ["ventas.arrow"]
+    assert_tabla_igual(ventas, leer_csv(creciente.ruta, "ventas"))
+
+
+def test_cambio_que_no_es_anexo_reconstruye(creciente):
+    datos.cargar_tabla("ventas", creciente.ruta)
+    fuente = creciente.ruta / "ventas.csv"
+    lineas = fuente.read_text(encoding="utf-8").splitlines(keepends=True)
+    # Cambia la primera venta: lo ya ingerido no coincide, no es un anexo.
+    lineas[1] = lineas[1].rsplit(",", 1)[0] + ',"qr"\n'
+    fuente.write_text("".join(lineas), encoding="utf-8")
+    creciente.anexar(50)
+    ventas = datos.cargar_tabla("ventas", creciente.ruta)
+    assert meta("ventas", creciente.ruta)["anexos"] == []
+    assert ventas["medio_pago"].astype(str).iloc[0] == "qr"
+    assert_tabla_igual(ventas, leer_csv(creciente.ruta, "ventas"))
+
+
+# --------------------------------------
+# Agregados por delta
+# --------------------------------------
+def _igual_rfm(a: pd.DataFrame, b: pd.DataFrame) -> None:
+    assert_tabla_igual(a.sort_index().reset_index(), b.sort_index().reset_index())
+
+
+def _igual_pagos(a: pd.DataFrame, b: pd.DataFrame) -> None:
+    assert_tabla_igual(a.sort_values("medio_pago").reset_index(drop=True),
+                       b.sort_values("medio_pago").reset_index(drop=True))
+
+
+@pytest.mark.parametrize("agregado,igual", [(api.AGREGADO_RFM, _igual_rfm), (api.AGREGADO_PAGOS, _igual_pagos),
+                                            (cubo_mod.AGREGADO, assert_cubo_igual)], ids=["rfm", "pagos", "cubo"])
+def test_agregado_por_delta_igual_a_recalcular(creciente, agregado, igual):
+    incremental.cargar(agregado, creciente.ruta)
+    for n in (250, 400):
+        creciente.anexar(n)
+        with perfil.perfilando() as p:
+            estado = incremental.cargar(agregado, creciente.ruta)
+        assert p.contadores.get("incremental.deltas") == 1
+        assert "incremental.completos" not in p.contadores
+        igual(estado, agregado.construir(creciente.ruta))
+    with perfil.perfilando() as p:
+        incremental.cargar(agregado, creciente.ruta)
+    assert p.contadores.get(f"{agregado.nombre}.aciertos") == 1
+
+
+def test_otro_formato_no_se_lee_ni_se_actualiza(creciente):
+    anterior = api.AGREGADO_PAGOS
+    incremental.cargar(anterior, creciente.ruta)
+    nuevo = dataclasses.replace(anterior, formato=2)
+    creciente.anexar(100)
+    with perfil.perfilando() as p:
+        estado = incremental.cargar(nuevo, creciente.ruta)
+    assert p.contadores.get("incremental.completos") == 1
+    _igual_pagos(estado, anterior.construir(creciente.ruta))
+    version = nuevo.version(datos.version_datos(creciente.ruta, nuevo.tablas))
+    assert version.endswith(".f2")
+    assert [c.name for c in (creciente.ruta / datos.CACHE_DIRNAME).glob("pagos-*")] == [f"pagos-{version}"]
+
+
+# --------------------------------------
+# Constructores simultáneos
+# --------------------------------------
+def test_publicar_carpeta_gana_la_primera(tmp_path):
+    carpeta = tmp_path / "cubo-v1"
+    datos.publicar_carpeta(carpeta, lambda tmp: (tmp / "a.txt").write_text("primera"))
+    datos.publicar_carpeta(carpeta, lambda tmp: (tmp / "a.txt").write_text("segunda"))
+    assert (carpeta / "a.txt").read_text() == "primera"
+    assert [p.name for p in tmp_path.iterdir()] == ["cubo-v1"]
+
+
+def test_publicar_carpeta_descarta_la_temporal_si_falla(tmp_path):
+    def falla(tmp):
+        (tmp / "a.txt").write_text("a medias")
+        raise RuntimeError("corte")
+
+    with pytest.raises(RuntimeError):
+        datos.publicar_carpeta(tmp_path / "cubo-v1", falla)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("agregado", [api.AGREGADO_RFM, api.AGREGADO_PAGOS], ids=["rfm", "pagos"])
+def test_constructores_simultaneos(creciente, agregado):
+    for tabla in datos.TABLAS:
+        datos.cargar_tabla(tabla, creciente.ruta)
+    with ThreadPoolExecutor(6) as ejecutor:
+        estados = list(ejecutor.map(lambda _: incremental.cargar(agregado, creciente.ruta), range(6)))
+    esperado = agregado.construir(creciente.ruta)
+    for estado in estados:
+        (_igual_rfm if agregado is api.AGREGADO_RFM else _igual_pagos)(estado, esperado)
+    carpetas = [p.name for p in (creciente.ruta / datos.CACHE_DIRNAME).glob(f"*{agregado.nombre}-*")]
+    assert carpetas == [datos.dir_version(agregado.nombre, datos.version_datos(creciente.ruta, agregado.tablas),
+                                          creciente.ruta).name]
@@ -0,0 +1,59 @@
+"""Ingesta en paralelo: las partes parseadas en procesos dan la misma caché que una lectura secuencial."""
+
+import shutil
+
+import pytest
+
+from aurelion import datos, ingesta, perfil
+
+from conftest import assert_tabla_igual, leer_csv
+
+
+@pytest.fixture
+def copia(base, tmp_path):
+    """Copia de `base` sin cachés, para que la ingesta tenga que parsear."""
+    destino = tmp_path / "bd"
+    shutil.copytree(base, destino, ignore=shutil.ignore_patterns(datos.CACHE_DIRNAME))
+    return destino
+
+
+def test_en_procesos_igual_a_secuencial(copia, monkeypatch):
+    # Umbrales mínimos: procesos aunque los archivos sean chicos y varias partes por tabla.
+    monkeypatch.setattr(ingesta, "UMBRAL_PARALELO", 0)
+    monkeypatch.setattr(ingesta, "PARTE_MIN", 16 << 10)
+    with perfil.perfilando() as p:
+        resultado = ingesta.ingerir(copia, procesos=3)
+    [paralelo] = [t for t in p.tramos if t.nombre == "ingesta.parseo_paralelo"]
+    # Los CSV grandes se cortan en partes: hay más partes que tablas.
+    assert paralelo.atributos["procesos"] == 3
+    assert paralelo.atributos["partes"] > len(datos.TABLAS)
+    assert sorted(resultado.parseadas) == sorted(datos.TABLAS)
+    assert resultado.reporte.ok and resultado.procesos == 3
+    assert set(resultado.segundos) == {"parseo", "validacion"}
+    for tabla in datos.TABLAS:
+        assert datos.cache_vigente(tabla, copia)
+        assert_tabla_igual(datos.cargar_tabla(tabla, copia), leer_csv(copia, tabla))
+
+
+def test_secuencial_y_sin_cambios_no_parsea(copia, monkeypatch):
+    construidas = []
+    construir = datos.construir_cache
+    monkeypatch.setattr(datos, "construir_cache", lambda tabla, *a, **k: construidas.append(tabla)
+                        or construir(tabla, *a, **k))
+    with perfil.perfilando() as p:
+        assert sorted(ingesta.construir_caches(copia)) == sorted(datos.TABLAS)
+    assert "ingesta.parseo_paralelo" not in {t.nombre for t in p.tramos}
+    assert ingesta.ingerir(copia, validar=False).parseadas == []
+    assert sorted(construidas) == sorted(datos.TABLAS)
+
+
+def test_anexo_no_reparsea(creciente):
+    ingesta.construir_caches(creciente.ruta)
+    creciente.anexar(200)
+    assert ingesta.construir_caches(creciente.ruta) == []
+    assert_tabla_igual(datos.cargar_tabla("ventas", creciente.ruta), leer_csv(creciente.ruta, "ventas"))
+
+
+def test_sin_fuente(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ingesta.construir_caches(tmp_path, ["ventas"])
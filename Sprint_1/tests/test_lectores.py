@@ -0,0 +1,84 @@
+"""Registro de lectores: Parquet, CSV, CSV.gz y Excel dan las mismas tablas, completas, por bloques o por partes."""
+
+import gzip
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from aurelion import datos, lectores
+
+from conftest import assert_tabla_igual
+
+FORMATOS = [".csv", ".csv.gz", ".parquet", ".xlsx"]
+
+
+@pytest.fixture(scope="module")
+def formatos(base, crudas, tmp_path_factory):
+    """Carpeta con cada tabla en los cuatro formatos, escrita desde los mismos CSV."""
+    destino = tmp_path_factory.mktemp("formatos")
+    for tabla in datos.TABLAS:
+        crudo = (base / f"{tabla}.csv").read_bytes()
+        (destino / f"{tabla}.csv").write_bytes(crudo)
+        (destino / f"{tabla}.csv.gz").write_bytes(gzip.compress(crudo))
+        # Grupos de filas chicos para que haya varias particiones.
+        pq.write_table(pa.Table.from_pandas(crudas[tabla], preserve_index=False),
+                       destino / f"{tabla}.parquet", row_group_size=1000)
+        crudas[tabla].to_excel(destino / f"{tabla}.xlsx", index=False)
+    return destino
+
+
+@pytest.fixture(scope="module")
+def referencia(formatos):
+    return {t: lectores.leer(formatos / f"{t}.csv", t) for t in datos.TABLAS}
+
+
+@pytest.mark.parametrize("sufijo", FORMATOS[1:])
+@pytest.mark.parametrize("tabla", datos.TABLAS)
+def test_cada_formato_igual_al_csv(formatos, referencia, tabla, sufijo):
+    df = lectores.leer(formatos / f"{tabla}{sufijo}", tabla)
+    assert_tabla_igual(df, referencia[tabla])
+    assert list(df.dtypes) == list(referencia[tabla].dtypes)
+
+
+@pytest.mark.parametrize("sufijo", FORMATOS)
+def test_por_bloques_igual_a_leer_todo(formatos, referencia, sufijo):
+    bloques = list(lectores.leer_por_bloques(formatos / f"detalle_ventas{sufijo}", "detalle_ventas",
+                                             bloque_bytes=32 << 10))
+    assert len(bloques) > 1
+    assert_tabla_igual(pd.concat(bloques, ignore_index=True), referencia["detalle_ventas"])
+    columnas = ["id_venta", "importe"]
+    parcial = lectores.leer_por_bloques(formatos / f"detalle_ventas{sufijo}", "detalle_ventas", columnas=columnas)
+    assert_tabla_igual(pd.concat(parcial, ignore_index=True), referencia["detalle_ventas"][columnas])
+
+
+@pytest.mark.parametrize("sufijo", FORMATOS)
+@pytest.mark.parametrize("n", [1, 3, 7])
+def test_particiones_igual_a_leer_todo(formatos, referencia, sufijo, n):
+    fuente = formatos / f"ventas{sufijo}"
+    partes = lectores.particiones(fuente, n)
+    if sufijo in (".csv", ".parquet") and n > 1:
+        assert 1 < len(partes) <= n
+    else:
+        assert partes == [None]
+    leidas = [lectores.leer_particion(fuente, "ventas", parte) for parte in partes]
+    assert_tabla_igual(pd.concat(leidas, ignore_index=True), referencia["ventas"])
+
+
+def test_resolver_fuente_sigue_la_prioridad(formatos, tmp_path):
+    for sufijo in reversed(lectores.PRIORIDAD):
+        shutil.copy(formatos / f"productos{sufijo}", tmp_path)
+        assert lectores.resolver_fuente("productos", tmp_path) == tmp_path / f"productos{sufijo}"
+    assert lectores.resolver_fuente("clientes", tmp_path) is None
+
+
+def test_sufijo_de(formatos):
+    assert lectores.sufijo_de("VENTAS.CSV.GZ") == ".csv.gz"
+    assert lectores.sufijo_de("ventas.csv") == ".csv"
+    with pytest.raises(ValueError):
+        lectores.sufijo_de("ventas.json")
+    with open(formatos / "clientes.csv.gz", "rb") as archivo:
+        # Sin ruta, el formato sale del nombre del archivo abierto.
+        assert len(lectores.leer(archivo, "clientes")) == len(lectores.leer(formatos / "clientes.csv", "clientes"))
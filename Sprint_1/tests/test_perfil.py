@@ -0,0 +1,88 @@
+"""Perfilador: tramos anidados, tiempo propio, contadores y exportación a Chrome trace."""
+
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from aurelion import perfil
+
+
+@perfil.medido()
+def paso(segundos: float) -> str:
+    time.sleep(segundos)
+    perfil.contar("pasos")
+    return "listo"
+
+
+def test_tramos_anidados_y_tiempo_propio():
+    with perfil.perfilando() as p:
+        with perfil.tramo("carga", "io", tabla="ventas"):
+            assert paso(0.02) == "listo"
+            paso(0.01)
+        perfil.contar("pasos", 3)
+    assert [(t.nombre, t.padre) for t in p.tramos] == [("carga", -1), ("test_perfil.paso", 0), ("test_perfil.paso", 0)]
+    assert p.contadores == {"pasos": 5}
+    carga, primero, segundo = p.tramos
+    assert carga.atributos == {"tabla": "ventas"} and carga.categoria == "io"
+    assert carga.duracion >= primero.duracion + segundo.duracion >= 0.03
+    tabla = p.tabla()
+    assert list(tabla["nivel"]) == [0, 1, 1]
+    assert tabla["tramo"].iloc[1] == "  test_perfil.paso"
+    assert tabla["propio_ms"].iloc[0] == pytest.approx(tabla["ms"].iloc[0] - tabla["ms"].iloc[1:].sum(), abs=0.05)
+    resumen = p.resumen().set_index("tramo")
+    assert resumen.loc["test_perfil.paso", "llamadas"] == 2
+
+
+def test_sin_perfilador_no_registra():
+    assert perfil.activo() is None
+    paso(0)
+    with perfil.perfilando() as p:
+        pass
+    assert p.tramos == [] and p.contadores == {}
+    assert list(p.tabla().columns) == ["tramo", "categoria", "inicio_ms", "ms", "propio_ms", "memoria_mb", "nivel"]
+
+
+def test_chrome_trace():
+    with perfil.perfilando(perfil.Perfilador("prueba")) as p:
+        with perfil.tramo("externo"):
+            paso(0.005)
+    traza = json.loads(json.dumps(p.chrome_trace()))
+    eventos = traza["traceEvents"]
+    assert eventos[0]["ph"] == "M" and eventos[0]["args"] == {"name": "prueba"}
+    completos = [e for e in eventos if e["ph"] == "X"]
+    assert [e["name"] for e in completos] == ["externo", "test_perfil.paso"]
+    externo, interno = completos
+    # El hijo queda dentro del padre en la línea de tiempo.
+    assert externo["ts"] <= interno["ts"] and interno["ts"] + interno["dur"] <= externo["ts"] + externo["dur"] + 0.2
+    assert [(e["name"], e["args"]) for e in eventos if e["ph"] == "C"] == [("pasos", {"valor": 1})]
+    assert [r["tramo"] for r in p.registros()] == ["externo", "test_perfil.paso"]
+
+
+def test_cada_hilo_con_su_perfilador():
+    perfiles = {}
+
+    def trabajar(nombre):
+        with perfil.perfilando() as p:
+            paso(0.005)
+            perfil.contar(nombre)
+        perfiles[nombre] = p
+
+    hilos = [threading.Thread(target=trabajar, args=(f"hilo{i}",)) for i in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    for nombre, p in perfiles.items():
+        assert p.contadores == {"pasos": 1, nombre: 1}
+        assert len(p.tramos) == 1 and p.tramos[0].padre == -1
+
+
+def test_registro_debug_sin_perfilador(caplog):
+    with caplog.at_level(logging.DEBUG, logger="aurelion.perfil"):
+        with perfil.tramo("suelto", "io", filas=3):
+            pass
+    registro = json.loads(caplog.records[-1].getMessage())
+    assert (registro["tramo"], registro["categoria"], registro["filas"]) == ("suelto", "io", 3)
@@ -0,0 +1,126 @@
+"""Comparativas entre períodos: sumas acumuladas contra filtrar y sumar las ventas del rango."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aurelion import cubo, datos, perfil, periodos
+
+from conftest import assert_tabla_igual
+
+
+@pytest.fixture(scope="module")
+def p(base) -> periodos.Periodos:
+    return periodos.cargar_periodos(base)
+
+
+@pytest.fixture(scope="module")
+def filas(filas_unidas):
+    """Referencia: (una fila por venta, una fila por línea) con todas las dimensiones."""
+    ventas = (filas_unidas.groupby(["id_venta", "fecha", "medio_pago", "ciudad"], as_index=False)
+              [["cantidad", "importe"]].sum())
+    return ventas, filas_unidas
+
+
+def suma(filas, desde, hasta, por: str) -> pd.DataFrame:
+    """Ventas, unidades e importe en [desde, hasta] por valor de `por` (con pandas)."""
+    ventas, lineas = filas
+    tabla = lineas if por == "categoria" else ventas
+    tabla = tabla[tabla["fecha"].between(pd.Timestamp(desde), pd.Timestamp(hasta))].assign(total="total")
+    conteo = ("id_venta", "nunique") if por == "categoria" else ("id_venta", "size")
+    resultado = tabla.groupby(por).agg(ventas=conteo, unidades=("cantidad", "sum"), importe=("importe", "sum"))
+    resultado.index = resultado.index.astype(str)
+    return resultado
+
+
+def esperado_por_valor(filas, p, desde, hasta, por) -> pd.DataFrame:
+    return suma(filas, desde, hasta, por).reindex(p.valores[por], fill_value=0)
+
+
+RANGOS = [("2023-01-01", "2023-01-31"), ("2023-05-10", "2023-05-10"), ("2023-03-15", "2024-02-20"),
+          ("2022-11-01", "2023-01-15"), ("2024-06-01", "2024-09-30"), ("2021-01-01", "2021-12-31")]
+
+
+@pytest.mark.parametrize("por", periodos.PORCIONES)
+@pytest.mark.parametrize("desde,hasta", RANGOS)
+def test_totales_igual_a_filtrar(p, filas, por, desde, hasta):
+    obtenido = periodos.totales(p, desde, hasta, por)
+    esperado = esperado_por_valor(filas, p, desde, hasta, por).rename_axis(por).reset_index()
+    assert_tabla_igual(obtenido[[por, *cubo.MEDIDAS]], esperado[[por, *cubo.MEDIDAS]])
+
+
+@pytest.mark.parametrize("por", ["total", "medio_pago", "categoria"])
+def test_comparar(p, filas, por):
+    # Sin rango anterior: el de igual largo que termina el día antes.
+    resultado = periodos.comparar(p, "2023-07-01", "2023-07-31", por=por)
+    actual = esperado_por_valor(filas, p, "2023-07-01", "2023-07-31", por)
+    anterior = esperado_por_valor(filas, p, "2023-05-31", "2023-06-30", por)
+    for fila in resultado.itertuples():
+        a, b = actual.loc[getattr(fila, por), fila.medida], anterior.loc[getattr(fila, por), fila.medida]
+        assert (fila.actual, fila.anterior) == pytest.approx((a, b))
+        assert fila.delta == pytest.approx(a - b)
+        if b:
+            assert fila.crecimiento_pct == pytest.approx(100 * (a - b) / b)
+        else:
+            assert np.isnan(fila.crecimiento_pct)
+
+
+def test_interanual(p, filas):
+    resultado = periodos.interanual(p, "2024-01-01", "2024-03-31", por="ciudad").set_index(["ciudad", "medida"])
+    actual = esperado_por_valor(filas, p, "2024-01-01", "2024-03-31", "ciudad")
+    anterior = esperado_por_valor(filas, p, "2023-01-01", "2023-03-31", "ciudad")
+    for medida in cubo.MEDIDAS:
+        np.testing.assert_allclose(resultado.xs(medida, level="medida")["actual"], actual[medida])
+        np.testing.assert_allclose(resultado.xs(medida, level="medida")["anterior"], anterior[medida])
+
+
+@pytest.mark.parametrize("medida,por", [("importe", "total"), ("ventas", "medio_pago"), ("unidades", "categoria")])
+def test_ventanas_igual_a_rolling(p, filas, medida, por):
+    ventas, lineas = filas
+    tabla = (lineas if por == "categoria" else ventas).assign(total="total")
+    valor = {"ventas": ("id_venta", "nunique"), "unidades": ("cantidad", "sum"), "importe": ("importe", "sum")}[medida]
+    dias = pd.date_range(tabla["fecha"].min(), tabla["fecha"].max())
+    diario = (tabla.groupby(["fecha", por]).agg(valor=valor)["valor"].unstack(fill_value=0)
+              .reindex(dias, fill_value=0))
+    diario.columns = diario.columns.astype(str)
+    resultado = periodos.ventanas(p, medida, por, dias=(7, 30))
+    assert len(resultado) == 2 * len(dias) * len(p.valores[por])
+    for ventana in (7, 30):
+        movil = diario.rolling(ventana, min_periods=1).sum()
+        obtenido = resultado[resultado["ventana"] == ventana].pivot(index="fecha", columns=por, values="valor")
+        np.testing.assert_allclose(obtenido.to_numpy(), movil[obtenido.columns].to_numpy())
+        # Un año antes: la misma ventana terminada en la fecha de hace un año (0 antes del primer día).
+        fecha = pd.Timestamp("2024-05-20")
+        fin = fecha - pd.DateOffset(years=1)
+        previo = movil.reindex([fin], fill_value=0).iloc[0]
+        fila = resultado[(resultado["ventana"] == ventana) & (resultado["fecha"] == fecha)].set_index(por)
+        np.testing.assert_allclose(fila["anio_anterior"], previo[fila.index])
+
+
+def test_leido_de_disco_igual_a_construir(base, p):
+    with perfil.perfilando() as perfilador:
+        leido = periodos.cargar_periodos(base)
+    assert perfilador.contadores.get("periodos.aciertos") == 1
+    construido = periodos.construir_periodos(cubo.cargar_cubo(base))
+    assert (leido.inicio, leido.dias) == (construido.inicio, construido.dias)
+    for porcion in periodos.PORCIONES:
+        assert (leido.valores[porcion] == construido.valores[porcion]).all()
+        np.testing.assert_allclose(leido.acumulado[porcion], construido.acumulado[porcion])
+    with pytest.raises(ValueError):
+        periodos.totales(p, "2023-01-01", "2023-01-31", por="producto")
+
+
+def test_cargas_simultaneas(base, creciente):
+    creciente.anexar(len(creciente.ventas))
+    for tabla in datos.TABLAS:
+        datos.cargar_tabla(tabla, creciente.ruta)
+    with ThreadPoolExecutor(6) as ejecutor:
+        cargados = list(ejecutor.map(lambda _: periodos.cargar_periodos(creciente.ruta), range(6)))
+    esperado = periodos.cargar_periodos(base)
+    for cargado in cargados:
+        for porcion in periodos.PORCIONES:
+            np.testing.assert_allclose(cargado.acumulado[porcion], esperado.acumulado[porcion])
+    carpeta = datos.dir_version("periodos", datos.version_datos(creciente.ruta), creciente.ruta)
+    assert [p.name for p in carpeta.parent.glob("*periodos*")] == [carpeta.name]
@@ -0,0 +1,171 @@
+"""Planificador: precálculo en segundo plano junto a pedidos directos de la app."""
+
+import threading
+import time
+
+import pytest
+
+from aurelion import cubo, datos, perfil, periodos, planificador
+
+from conftest import assert_cubo_igual
+
+
+@pytest.fixture
+def completa(crudas, creciente):
+    """Copia de `base` con todas las ventas y sin cachés."""
+    creciente.anexar(len(crudas["ventas"]))
+    return creciente.ruta
+
+
+def esperar(condicion, segundos: float = 10.0) -> None:
+    limite = time.monotonic() + segundos
+    while not condicion():
+        assert time.monotonic() < limite, "no se cumplió a tiempo"
+        time.sleep(0.01)
+
+
+def fila(plan: planificador.Planificador, nombre: str):
+    return plan.estado().set_index("artefacto").loc[nombre]
+
+
+def test_cubo_directo_mientras_se_precalcula(completa, monkeypatch):
+    construcciones = []
+    construir = cubo.construir_cubo
+    monkeypatch.setattr(cubo, "construir_cubo", lambda e: construcciones.append(e) or construir(e))
+
+    plan = planificador.Planificador(completa, hilos=2, intervalo=0.05)
+    try:
+        # La app pide el cubo y las sumas por período sin pasar por el planificador.
+        directos = [threading.Thread(target=cubo.cargar_cubo, args=(completa,)),
+                    threading.Thread(target=periodos.cargar_periodos, args=(completa,))]
+        for hilo in directos:
+            hilo.start()
+        precalculado = plan.resultado("cubo", timeout=60)
+        plan.resultado("periodos", timeout=60)
+        for hilo in directos:
+            hilo.join(60)
+    finally:
+        plan.detener()
+
+    # Uno solo construyó; los demás esperaron el bloqueo y leyeron lo publicado.
+    assert len(construcciones) == 1
+    assert_cubo_igual(precalculado, cubo.cargar_cubo(completa))
+    assert_cubo_igual(precalculado, construir(construcciones[0]))
+    cache = completa / datos.CACHE_DIRNAME
+    for nombre in ("cubo", "estrella", "periodos"):
+        assert len(list(cache.glob(f"{nombre}-*"))) == 1, nombre
+        assert not list(cache.glob(f".{nombre}-*.tmp")), nombre
+
+
+# --------------------------------------
+# Reintentos y cancelación
+# --------------------------------------
+class Falla:
+    """Artefacto que falla las primeras `veces` llamadas y después devuelve cuántas ventas hay."""
+
+    def __init__(self, veces: int) -> None:
+        self.veces = veces
+        self.llamadas = []
+
+    def __call__(self, base):
+        self.llamadas.append(time.monotonic())
+        if len(self.llamadas) <= self.veces:
+            raise ValueError(f"falla {len(self.llamadas)}")
+        return len(datos.cargar_tabla("ventas", base, ["id_venta"]))
+
+
+def registrar(monkeypatch, **funciones):
+    artefactos = {nombre: planificador.Artefacto(f, ("ventas",), ("Temas",)) for nombre, f in funciones.items()}
+    monkeypatch.setattr(planificador, "ARTEFACTOS", artefactos)
+
+
+def test_reintenta_duplicando_la_espera(base, crudas, monkeypatch):
+    monkeypatch.setattr(planificador, "REINTENTO_S", 0.2)
+    falla = Falla(2)
+    registrar(monkeypatch, falla=falla)
+    plan = planificador.Planificador(base, intervalo=0.02)
+    try:
+        with pytest.raises(RuntimeError, match="falla 1"):
+            plan.resultado("falla", timeout=10)
+        # Antes del reintento no espera: falla enseguida con el error anterior.
+        inicio = time.monotonic()
+        with pytest.raises(RuntimeError, match="falla 1"):
+            plan.resultado("falla", timeout=10)
+        assert time.monotonic() - inicio < 0.1
+        estado = fila(plan, "falla")
+        assert estado["estado"] == "error" and 0 < estado["reintento_s"] <= 0.2
+        esperar(lambda: len(falla.llamadas) == 3)
+        assert plan.resultado("falla", timeout=10) == len(crudas["ventas"])
+    finally:
+        plan.detener()
+    primera, segunda, tercera = falla.llamadas
+    assert segunda - primera >= 0.2 and tercera - segunda >= 0.4
+    estado = fila(plan, "falla")
+    assert estado["estado"] == "listo" and estado["error"] is None
+
+
+def test_datos_nuevos_reintentan_ya(creciente, monkeypatch):
+    monkeypatch.setattr(planificador, "REINTENTO_S", 60.0)
+    falla = Falla(1)
+    registrar(monkeypatch, falla=falla)
+    plan = planificador.Planificador(creciente.ruta, intervalo=60)
+    try:
+        with pytest.raises(RuntimeError):
+            plan.resultado("falla", timeout=10)
+        assert fila(plan, "falla")["reintento_s"] > 50
+        creciente.anexar(100)
+        # La revisión siguiente ve otra versión de los datos y reintenta sin esperar.
+        plan.despertar()
+        esperar(lambda: fila(plan, "falla")["estado"] == "listo")
+        assert plan.resultado("falla") == creciente.cargadas
+    finally:
+        plan.detener()
+    assert len(falla.llamadas) == 2
+
+
+def test_sirve_el_valor_anterior_mientras_recalcula(creciente, monkeypatch):
+    seguir = threading.Event()
+    calcular = Falla(0)
+
+    def lento(base):
+        valor = calcular(base)
+        if len(calcular.llamadas) > 1:
+            seguir.wait(10)
+        return valor
+
+    registrar(monkeypatch, lento=lento)
+    plan = planificador.Planificador(creciente.ruta, intervalo=0.02)
+    try:
+        anterior = plan.resultado("lento", timeout=10)
+        creciente.anexar(100)
+        esperar(lambda: fila(plan, "lento")["estado"] == "calculando")
+        with perfil.perfilando() as p:
+            assert plan.resultado("lento") == anterior
+        assert p.contadores == {"planificador.obsoletos": 1}
+        seguir.set()
+        esperar(lambda: fila(plan, "lento")["estado"] == "listo")
+        assert plan.resultado("lento") == anterior + 100
+    finally:
+        seguir.set()
+        plan.detener()
+
+
+def test_detener_no_espera_ni_empieza_lo_encolado(base, monkeypatch):
+    empezo, seguir = threading.Event(), threading.Event()
+    otros = []
+
+    def lento(base):
+        empezo.set()
+        seguir.wait(10)
+
+    registrar(monkeypatch, lento=lento, otro=otros.append)
+    plan = planificador.Planificador(base, hilos=1, intervalo=0.02)
+    try:
+        assert empezo.wait(10)
+        inicio = time.monotonic()
+        plan.detener()
+        assert time.monotonic() - inicio < 2
+    finally:
+        seguir.set()
+    time.sleep(0.1)
+    assert otros == []
@@ -0,0 +1,66 @@
+"""RFM: agregados vectorizados y actualización por delta contra pandas."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aurelion import rfm
+
+
+def referencia_agregados(ventas: pd.DataFrame, detalle: pd.DataFrame) -> pd.DataFrame:
+    importe = detalle.groupby("id_venta")["importe"].sum().rename("importe")
+    unidas = ventas.merge(importe, left_on="id_venta", right_index=True, how="left").fillna({"importe": 0.0})
+    return (unidas.groupby("id_cliente")
+            .agg(ultima_compra=("fecha", "max"), frecuencia=("id_venta", "count"), monetizacion=("importe", "sum"))
+            .sort_index())
+
+
+def comparar(obtenido: pd.DataFrame, esperado: pd.DataFrame) -> None:
+    obtenido = obtenido.sort_index()[rfm.COLUMNAS]
+    assert list(obtenido.index) == list(esperado.index)
+    assert (obtenido["ultima_compra"].to_numpy() == esperado["ultima_compra"].to_numpy()).all()
+    assert (obtenido["frecuencia"].to_numpy() == esperado["frecuencia"].to_numpy()).all()
+    np.testing.assert_allclose(obtenido["monetizacion"], esperado["monetizacion"])
+
+
+def test_agregados_igual_a_groupby(crudas):
+    ventas, detalle = crudas["ventas"], crudas["detalle_ventas"]
+    comparar(rfm.agregados_rfm(ventas, detalle), referencia_agregados(ventas, detalle))
+
+
+@pytest.mark.parametrize("lotes", [2, 5])
+def test_actualizar_igual_a_reconstruir(crudas, lotes):
+    ventas, detalle = crudas["ventas"], crudas["detalle_ventas"]
+    cortes = np.linspace(0, len(ventas), lotes + 1).astype(int)
+    agregados = None
+    for inicio, fin in zip(cortes[:-1], cortes[1:]):
+        lote = ventas.iloc[inicio:fin]
+        detalle_lote = detalle[detalle["id_venta"].isin(lote["id_venta"])]
+        agregados = (rfm.agregados_rfm(lote, detalle_lote) if agregados is None
+                     else rfm.actualizar_agregados(agregados, lote, detalle_lote))
+    assert agregados["frecuencia"].dtype == "int64"
+    comparar(agregados, referencia_agregados(ventas, detalle))
+
+
+def test_actualizar_con_lote_vacio(crudas):
+    ventas, detalle = crudas["ventas"], crudas["detalle_ventas"]
+    agregados = rfm.agregados_rfm(ventas, detalle)
+    assert rfm.actualizar_agregados(agregados, ventas.iloc[:0], detalle.iloc[:0]) is agregados
+
+
+def test_segmentos(crudas):
+    ventas, detalle, clientes = crudas["ventas"], crudas["detalle_ventas"], crudas["clientes"]
+    segmentos = rfm.segmentos_rfm(ventas, detalle, clientes)
+    assert len(segmentos) == len(clientes)
+    assert segmentos[["r", "f", "m"]].isin(range(1, 6)).all().all()
+
+    fecha_ref = ventas["fecha"].max()
+    agregados = referencia_agregados(ventas, detalle).reindex(clientes["id_cliente"])
+    alta = clientes.set_index("id_cliente")["fecha_alta"]
+    nuevo = (fecha_ref - alta).dt.days <= 90
+    activo = (fecha_ref - agregados["ultima_compra"]).dt.days <= 90
+    esperado = np.where(nuevo, "Nuevo", np.where(activo, "Activo", "Inactivo"))
+    assert (segmentos["segmento"].astype(str).to_numpy() == esperado).all()
+    # A más frecuencia, puntaje F no menor.
+    f = segmentos.sort_values("frecuencia")["f"].to_numpy()
+    assert (np.diff(f) >= 0).all()
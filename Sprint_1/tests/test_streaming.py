@@ -0,0 +1,110 @@
+"""Agregación por bloques: contadores de distintos y agregados por grupo contra pandas."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aurelion import streaming
+
+# Presupuesto chico para que cada tabla se lea en varios bloques.
+MEMORIA_CHICA = 1 << 16
+
+
+def test_varios_bloques(base):
+    assert len(list(streaming.iterar_tabla("detalle_ventas", base=base, memoria_max=MEMORIA_CHICA))) > 1
+
+
+# --------------------------------------
+# Contadores
+# --------------------------------------
+def test_largo_bits_igual_a_bit_length():
+    rng = np.random.default_rng(0)
+    x = rng.integers(1, np.iinfo(np.int64).max, 10_000, dtype=np.int64).astype(np.uint64) << np.uint64(1)
+    bordes = np.array([1, 2, 3, (1 << 53) + 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1], dtype=np.uint64)
+    x = np.concatenate([x, bordes, x >> np.uint64(40)])
+    x = x[x > 0]
+    esperado = [int(v).bit_length() for v in x]
+    assert streaming._largo_bits(x).tolist() == esperado
+
+
+def test_distintos_exacto_por_partes():
+    rng = np.random.default_rng(1)
+    valores = rng.integers(0, 50_000, 200_000)
+    a, b = streaming.DistintosExacto(), streaming.DistintosExacto()
+    for parte in np.array_split(valores[:120_000], 7):
+        a.agregar(parte)
+    b.agregar(valores[120_000:])
+    a.fusionar(b)
+    assert a.total() == len(np.unique(valores))
+
+
+def test_distintos_exacto_texto_y_nulos():
+    contador = streaming.DistintosExacto()
+    contador.agregar(np.array(["qr", "tarjeta", None, "qr"], dtype=object))
+    contador.agregar(np.array(["efectivo", "tarjeta"], dtype=object))
+    assert contador.total() == 3
+
+
+@pytest.mark.parametrize("n", [100, 5_000, 300_000])
+def test_hyperloglog_cerca_del_exacto(n):
+    rng = np.random.default_rng(n)
+    valores = rng.choice(10**9, n, replace=False)
+    hll = streaming.HyperLogLog()
+    hll.agregar(np.concatenate([valores, valores[: n // 2]]))
+    # Error estándar 1.04 / sqrt(2**14) ≈ 0.8 %.
+    assert abs(hll.total() - n) <= max(2, 0.03 * n)
+
+
+def test_hyperloglog_fusionar_igual_a_todo_junto():
+    valores = np.arange(100_000)
+    todo, a, b = streaming.HyperLogLog(), streaming.HyperLogLog(), streaming.HyperLogLog()
+    todo.agregar(valores)
+    a.agregar(valores[:40_000])
+    b.agregar(valores[30_000:])
+    a.fusionar(b)
+    assert a.total() == todo.total()
+
+
+# --------------------------------------
+# Tablas por bloques
+# --------------------------------------
+@pytest.mark.parametrize("tabla,columna", [("ventas", "id_venta"), ("ventas", "id_cliente"),
+                                           ("detalle_ventas", "id_producto"), ("ventas", "medio_pago")])
+def test_contar_distintos(base, crudas, tabla, columna):
+    esperado = crudas[tabla][columna].nunique()
+    assert streaming.contar_distintos(tabla, columna, True, base, MEMORIA_CHICA) == esperado
+    aproximado = streaming.contar_distintos(tabla, columna, False, base, MEMORIA_CHICA)
+    assert abs(aproximado - esperado) <= max(2, 0.03 * esperado)
+
+
+def test_distintos_por_grupo(base, crudas):
+    esperado = crudas["ventas"].groupby("medio_pago")["id_cliente"].nunique()
+    obtenido = streaming.distintos_por_grupo("ventas", "medio_pago", "id_cliente", True, base, MEMORIA_CHICA)
+    obtenido.index = obtenido.index.astype(str)
+    pd.testing.assert_series_equal(obtenido.sort_index(), esperado.sort_index(), check_names=False,
+                                   check_index_type=False)
+
+
+def test_agregar_por_grupo(base, crudas):
+    agregaciones = {"lineas": ("cantidad", "size"), "unidades": ("cantidad", "sum"),
+                    "importe": ("importe", "sum"), "menor": ("importe", "min"), "mayor": ("importe", "max")}
+    obtenido = streaming.agregar_por_grupo("detalle_ventas", "id_producto", agregaciones, base, MEMORIA_CHICA)
+    esperado = crudas["detalle_ventas"].groupby("id_producto").agg(**agregaciones)
+    obtenido = obtenido.sort_index()
+    assert list(obtenido.index) == list(esperado.index)
+    for columna in agregaciones:
+        np.testing.assert_allclose(obtenido[columna].to_numpy(dtype=float), esperado[columna].to_numpy(dtype=float))
+
+
+def test_compras_por_cliente(base, crudas):
+    obtenido = streaming.compras_por_cliente(base, MEMORIA_CHICA).set_index("id_cliente")["compras"].sort_index()
+    esperado = crudas["ventas"]["id_cliente"].value_counts().sort_index()
+    assert list(obtenido.index) == list(esperado.index)
+    assert (obtenido.to_numpy() == esperado.to_numpy()).all()
+
+
+def test_ventas_por_pago(base, crudas):
+    obtenido = streaming.ventas_por_pago(True, base, MEMORIA_CHICA)
+    esperado = crudas["ventas"]["medio_pago"].value_counts()
+    assert dict(zip(obtenido["medio_pago"], obtenido["ventas"])) == esperado.to_dict()
+    assert obtenido["ventas"].is_monotonic_decreasing
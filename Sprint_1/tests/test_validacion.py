@@ -0,0 +1,75 @@
+"""Validación: cada regla detecta los errores sembrados en una copia de las tablas, y nada en las originales."""
+
+import numpy as np
+import pytest
+
+from aurelion import datos, validacion
+
+
+@pytest.fixture(scope="module")
+def tablas(base):
+    return {t: datos.cargar_tabla(t, base) for t in datos.TABLAS}
+
+
+@pytest.fixture
+def copia(tablas):
+    return {t: df.copy() for t, df in tablas.items()}
+
+
+def problemas(reporte, regla):
+    return {(p.tabla, p.columna): p for p in reporte.problemas if p.regla == regla}
+
+
+def test_tablas_sin_errores(tablas):
+    reporte = validacion.validar(tablas)
+    assert reporte.ok and reporte.problemas == []
+    assert reporte.filas == {t: len(df) for t, df in tablas.items()}
+    assert reporte.a_dataframe().empty
+    assert reporte.a_dict()["ok"]
+
+
+def test_pk_repetida(copia):
+    ventas = copia["ventas"]
+    ventas.loc[[3, 7], "id_venta"] = ventas.loc[0, "id_venta"]
+    [problema] = problemas(validacion.validar(copia, [validacion.validar_pk]), "pk").values()
+    assert (problema.tabla, problema.filas, problema.ejemplos) == ("ventas", 3, [int(ventas.loc[0, "id_venta"])])
+
+
+def test_fk_sin_correspondencia(copia):
+    copia["ventas"].loc[:4, "id_cliente"] = 10**6
+    copia["detalle_ventas"].loc[:1, "id_producto"] = -1
+    encontrados = problemas(validacion.validar(copia), "fk")
+    assert encontrados.keys() == {("ventas", "id_cliente"), ("detalle_ventas", "id_producto")}
+    assert encontrados[("ventas", "id_cliente")].filas == 5
+    assert encontrados[("detalle_ventas", "id_producto")].ejemplos == [-1]
+
+
+def test_importe_y_negativos(copia):
+    detalle = copia["detalle_ventas"]
+    detalle.loc[0, "importe"] += 0.005                # dentro de la tolerancia
+    detalle.loc[[1, 2], "importe"] += 1.0
+    detalle.loc[5, "cantidad"] = -detalle.loc[5, "cantidad"]
+    reporte = validacion.validar(copia, [validacion.validar_importe, validacion.validar_no_negativos])
+    importe = problemas(reporte, "importe")[("detalle_ventas", "importe")]
+    # Las filas 1, 2 y la 5 (el importe ya no es cantidad * precio).
+    assert importe.filas == 3
+    assert problemas(reporte, "no_negativo")[("detalle_ventas", "cantidad")].filas == 1
+    assert not reporte.ok
+
+
+def test_nulos_columnas_y_tipos(copia):
+    copia["ventas"].loc[[0, 1], "fecha"] = np.nan
+    copia["clientes"] = copia["clientes"].drop(columns=["email"])
+    copia["productos"]["precio_unitario"] = copia["productos"]["precio_unitario"].astype(str)
+    reporte = validacion.validar(copia)
+    assert problemas(reporte, "nulos")[("ventas", "fecha")].filas == 2
+    assert ("clientes", "email") in problemas(reporte, "columnas")
+    assert ("productos", "precio_unitario") in problemas(reporte, "tipo")
+    df = reporte.a_dataframe()
+    assert list(df.columns) == ["tabla", "regla", "columna", "filas", "ejemplos", "severidad", "detalle"]
+    assert len(df) == len(reporte.problemas)
+
+
+def test_tablas_faltantes_se_omiten(tablas):
+    reporte = validacion.validar({"detalle_ventas": tablas["detalle_ventas"]})
+    assert reporte.ok and reporte.filas == {"detalle_ventas": len(tablas["detalle_ventas"])}